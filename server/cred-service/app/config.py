@@ -37,6 +37,91 @@ class Settings(BaseSettings):
     resend_api_key: Optional[str] = None
     resend_from_email: str = "CredDev <onboarding@resend.dev>"
 
+    # Extraction — run all platform fetchers concurrently, each with its own timeout
+    extraction_concurrent: bool = True
+    extraction_platform_timeout: float = 120.0  # seconds per platform
+    extraction_stale_after_hours: float = 24.0  # refresh endpoint default when no platforms are listed
+    extraction_persist_mode: str = "bulk"  # "bulk" (one transaction at the end) or "incremental" (commit per platform)
+
+    # Cross-job extraction cache — "memory" (per-process LRU), "db" (shared table) or "off"
+    extraction_cache_backend: str = "memory"
+    extraction_cache_ttl: int = 3600  # seconds
+    extraction_cache_max_entries: int = 512  # memory backend only
+
+    # GitHub GraphQL rate-limit scheduler (services/github_rate_limiter.py)
+    github_max_concurrent_requests: int = 4
+    github_quota_reserve: int = 50  # points always left untouched
+    github_pace_below: int = 500  # start spacing requests out below this many remaining points
+    github_max_quota_wait: float = 60.0  # seconds; longer waits fail the GitHub fetch instead
+    github_signal_batch_concurrency: int = 3  # Query 2 batches in flight per job
+    github_signal_batch_max: int = 10  # upper bound for the adaptive Query 2 batch size
+
+    # GitHub pagination — follow repository / PR cursors past the first page
+    github_paginate: bool = False
+    github_max_repos: int = 500
+    github_max_pull_requests: int = 300
+
+    # Web search extraction (OpenAI) — caps in-flight lookups per worker
+    web_search_concurrency: int = 4
+    web_search_timeout: float = 90.0  # seconds per lookup
+
+    # Job queue (job_queue table) — extraction and generation run on queue workers, not in the request
+    job_queue_embedded: bool = True  # run workers inside the web process; false = run `python -m app.worker` separately
+    job_queue_concurrency: int = 4  # jobs in flight per worker process
+    job_queue_lease_seconds: int = 120  # a task whose worker stops heartbeating is reclaimed after this
+    job_queue_max_attempts: int = 3  # claims per task before it is failed (crash loops)
+    job_queue_poll_interval: float = 1.0  # seconds between claims when the queue is empty
+    job_queue_shutdown_grace: float = 30.0  # seconds a stopping worker waits for in-flight jobs
+
+    # Report generation — run the extensive / developer / recruiter LLM calls concurrently
+    generation_concurrent: bool = True
+    generation_concurrency: int = 3  # report LLM calls in flight per job
+
+    # LLM context — "compact" (minified, null/empty fields dropped, paths unchanged) or "pretty" (indent=2)
+    llm_context_format: str = "compact"
+    llm_context_token_budget: int = 60000  # trim lowest-value signal first above this; 0 disables
+    llm_precomputed_metrics: bool = True  # prepend deterministic aggregates (services/derived_metrics.py)
+    llm_activity_timeline: bool = True  # summarize both calendars (services/activity_timeline.py) instead of sending them raw
+    llm_dependency_index: bool = True  # parse manifests locally (services/manifest_analyzer.py) and send only the index
+    llm_prompt_layout: str = "prefix"  # "prefix" (shared context first, cache-friendly) or "legacy"
+    llm_prefix_warmup_timeout: float = 30.0  # seconds concurrent reports wait for the first call to cache the prefix; 0 disables
+
+    # SSE progress stream — push-based; live report drafts are opt-in (GET /generate/{job_id}/stream?drafts=true)
+    sse_drafts_enabled: bool = True
+    sse_draft_interval: float = 0.5  # seconds between draft chunks — deltas in between are coalesced
+    sse_draft_max_chunk_chars: int = 4000  # per chunk; a larger backlog is spread over the following ticks
+    sse_remote_poll_interval: float = 2.0  # seconds between progress reads for jobs running in another process
+
+    # LLM admission control (services/llm_admission.py) — budgets are per process: split the provider limits across workers
+    llm_rpm_limit: int = 500  # report LLM calls per minute; 0 disables
+    llm_tpm_limit: int = 500000  # estimated input + output tokens per minute; 0 disables
+    llm_admission_output_tokens: int = 6000  # expected output (incl. reasoning) per report call
+    llm_admission_max_wait: float = 900.0  # seconds; a job that would queue longer fails instead
+
+    # LLM call telemetry (llm_calls table) — cost estimates in USD per 1M tokens / per web search call
+    llm_telemetry_enabled: bool = True
+    llm_price_input_per_mtok: float = 0.25
+    llm_price_cached_input_per_mtok: float = 0.025
+    llm_price_output_per_mtok: float = 2.0
+    llm_price_web_search_per_call: float = 0.01
+    llm_telemetry_admin_ids: str = ""  # comma-separated user ids that see GET /llm/telemetry across all users
+
+    # Generated-report cache — "memory" (per-process LRU), "db" (shared table) or "off"
+    report_cache_backend: str = "memory"
+    report_cache_ttl: int = 7 * 24 * 3600  # seconds
+    report_cache_max_entries: int = 256  # LRU size (memory) / row cap (db)
+
+    # Resume parsing — PDF text extraction runs in a separate process pool
+    resume_parse_workers: int = 2
+    resume_max_pages: int = 20
+    resume_max_bytes: int = 10 * 1024 * 1024  # matches the 10 MB upload limit in the frontend
+    resume_parse_timeout: float = 20.0  # seconds
+
+    # Shared upstream HTTP clients (services/http_clients.py)
+    http_timeout: float = 30.0
+    http_keepalive_expiry: float = 30.0  # seconds an idle connection is kept open
+    http_http2: bool = False  # requires the 'h2' package
+
     # App settings
     debug: bool = False
     log_level: str = "INFO"
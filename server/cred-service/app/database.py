@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, Text, JSON, ForeignKey
+from sqlalchemy import create_engine, Column, Integer, String, DateTime, Text, JSON, ForeignKey, Boolean, Float, inspect, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 from .config import settings
@@ -67,11 +67,79 @@ class Report(Base):
     job_id = Column(String, ForeignKey("analysis_jobs.id"))
     layer = Column(String)  # signal_summary, extensive_report, developer_insight, recruiter_insight
     content = Column(Text)
+    input_hash = Column(String, nullable=True)  # LLM reports: hash of the exact LLM input — a retry reuses the report while it matches
     created_at = Column(DateTime)
 
     job = relationship("AnalysisJob", back_populates="reports")
 
 
+class ExtractionCacheEntry(Base):
+    """Cross-job cache of platform payloads (EXTRACTION_CACHE_BACKEND=db)."""
+    __tablename__ = "extraction_cache"
+
+    key = Column(String, primary_key=True)  # "{platform_id}:{canonical username or URL}"
+    platform_id = Column(String)
+    data = Column(JSON)
+    created_at = Column(DateTime)
+    expires_at = Column(DateTime, index=True)
+
+
+class ReportCacheEntry(Base):
+    """Content-addressed cache of generated report text (REPORT_CACHE_BACKEND=db)."""
+    __tablename__ = "report_cache"
+
+    key = Column(String, primary_key=True)  # sha256 of (prompt template version, model, report type, messages)
+    report_type = Column(String)
+    model = Column(String)
+    content = Column(Text)
+    created_at = Column(DateTime)
+    last_used_at = Column(DateTime, index=True)
+    expires_at = Column(DateTime, index=True)
+
+
+class LLMCall(Base):
+    """One LLM call (or report cache hit) made while generating a job's reports."""
+    __tablename__ = "llm_calls"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    job_id = Column(String, ForeignKey("analysis_jobs.id"), index=True)
+    report_type = Column(String)  # extensive, developer, recruiter
+    model = Column(String)
+    status = Column(String)  # ok, failed, cancelled
+    cache_hit = Column(Boolean, default=False)  # served from the report cache — no tokens spent
+    fallback_used = Column(Boolean, default=False)  # streaming failed, non-streaming retry made
+    input_tokens = Column(Integer, nullable=True)
+    cached_tokens = Column(Integer, nullable=True)
+    output_tokens = Column(Integer, nullable=True)
+    web_search_calls = Column(Integer, default=0)
+    ttft_ms = Column(Integer, nullable=True)  # time to first text delta
+    duration_ms = Column(Integer, nullable=True)
+    cost_usd = Column(Float, nullable=True)  # estimate from LLM_PRICE_* settings
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, index=True)
+
+
+class QueueTask(Base):
+    """Durable unit of background work (extraction, refresh, generation) claimed by queue workers."""
+    __tablename__ = "job_queue"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    job_id = Column(String, ForeignKey("analysis_jobs.id"), index=True)
+    kind = Column(String)  # extraction, refresh, generation
+    payload = Column(JSON)
+    status = Column(String, index=True)  # queued, running, done, failed, cancelled
+    attempts = Column(Integer, default=0)
+    worker_id = Column(String, nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True, index=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+    cancel_requested = Column(Boolean, default=False)
+    progress = Column(JSON, nullable=True)  # latest progress_manager snapshot, for SSE in other processes
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+
 def get_db():
     db = SessionLocal()
     try:
@@ -80,6 +148,23 @@ def get_db():
         db.close()
 
 
+# Columns added to existing tables — create_all() only creates tables that are missing
+ADDED_COLUMNS = {
+    "reports": {"input_hash": "VARCHAR"},
+}
+
+
 def init_db():
     """Create all tables. Call on startup."""
     Base.metadata.create_all(bind=engine)
+    _add_missing_columns()
+
+
+def _add_missing_columns():
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table, columns in ADDED_COLUMNS.items():
+            existing = {column["name"] for column in inspector.get_columns(table)}
+            for name, ddl in columns.items():
+                if name not in existing:
+                    conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {ddl}"))
@@ -2,6 +2,7 @@ import sys
 import os
 import re
 import time
+import asyncio
 import logging
 
 # Ensure the cred-service root is on the path so "services" can be imported
@@ -13,7 +14,16 @@ from fastapi.middleware.cors import CORSMiddleware
 from .config import settings
 from .logging_config import setup_logging
 from .database import init_db
-from .routes import extract, generate, stream
+from .routes import extract, generate, stream, telemetry
+from services.http_clients import http_clients
+from services import resume_parser
+from services.extraction_cache import extraction_cache
+from services.report_cache import report_cache
+from services.github_rate_limiter import github_scheduler
+from services.llm_admission import llm_admission
+from services.job_queue import job_queue
+from services.queue_worker import QueueWorker
+from .worker import HANDLERS
 
 # --- Logging must be configured before anything else uses it ---
 setup_logging(debug=settings.debug, log_level=settings.log_level)
@@ -93,21 +103,48 @@ app.add_middleware(RequestLoggingMiddleware)
 app.include_router(extract.router, prefix="/api/v1", tags=["extraction"])
 app.include_router(generate.router, prefix="/api/v1", tags=["generation"])
 app.include_router(stream.router, prefix="/api/v1", tags=["streaming"])
+app.include_router(telemetry.router, prefix="/api/v1", tags=["telemetry"])
+
+
+# Embedded queue worker (JOB_QUEUE_EMBEDDED=true) — started with the app
+_embedded_worker = {"worker": None, "task": None}
 
 
 @app.on_event("startup")
-def on_startup():
-    """Create DB tables on startup and log configuration."""
+async def on_startup():
+    """Create DB tables on startup, start the embedded queue worker and log configuration."""
     init_db()
+    http_clients.start()
+    if settings.job_queue_embedded:
+        worker = QueueWorker(HANDLERS)
+        _embedded_worker["worker"] = worker
+        _embedded_worker["task"] = asyncio.create_task(worker.run())
     db_type = "PostgreSQL" if "postgresql" in settings.get_database_url() else "SQLite"
     logger.info(
-        f"CredDev backend started — db={db_type}, log_level={settings.log_level}, debug={settings.debug}, cors={settings.cors_origins}"
+        f"CredDev backend started — db={db_type}, log_level={settings.log_level}, debug={settings.debug}, cors={settings.cors_origins}, "
+        f"queue_worker={'embedded' if settings.job_queue_embedded else 'external'}"
     )
 
 
+@app.on_event("shutdown")
+async def on_shutdown():
+    """Stop the embedded queue worker, then close pooled upstream connections and the resume parse pool."""
+    if _embedded_worker["worker"]:
+        _embedded_worker["worker"].stop()
+        await _embedded_worker["task"]
+    await http_clients.aclose()
+    resume_parser.shutdown_pool()
+
+
 @app.get("/health")
 async def health_check():
     return {
         "status": "healthy",
-        "database": settings.get_database_url().split("@")[-1] if "@" in settings.get_database_url() else "sqlite"
+        "database": settings.get_database_url().split("@")[-1] if "@" in settings.get_database_url() else "sqlite",
+        # Cache db backends and the job queue count rows — keep those off the event loop
+        "extraction_cache": await asyncio.to_thread(extraction_cache.stats) if extraction_cache else None,
+        "report_cache": await asyncio.to_thread(report_cache.stats) if report_cache else None,
+        "github_rate_limit": github_scheduler.stats(),
+        "llm_admission": llm_admission.stats(),
+        "job_queue": await asyncio.to_thread(job_queue.stats),
     }
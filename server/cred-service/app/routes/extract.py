@@ -1,15 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, BackgroundTasks, Request
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Request
 from sqlalchemy.orm import Session
 from typing import Optional, Dict
+import asyncio
 import uuid
 import json
 import logging
 import time
-from datetime import datetime
-from ..database import get_db, AnalysisJob, SessionLocal
+from datetime import datetime, timedelta
+from sqlalchemy import func
+from ..database import get_db, AnalysisJob, RawData, SessionLocal
 from ..auth import get_optional_user
 from services.extraction import ExtractionService
-from services.raw_data_loader import RawDataLoader
+from services.raw_data_loader import RawDataLoader, PAGE_SUFFIX
+from app.config import settings
+from services.job_queue import job_queue, encode_bytes, decode_bytes
 
 logger = logging.getLogger(__name__)
 
@@ -44,10 +48,96 @@ def _check_rate_limit(ip: str) -> None:
     entry["count"] += 1
 
 
+# ---------------------------------------------------------------------------
+# Queue handlers — run by services/queue_worker.py, in this process or in
+# `python -m app.worker`. Each wraps a crash so the job never stays "extracting".
+# A task reclaimed from a dead worker runs again, so both are idempotent: a job
+# whose previous attempt already finished is skipped, and a half-written one is
+# cleared before it is extracted again.
+# ---------------------------------------------------------------------------
+
+def _prepare_extraction(job_id: str) -> bool:
+    """False when an earlier attempt already finished the job; otherwise drop its partial raw data."""
+    db_session = SessionLocal()
+    try:
+        job = db_session.query(AnalysisJob).filter(AnalysisJob.id == job_id).first()
+        if not job or job.status not in ("pending", "extracting"):
+            return False
+        # Rows (and streamed pages) left by an attempt that died mid-extraction
+        deleted = db_session.query(RawData).filter(RawData.job_id == job_id).delete(synchronize_session=False)
+        db_session.commit()
+        if deleted:
+            logger.info(f"Cleared {deleted} raw_data rows from an interrupted extraction of job_id={job_id}")
+        return True
+    finally:
+        db_session.close()
+
+
+def _refresh_pending(job_id: str) -> bool:
+    """POST /extract/{job_id}/refresh sets "extracting"; any other status means the refresh already finished."""
+    db_session = SessionLocal()
+    try:
+        job = db_session.query(AnalysisJob).filter(AnalysisJob.id == job_id).first()
+        return bool(job) and job.status == "extracting"
+    finally:
+        db_session.close()
+
+
+async def run_extraction_task(job_id: str, payload: dict):
+    """Queue handler for POST /extract."""
+    try:
+        if not await asyncio.to_thread(_prepare_extraction, job_id):
+            logger.info(f"Extraction for job_id={job_id} already finished — skipping")
+            return
+        extraction_service = ExtractionService(bypass_cache=payload.get("bypass_cache", False))
+        await extraction_service.run_extraction(
+            job_id=job_id,
+            platform_urls=dict(payload.get("platform_urls") or {}),
+            resume_bytes=decode_bytes(payload.get("resume_b64")),
+            resume_filename=payload.get("resume_filename"),
+            candidate_name=payload.get("candidate_name"),
+        )
+    except Exception as e:
+        logger.error(f"Background extraction crashed for job_id={job_id}: {e}", exc_info=True)
+        try:
+            db_session = SessionLocal()
+            job = db_session.query(AnalysisJob).filter(AnalysisJob.id == job_id).first()
+            if job and job.status not in ("extracted", "failed"):
+                job.status = "failed"
+                job.error_message = f"Extraction crashed: {str(e)}"
+                job.updated_at = datetime.utcnow()
+                db_session.commit()
+            db_session.close()
+        except Exception:
+            pass
+
+
+async def run_refresh_task(job_id: str, payload: dict):
+    """Queue handler for POST /extract/{job_id}/refresh."""
+    try:
+        if not await asyncio.to_thread(_refresh_pending, job_id):
+            logger.info(f"Refresh for job_id={job_id} already finished — skipping")
+            return
+        extraction_service = ExtractionService(bypass_cache=True)
+        await extraction_service.refresh_platforms(job_id, dict(payload.get("platform_urls") or {}))
+    except Exception as e:
+        logger.error(f"Background refresh crashed for job_id={job_id}: {e}", exc_info=True)
+        try:
+            db_session = SessionLocal()
+            job = db_session.query(AnalysisJob).filter(AnalysisJob.id == job_id).first()
+            if job and job.status == "extracting":
+                job.status = "extracted"
+                job.error_message = f"Refresh crashed: {str(e)}"
+                job.updated_at = datetime.utcnow()
+                db_session.commit()
+            db_session.close()
+        except Exception:
+            pass
+
+
 @router.post("/extract")
 async def extract_raw_data(
     request: Request,
-    background_tasks: BackgroundTasks,
     resume: Optional[UploadFile] = File(None),
     # New: flexible platform URLs as JSON string
     platform_urls: Optional[str] = Form(None),
@@ -58,6 +148,7 @@ async def extract_raw_data(
     candidate_name: Optional[str] = Form("Anonymous Candidate"),
     candidate_email: Optional[str] = Form(None),
     user_id: Optional[str] = Form(None),
+    bypass_cache: bool = Form(False),
     current_user: dict | None = Depends(get_optional_user),
     db: Session = Depends(get_db)
 ):
@@ -69,6 +160,8 @@ async def extract_raw_data(
     - LEGACY: github_url, leetcode_url, linkedin_url (individual Form params)
 
     If both are provided, platform_urls takes priority; legacy params fill gaps.
+
+    bypass_cache=true skips the cross-job extraction cache and refetches every platform.
     """
 
     # Rate limit anonymous requests (3/hour per IP)
@@ -130,40 +223,28 @@ async def extract_raw_data(
             detail=f"Failed to create job: {str(e)}"
         )
 
-    # Read resume bytes NOW — before the request closes and UploadFile becomes invalid
+    # Read resume bytes NOW — before the request closes and UploadFile becomes invalid.
+    # They travel in the queue payload (base64) and are dropped once the task finishes.
     resume_bytes = None
     resume_filename = None
     if resume:
         resume_bytes = await resume.read()
         resume_filename = resume.filename
 
-    extraction_service = ExtractionService()
-
-    # Wrapper to catch any crash and mark job as failed
-    async def safe_extraction():
-        try:
-            await extraction_service.run_extraction(
-                job_id=job_id,
-                platform_urls=dict(urls_dict),  # copy to avoid mutation
-                resume_bytes=resume_bytes,
-                resume_filename=resume_filename,
-                candidate_name=candidate_name,
-            )
-        except Exception as e:
-            logger.error(f"Background extraction crashed for job_id={job_id}: {e}", exc_info=True)
-            try:
-                db_session = SessionLocal()
-                job = db_session.query(AnalysisJob).filter(AnalysisJob.id == job_id).first()
-                if job and job.status not in ("extracted", "failed"):
-                    job.status = "failed"
-                    job.error_message = f"Extraction crashed: {str(e)}"
-                    job.updated_at = datetime.utcnow()
-                    db_session.commit()
-                db_session.close()
-            except Exception:
-                pass
-
-    background_tasks.add_task(safe_extraction)
+    try:
+        job_queue.enqueue("extraction", job_id, {
+            "platform_urls": dict(urls_dict),
+            "resume_b64": encode_bytes(resume_bytes),
+            "resume_filename": resume_filename,
+            "candidate_name": candidate_name,
+            "bypass_cache": bypass_cache,
+        })
+    except Exception as e:
+        logger.error(f"Failed to queue extraction for job_id={job_id}: {e}", exc_info=True)
+        job.status = "failed"
+        job.error_message = f"Failed to queue extraction: {str(e)}"
+        db.commit()
+        raise HTTPException(status_code=500, detail="Failed to queue extraction")
 
     return {
         "job_id": job_id,
@@ -202,8 +283,112 @@ async def get_extraction_status(job_id: str, db: Session = Depends(get_db)):
         }
 
     else:
+        # Extraction-phase notices (e.g. waiting on GitHub quota) are published to progress_manager
+        progress = job_queue.current_progress(job_id)
         return {
             "job_id": job_id,
             "status": job.status,
-            "message": f"Current status: {job.status}. Poll again for updates."
+            "progress": progress,
+            "message": progress["message"] if progress else f"Current status: {job.status}. Poll again for updates."
         }
+
+
+@router.post("/extract/{job_id}/refresh")
+async def refresh_extraction(
+    job_id: str,
+    request: Request,
+    platforms: Optional[str] = Form(None),
+    stale_after_hours: Optional[float] = Form(None),
+    current_user: dict | None = Depends(get_optional_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Re-run selected platforms for an existing job instead of starting a new /extract.
+
+    - platforms: JSON list of platform_ids to refresh, e.g. ["github"]
+    - stale_after_hours: otherwise, refresh every platform whose raw_data is older than this
+      (default EXTRACTION_STALE_AFTER_HOURS)
+
+    Only matching raw_data rows are replaced. The resume can't be refreshed — its bytes aren't kept.
+    A job that belongs to a user can only be refreshed by that user.
+    """
+    job = db.query(AnalysisJob).filter(AnalysisJob.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    if job.user_id:
+        if not current_user:
+            raise HTTPException(status_code=401, detail="Sign in to refresh this analysis.")
+        if current_user["id"] != job.user_id:
+            raise HTTPException(status_code=404, detail="Job not found")
+
+    if job.status in ("pending", "extracting", "generating"):
+        raise HTTPException(
+            status_code=409,
+            detail=f"Cannot refresh while the job is {job.status}. Please wait for it to finish."
+        )
+
+    job_urls = dict(job.platform_urls or {})
+
+    if platforms:
+        try:
+            requested = json.loads(platforms)
+            if not isinstance(requested, list):
+                raise ValueError("platforms must be a JSON list")
+        except (json.JSONDecodeError, ValueError) as e:
+            raise HTTPException(status_code=400, detail=f"Invalid platforms: {str(e)}")
+        unknown = [p for p in requested if p not in job_urls]
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Platforms not on this job: {', '.join(unknown)}. Available: {', '.join(job_urls) or 'none'}"
+            )
+        selected = requested
+    else:
+        hours = stale_after_hours if stale_after_hours is not None else settings.extraction_stale_after_hours
+        cutoff = datetime.utcnow() - timedelta(hours=hours)
+        latest = dict(
+            db.query(RawData.data_type, func.max(RawData.fetched_at))
+            .filter(RawData.job_id == job_id, ~RawData.data_type.endswith(PAGE_SUFFIX))
+            .group_by(RawData.data_type)
+            .all()
+        )
+        selected = [p for p in job_urls if latest.get(p) is None or latest[p] < cutoff]
+
+    if not selected:
+        return {
+            "job_id": job_id,
+            "status": job.status,
+            "platforms": [],
+            "message": "All platforms are fresh. Nothing to refresh."
+        }
+
+    # Only an actual refetch counts against the anonymous extraction limit
+    if not current_user:
+        client_ip = request.client.host if request.client else "unknown"
+        _check_rate_limit(client_ip)
+
+    # The refreshed data invalidates any reports — they can be regenerated once extraction finishes
+    previous = (job.status, job.error_message, job.updated_at)
+    job.status = "extracting"
+    job.error_message = None  # the refresh records its own errors
+    job.updated_at = datetime.utcnow()
+    db.commit()
+
+    refresh_urls = {p: job_urls[p] for p in selected}
+    try:
+        job_queue.enqueue("refresh", job_id, {"platform_urls": refresh_urls})
+    except Exception as e:
+        logger.error(f"Failed to queue refresh for job_id={job_id}: {e}", exc_info=True)
+        # Nothing will pick the refresh up — put the job back as it was
+        job.status, job.error_message, job.updated_at = previous
+        db.commit()
+        raise HTTPException(status_code=500, detail="Failed to queue refresh")
+    logger.info(f"Refresh queued for job_id={job_id} — platforms={selected}")
+
+    return {
+        "job_id": job_id,
+        "status": "extracting",
+        "platforms": selected,
+        "message": "Refresh started. Poll GET /api/v1/extract/{job_id} for status."
+    }
@@ -1,14 +1,27 @@
+import asyncio
 import logging
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query, Response
+import time
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from datetime import datetime
 from ..database import get_db, AnalysisJob, Report, SessionLocal
 from ..auth import get_current_user
-from services.report_generator import ReportGenerator
+from services.report_generator import ReportGenerator, PROMPT_TEMPLATE_VERSION
+from services.report_cache import ReportCache, report_cache
+from services.derived_metrics import compute_metrics
+from services.activity_timeline import build_timeline, data_date, strip_calendars
+from services.manifest_analyzer import index_manifests
 from services.raw_data_loader import RawDataLoader
 from services.report_storage import ReportStorageService
 from services.progress_manager import progress_manager
+from services.job_queue import job_queue
+from services.generation_registry import generation_registry, GenerationCancelled
+from services.llm_admission import llm_admission
+from services.draft_stream import draft_buffer
+from services.context_serializer import count_tokens
+from services import llm_telemetry
 from services.email_service import get_email_service, generate_report_pdf
+from app.config import settings
 
 logger = logging.getLogger(__name__)
 
@@ -56,10 +69,13 @@ WEB_SEARCH_MESSAGES = [
 ]
 
 
-def _make_progress_callback(job_id: str, stage: str, pct_start: int, pct_end: int, messages: list):
+def _make_progress_callback(job_id: str, stage: str, pct_start: int, pct_end: int, messages: list, stream: str = None):
     """
     Creates a progress callback for a single report's streaming LLM call.
     Rotates through section-aware messages and increments percentage within the given range.
+
+    With `stream` set (concurrent mode), progress is reported as this stream's completion
+    fraction instead, and progress_manager combines all streams into one percentage.
     """
     state = {"msg_index": 0, "web_search_count": 0}
     pct_range = pct_end - pct_start
@@ -85,6 +101,11 @@ def _make_progress_callback(job_id: str, stage: str, pct_start: int, pct_end: in
             if new_idx != state["msg_index"]:
                 state["msg_index"] = new_idx
                 progress_manager.update_message(job_id, messages[new_idx])
+            if stream:
+                # Expected length ≈ one message per chars_per_message; hold back the last 5% for completion
+                fraction = min(0.95, char_count / (msg_count * chars_per_message))
+                progress_manager.update_stream(job_id, stream, fraction)
+                return
             # Increment percentage proportionally
             pct_step = max(1, pct_range // (msg_count * 2))
             progress_manager.increment_percentage(job_id, pct_step, pct_end)
@@ -92,73 +113,322 @@ def _make_progress_callback(job_id: str, stage: str, pct_start: int, pct_end: in
     return callback
 
 
-def _run_generation_pipeline(job_id: str):
+# =========================================
+# Report specs — one entry per LLM call.
+# pct_start/pct_end are the sequential-mode ranges; weight is the report's
+# share of the combined percentage when the three run concurrently.
+# =========================================
+
+REPORT_SPECS = [
+    {"key": "extensive_report", "type": "extensive", "stage": "generating_extensive",
+     "pct_start": 10, "pct_end": 48, "weight": 3, "messages": EXTENSIVE_MESSAGES},
+    {"key": "developer_insight", "type": "developer", "stage": "generating_developer",
+     "pct_start": 50, "pct_end": 78, "weight": 2, "messages": DEVELOPER_MESSAGES},
+    {"key": "recruiter_insight", "type": "recruiter", "stage": "generating_recruiter",
+     "pct_start": 80, "pct_end": 93, "weight": 1, "messages": RECRUITER_MESSAGES},
+]
+
+async def _generate_report(
+    job_id: str,
+    report_gen: ReportGenerator,
+    spec: dict,
+    context: str,
+    raw_data: dict,
+    stream: bool,
+    usage: dict = None,
+    prefix_ready: asyncio.Event = None,
+    warms_prefix: bool = False,
+    bypass_cache: bool = False,
+    checkpoints: dict = None,
+) -> str:
+    """
+    Run one report's streaming LLM call. Raises on failure.
+
+    checkpoints (report key → {"input_hash", "content"}) holds the reports stored by earlier
+    attempts. One whose input hash matches this call's exact LLM input is reused as is.
+    Every other report is written back to it and persisted as soon as it finishes, so a
+    failed or cancelled job retries only the reports it is missing.
+
+    prefix_ready (concurrent prefix layout): the report with warms_prefix=True sets it once
+    the model starts answering — the shared prompt prefix is cached by then — and the
+    others wait for it (up to LLM_PREFIX_WARMUP_TIMEOUT) so they start on a cache hit.
+
+    Identical inputs (same messages, model and prompt template version) are served from
+    the report cache without an LLM call. bypass_cache skips both checkpoints and cache. Everything else is
+    admitted by llm_admission first — the job's queue position and ETA are published
+    while the call waits for RPM / TPM budget.
+    """
+    warms_prefix = warms_prefix and prefix_ready is not None  # no warm-up under the legacy layout or a 0 timeout
+    messages = report_gen._build_messages(spec["type"], context, raw_data=raw_data)
+    input_hash = ReportCache.make_key(PROMPT_TEMPLATE_VERSION, report_gen.model, spec["type"], messages)
+
+    cached, source = None, None
+    if not bypass_cache:
+        checkpoint = (checkpoints or {}).get(spec["key"])
+        if checkpoint and checkpoint["input_hash"] == input_hash:
+            cached, source = checkpoint["content"], "checkpoint"
+        elif report_cache:
+            cached, source = report_cache.get(input_hash), "report cache"
+    if cached is not None:
+        if warms_prefix:
+            prefix_ready.set()
+        if stream:
+            progress_manager.finish_stream(job_id, spec["type"])
+        if usage is not None:
+            usage[spec["type"]] = {
+                "model": report_gen.model, "status": "ok", "cache_hit": True, "checkpoint": source == "checkpoint",
+                "input_tokens": 0, "cached_tokens": 0, "output_tokens": 0,
+            }
+        if settings.sse_drafts_enabled:
+            draft_buffer.finish(job_id, spec["type"], cached)
+        if source != "checkpoint":
+            await _checkpoint_report(job_id, spec, cached, input_hash, checkpoints)
+        logger.info(f"Report {spec['type']} for {job_id} served from {source}", extra={"job_id": job_id})
+        return cached
+
+    if prefix_ready is not None and not warms_prefix:
+        try:
+            await asyncio.wait_for(prefix_ready.wait(), settings.llm_prefix_warmup_timeout)
+        except asyncio.TimeoutError:
+            logger.info(f"Prefix warm-up timed out for {job_id} — starting {spec['type']} report uncached")
+
+    if stream:
+        callback = _make_progress_callback(job_id, "generating_reports", 10, 93, spec["messages"], stream=spec["type"])
+    else:
+        progress_manager.update(job_id, spec["stage"])
+        callback = _make_progress_callback(job_id, spec["stage"], spec["pct_start"], spec["pct_end"], spec["messages"])
+
+    call_stats = {"status": "ok"}
+    if usage is not None:
+        usage[spec["type"]] = call_stats  # recorded for failed and cancelled calls too
+    estimated_tokens = sum(count_tokens(m["content"]) for m in messages) + settings.llm_admission_output_tokens
+
+    def admit():
+        return llm_admission.slot(
+            job_id, estimated_tokens,
+            on_wait=lambda position, eta: progress_manager.set_queue_position(job_id, position, eta),
+        )
+
+    try:
+        async with admit() as grant:
+            start = time.time()  # report duration excludes the admission wait
+            try:
+                text = await report_gen._call_llm_streaming(
+                    messages,
+                    progress_callback=callback,
+                    call_stats=call_stats,
+                    on_first_output=prefix_ready.set if warms_prefix else None,
+                    on_delta=(lambda delta: draft_buffer.append(job_id, spec["type"], delta))
+                    if settings.sse_drafts_enabled else None,
+                    admit=admit,
+                )
+            finally:
+                # A fallback call settles its own slot
+                if call_stats.get("input_tokens") is not None and not call_stats.get("fallback_used"):
+                    llm_admission.settle(grant, call_stats["input_tokens"] + (call_stats.get("output_tokens") or 0))
+    except asyncio.CancelledError:
+        call_stats["status"] = "cancelled"
+        raise
+    except Exception as e:
+        call_stats.update({"status": "failed", "error": str(e)[:500]})
+        raise
+    finally:
+        if warms_prefix:
+            prefix_ready.set()  # never leave the other reports waiting on a failed call
+
+    if settings.sse_drafts_enabled:
+        draft_buffer.finish(job_id, spec["type"], text)
+    if report_cache and not bypass_cache:
+        report_cache.set(input_hash, spec["type"], report_gen.model, text)
+    await _checkpoint_report(job_id, spec, text, input_hash, checkpoints)
+    if stream:
+        progress_manager.finish_stream(job_id, spec["type"])
+    duration_ms = int((time.time() - start) * 1000)
+    logger.info(
+        f"Report {spec['type']} generated for {job_id} in {duration_ms}ms ({len(text)} chars, "
+        f"{call_stats.get('cached_tokens', 0)}/{call_stats.get('input_tokens', '?')} input tokens cached)",
+        extra={"job_id": job_id, "duration_ms": duration_ms},
+    )
+    return text
+
+
+async def _checkpoint_report(job_id: str, spec: dict, text: str, input_hash: str, checkpoints: dict = None):
+    """Persist a finished report right away. A failed write is retried by the final store."""
+    if checkpoints is None:
+        return
+    checkpoints[spec["key"]] = {"input_hash": input_hash, "content": text}
+    try:
+        await asyncio.to_thread(ReportStorageService().save_report, job_id, spec["key"], text, input_hash)
+    except Exception as e:
+        logger.warning(f"Checkpoint of {spec['type']} report failed for {job_id}: {e}", extra={"job_id": job_id})
+
+
+async def _generate_reports(
+    job_id: str,
+    report_gen: ReportGenerator,
+    context: str,
+    raw_data: dict,
+    usage: dict = None,
+    bypass_cache: bool = False,
+    checkpoints: dict = None,
+) -> dict:
+    """
+    Generate all three reports. All read the same context, so in concurrent mode they run
+    side by side (up to GENERATION_CONCURRENCY at once) and the wall time approaches the
+    slowest single report. The first failure fails the job and cancels the other streams.
+
+    usage, if given, is filled with each report's call telemetry (see ReportGenerator._call_llm_streaming).
+    checkpoints: reports stored by earlier attempts, updated as reports finish (see _generate_report).
+    """
+    if not settings.generation_concurrent:
+        # One after another — the 2nd and 3rd calls hit the prefix cached by the 1st
+        return {
+            spec["key"]: await _generate_report(
+                job_id, report_gen, spec, context, raw_data, stream=False, usage=usage,
+                bypass_cache=bypass_cache, checkpoints=checkpoints,
+            )
+            for spec in REPORT_SPECS
+        }
+
+    progress_manager.start_streams(
+        job_id, "generating_reports",
+        weights={spec["type"]: spec["weight"] for spec in REPORT_SPECS},
+        pct_start=10, pct_end=93,
+    )
+
+    # The first report warms the shared prefix; the rest start once it is cached
+    prefix_ready = None
+    if settings.llm_prompt_layout.lower() != "legacy" and settings.llm_prefix_warmup_timeout > 0:
+        prefix_ready = asyncio.Event()
+
+    slots = asyncio.Semaphore(max(1, settings.generation_concurrency))
+
+    async def run(spec: dict, warms_prefix: bool) -> str:
+        async with slots:
+            return await _generate_report(
+                job_id, report_gen, spec, context, raw_data, True,
+                usage, prefix_ready, warms_prefix, bypass_cache, checkpoints,
+            )
+
+    start = time.time()
+    tasks = {
+        asyncio.create_task(run(spec, prefix_ready is not None and index == 0), name=f"report-{spec['type']}-{job_id[:8]}"): spec["key"]
+        for index, spec in enumerate(REPORT_SPECS)
+    }
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        for task in done:
+            task.result()  # re-raise the first failure
+        reports = {key: task.result() for task, key in tasks.items()}
+    finally:
+        # On failure or cancellation, abort the streams still running — their output is discarded anyway
+        pending = [task for task in tasks if not task.done()]
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    duration_ms = int((time.time() - start) * 1000)
+    logger.info(
+        f"All reports generated concurrently for {job_id} in {duration_ms}ms",
+        extra={"job_id": job_id, "duration_ms": duration_ms},
+    )
+    return reports
+
+
+def _run_reports(job_id: str, report_gen: ReportGenerator, context: str, raw_data: dict, **kwargs) -> dict:
+    """
+    Drive _generate_reports on an event loop owned by this worker thread. The task is
+    registered with generation_registry so DELETE /generate/{job_id} can cancel it;
+    cancellation surfaces here as GenerationCancelled.
+    """
+    async def main():
+        generation_registry.attach(job_id, asyncio.current_task())
+        try:
+            # One place in the LLM admission queue for all of this job's calls
+            with llm_admission.job(job_id):
+                return await _generate_reports(job_id, report_gen, context, raw_data, **kwargs)
+        finally:
+            await report_gen.async_client.close()
+
+    try:
+        return asyncio.run(main())
+    except asyncio.CancelledError:
+        raise GenerationCancelled(f"Generation cancelled for {job_id}")
+
+
+def _run_generation_pipeline(job_id: str, bypass_cache: bool = False):
     """
     Pipeline with streaming progress tracking:
     1. Load raw platform data
-    2. Generate each report with streaming LLM calls (live progress messages)
-    3. Store reports
+    2. Generate the three reports with streaming LLM calls (concurrently unless
+       GENERATION_CONCURRENT=false), with live progress messages. Each report is
+       checkpointed as it finishes; a retry reuses checkpoints whose input is unchanged
+    3. Store raw signals and context stats alongside the reports
     4. Send email
+
+    DELETE /generate/{job_id} cancels the pipeline up to the storing phase: in-flight
+    LLM streams are closed and the job ends in the "cancelled" stage.
     """
     db = SessionLocal()
+    generation_registry.start(job_id)
+    draft_buffer.start(job_id)
+    usage = {}  # report type → LLM call telemetry, stored in llm_calls whatever the outcome
 
     try:
         job = db.query(AnalysisJob).filter(AnalysisJob.id == job_id).first()
         if not job:
             return
 
-        # Delete any old reports from previous attempts (retry support)
-        db.query(Report).filter(Report.job_id == job_id).delete()
-        db.commit()
+        # Reports finished by earlier attempts — reused while their LLM input is unchanged
+        storage = ReportStorageService()
+        checkpoints = storage.get_checkpoints(job_id)
 
         # Phase 1: Load raw platform data
         progress_manager.update(job_id, "loading_data")
         loader = RawDataLoader(db)
         raw_data = loader.load_job_raw_data(job_id)
+        generation_registry.raise_if_cancelled(job_id)
 
-        # Phase 2: Generate reports with streaming progress
+        # Phase 2: Generate reports with streaming progress (10% → 93%)
         report_gen = ReportGenerator()
-        context = report_gen._build_llm_context(raw_data)
-
-        # Extensive report: 10% → 48%
-        progress_manager.update(job_id, "generating_extensive")
-        extensive_cb = _make_progress_callback(job_id, "generating_extensive", 10, 48, EXTENSIVE_MESSAGES)
-        extensive = report_gen._call_llm_streaming(
-            report_gen._build_system_message("extensive", raw_data=raw_data),
-            report_gen._extensive_prompt(context),
-            progress_callback=extensive_cb,
+        # Deterministic stages before the LLM: exact aggregates, unified activity timeline, dependency index
+        as_of = data_date(raw_data, loader.fetched_at)  # the day the data describes — anchors every time window
+        report_gen.as_of = as_of
+        metrics = compute_metrics(raw_data, today=as_of) if settings.llm_precomputed_metrics else {}
+        context_data = raw_data
+        if settings.llm_activity_timeline:
+            timeline = build_timeline(raw_data, today=as_of)
+            if timeline:
+                metrics["activity_timeline"] = timeline
+                context_data = strip_calendars(raw_data)
+        if settings.llm_dependency_index:
+            context_data, dependencies = index_manifests(context_data)
+            if dependencies:
+                metrics["dependencies"] = dependencies
+        context = report_gen._build_llm_context(context_data, metrics=metrics or None)
+        stats = report_gen.context_stats
+        logger.info(
+            f"LLM context for {job_id} ({stats['format']}): {stats['tokens_before']} → {stats['tokens_after']} tokens "
+            f"per report, x{len(REPORT_SPECS)} reports"
+            + (f", {len(stats['pruning'])} pruning steps to fit {stats['budget']}" if stats["pruning"] else ""),
+            extra={"job_id": job_id},
         )
-
-        # Developer report: 50% → 78%
-        progress_manager.update(job_id, "generating_developer")
-        developer_cb = _make_progress_callback(job_id, "generating_developer", 50, 78, DEVELOPER_MESSAGES)
-        developer = report_gen._call_llm_streaming(
-            report_gen._build_system_message("developer", raw_data=raw_data),
-            report_gen._developer_prompt(context),
-            progress_callback=developer_cb,
+        reports = _run_reports(
+            job_id, report_gen, context, raw_data, usage=usage, bypass_cache=bypass_cache, checkpoints=checkpoints,
         )
+        reused = [report_type for report_type, call in usage.items() if call.get("checkpoint")]
+        if reused:
+            logger.info(f"Reused checkpointed {', '.join(reused)} reports for {job_id}", extra={"job_id": job_id})
 
-        # Recruiter report: 80% → 93%
-        progress_manager.update(job_id, "generating_recruiter")
-        recruiter_cb = _make_progress_callback(job_id, "generating_recruiter", 80, 93, RECRUITER_MESSAGES)
-        recruiter = report_gen._call_llm_streaming(
-            report_gen._build_system_message("recruiter", raw_data=raw_data),
-            report_gen._recruiter_prompt(context),
-            progress_callback=recruiter_cb,
-        )
-
-        reports = {
-            "extensive_report": extensive,
-            "developer_insight": developer,
-            "recruiter_insight": recruiter,
-        }
-
-        # Phase 3: Store
+        # Phase 3: Store — the last point a cancel takes effect; after this the reports are kept
+        generation_registry.seal(job_id)
         progress_manager.update(job_id, "storing")
-        storage = ReportStorageService()
         storage.save_reports(job_id, {
             "raw_data": raw_data,
             "reports": reports,
+            "input_hashes": {key: checkpoint["input_hash"] for key, checkpoint in checkpoints.items()},
+            "context_stats": stats,
         })
 
         # Phase 4: Send email
@@ -184,6 +454,22 @@ def _run_generation_pipeline(job_id: str):
         job.updated_at = datetime.utcnow()
         db.commit()
 
+    except GenerationCancelled:
+        if generation_registry.is_abandoned(job_id):
+            # Lease lost — the worker that reclaimed the task owns the job's status now
+            logger.warning(f"Generation pipeline for {job_id} stopped after losing its queue lease", extra={"job_id": job_id})
+            job_queue.discard_progress(job_id)
+            progress_manager.clear(job_id, notify=False)
+            return
+        logger.info(f"Generation pipeline cancelled for {job_id}", extra={"job_id": job_id})
+        progress_manager.update(job_id, "cancelled")
+        job = db.query(AnalysisJob).filter(AnalysisJob.id == job_id).first()
+        if job:
+            job.status = "cancelled"
+            job.error_message = None
+            job.updated_at = datetime.utcnow()
+            db.commit()
+
     except Exception as e:
         logger.error(f"Generation pipeline failed for {job_id}: {e}", exc_info=True)
         progress_manager.update(job_id, "failed")
@@ -194,10 +480,38 @@ def _run_generation_pipeline(job_id: str):
             job.updated_at = datetime.utcnow()
             db.commit()
 
+    finally:
+        llm_telemetry.record_calls(job_id, usage)
+        generation_registry.finish(job_id)
+        db.close()
+
+
+def _generation_pending(job_id: str) -> bool:
+    """POST /generate/{job_id} sets "generating"; any other status means an earlier attempt already finished."""
+    db = SessionLocal()
+    try:
+        job = db.query(AnalysisJob).filter(AnalysisJob.id == job_id).first()
+        return bool(job) and job.status == "generating"
     finally:
         db.close()
 
 
+async def run_generation_task(job_id: str, payload: dict):
+    """
+    Queue handler for POST /generate/{job_id}. The pipeline is synchronous (it runs its own event loop for the LLM streams).
+
+    A task reclaimed from a dead worker runs again; a job that already completed, failed
+    or was cancelled is skipped so its reports, email and cancel are not redone.
+    """
+    while generation_registry.is_running(job_id):
+        # An abandoned attempt in this process is still winding down — never run two pipelines for one job
+        await asyncio.sleep(0.5)
+    if not await asyncio.to_thread(_generation_pending, job_id):
+        logger.info(f"Generation for {job_id} already finished — skipping", extra={"job_id": job_id})
+        return
+    await asyncio.to_thread(_run_generation_pipeline, job_id, payload.get("bypass_cache", False))
+
+
 # =========================================
 # User report history — MUST be registered before /generate/{job_id}
 # because FastAPI matches routes in order and {job_id} would swallow "user".
@@ -254,13 +568,14 @@ async def get_user_reports(
 @router.post("/generate/{job_id}")
 async def generate_reports(
     job_id: str,
-    background_tasks: BackgroundTasks,
+    bypass_cache: bool = Query(False),
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
     Generate intelligence reports from previously extracted raw data.
-    Requires authentication. Supports retries — allows 'extracted', 'failed', or 'generating' status.
+    Requires authentication. Supports retries — allows 'extracted', 'failed' or 'cancelled' status.
+    Reports whose inputs are unchanged are served from the report cache unless bypass_cache=true.
     """
 
     job = db.query(AnalysisJob).filter(AnalysisJob.id == job_id).first()
@@ -282,7 +597,7 @@ async def generate_reports(
             detail="Reports have already been generated for this analysis."
         )
 
-    allowed = ["extracted", "failed"]
+    allowed = ["extracted", "failed", "cancelled"]
     if job.status not in allowed:
         raise HTTPException(
             status_code=400,
@@ -299,8 +614,15 @@ async def generate_reports(
     # Initialize progress tracking
     progress_manager.init(job_id)
 
-    # Run generation in background
-    background_tasks.add_task(_run_generation_pipeline, job_id)
+    # Run generation on a queue worker
+    try:
+        job_queue.enqueue("generation", job_id, {"bypass_cache": bypass_cache})
+    except Exception as e:
+        logger.error(f"Failed to queue generation for {job_id}: {e}", exc_info=True)
+        job.status = "failed"
+        job.error_message = f"Failed to queue generation: {str(e)}"
+        db.commit()
+        raise HTTPException(status_code=500, detail="Failed to queue report generation")
 
     return {
         "job_id": job_id,
@@ -309,6 +631,58 @@ async def generate_reports(
     }
 
 
+@router.delete("/generate/{job_id}")
+async def cancel_generation(
+    job_id: str,
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Cancel a running generation. In-flight LLM streams are closed so no further tokens
+    are spent; the job ends in the 'cancelled' stage and can be generated again later.
+    Refused (409) once the reports are being stored.
+    """
+    job = db.query(AnalysisJob).filter(
+        AnalysisJob.id == job_id,
+        AnalysisJob.user_id == current_user["id"],
+    ).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    if job.status != "generating":
+        raise HTTPException(
+            status_code=409,
+            detail=f"Nothing to cancel. Current status: {job.status}"
+        )
+
+    accepted = generation_registry.cancel(job_id)
+    if accepted is None:
+        # Not running in this process — dequeue it, or ask the worker running it to stop
+        accepted = True if job_queue.request_cancel(job_id) == "running" else None
+    if accepted is False:
+        raise HTTPException(
+            status_code=409,
+            detail="Reports are already being stored and can no longer be cancelled."
+        )
+
+    if accepted is None:
+        # Still queued, or no pipeline anywhere (e.g. lost in a restart) — finalize the job here
+        progress_manager.update(job_id, "cancelled")
+        job.status = "cancelled"
+        job.error_message = None
+        job.updated_at = datetime.utcnow()
+        db.commit()
+
+    logger.info(f"Generation cancel for {job_id} by user={current_user['id']}", extra={"job_id": job_id})
+
+    return {
+        "job_id": job_id,
+        "status": "cancelling" if accepted else "cancelled",
+        "message": "Cancellation requested. The SSE stream ends with stage 'cancelled'." if accepted
+        else "Report generation cancelled.",
+    }
+
+
 @router.get("/generate/{job_id}")
 async def get_generation_status(job_id: str, db: Session = Depends(get_db)):
     """Get report generation status and results."""
@@ -333,8 +707,15 @@ async def get_generation_status(job_id: str, db: Session = Depends(get_db)):
             "error": job.error_message
         }
 
+    elif job.status == "cancelled":
+        return {
+            "job_id": job_id,
+            "status": "cancelled",
+            "message": "Report generation was cancelled. POST /generate/{job_id} to start again."
+        }
+
     else:
-        progress = progress_manager.get(job_id)
+        progress = job_queue.current_progress(job_id)
         return {
             "job_id": job_id,
             "status": job.status,
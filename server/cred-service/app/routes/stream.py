@@ -1,22 +1,66 @@
 import logging
 import asyncio
 import json
-from fastapi import APIRouter, HTTPException
+import time
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query
 from fastapi.responses import StreamingResponse
 from ..database import AnalysisJob, SessionLocal
-from services.progress_manager import progress_manager
+from services.progress_manager import progress_manager, STAGES, TERMINAL_STAGES
+from services.job_queue import job_queue
+from services.draft_stream import draft_buffer
+from app.config import settings
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+KEEPALIVE_INTERVAL = 15.0  # seconds — an SSE comment keeps idle connections open through proxies
+
+
+def _final_event_from_db(job_id: str) -> Optional[dict]:
+    """Terminal event for a job that is already done but has no progress tracked here."""
+    db = SessionLocal()
+    try:
+        job = db.query(AnalysisJob).filter(AnalysisJob.id == job_id).first()
+        if not job or job.status not in TERMINAL_STAGES:
+            return None
+        if job.status == "completed":
+            message = "Complete!"
+        elif job.status == "cancelled":
+            message = STAGES["cancelled"]["msg"]
+        else:
+            message = job.error_message or "Failed"
+        return {
+            "stage": job.status,
+            "status": job.status,
+            "percentage": 100 if job.status == "completed" else 0,
+            "message": message,
+            "timestamp": job.updated_at.isoformat() if job.updated_at else "",
+        }
+    finally:
+        db.close()
+
 
 @router.get("/generate/{job_id}/stream")
-async def stream_generation_progress(job_id: str):
+async def stream_generation_progress(job_id: str, drafts: bool = Query(False)):
     """
     Server-Sent Events endpoint for real-time generation progress.
     Frontend connects: const es = new EventSource('/api/v1/generate/{job_id}/stream')
 
+    Push-based: the connection subscribes to progress_manager and sleeps until the job
+    changes, so updates go out immediately and an idle stream costs nothing but a
+    keepalive comment every KEEPALIVE_INTERVAL seconds. Only a job that is not running
+    in this process (a separate queue worker, or already finished) is polled — every
+    SSE_REMOTE_POLL_INTERVAL seconds, via the job_queue progress mirror and the job row.
+
+    With ?drafts=true the report text is streamed too, as it is generated: named
+    events `draft.extensive`, `draft.developer` and `draft.recruiter`, each carrying
+    {"report", "offset", "text", "done", "reset"}. Deltas are coalesced into at most one
+    chunk per report every SSE_DRAFT_INTERVAL seconds (services/draft_stream.py).
+    Drafts exist only in the process running the job: when it runs elsewhere, a single
+    `drafts.unavailable` event says so and the stream carries progress only.
+
     Uses short-lived DB sessions instead of Depends(get_db) to avoid
     pinning a connection pool slot for the entire stream lifetime.
     """
@@ -30,39 +74,92 @@ async def stream_generation_progress(job_id: str):
     finally:
         db.close()
 
+    stream_drafts = drafts and settings.sse_drafts_enabled
+
     async def event_stream():
         timeout = 600  # 10 minutes max
-        elapsed = 0
-
-        while elapsed < timeout:
-            progress = progress_manager.get(job_id)
+        started = time.monotonic()
+        cursors = {}  # report → draft cursor
+        last_payload = None
+        next_poll_at = 0.0  # remote jobs only
+        next_draft_at = 0.0
+        drafts_due = stream_drafts  # drafts written before this connection, or a backlog over the chunk cap
+        drafts_refused = False
+        last_sent_at = started
+        max_chars = settings.sse_draft_max_chunk_chars
 
-            if progress:
-                yield f"data: {json.dumps(progress)}\n\n"
+        def draft_events(flush: bool = False):
+            nonlocal drafts_due
+            while True:
+                chunks = draft_buffer.read(job_id, cursors, max_chars)
+                for chunk in chunks:
+                    yield f"event: draft.{chunk['report']}\ndata: {json.dumps(chunk)}\n\n"
+                drafts_due = any(len(chunk["text"]) >= max_chars for chunk in chunks)
+                if not flush or not chunks:
+                    return
 
-                # Stop streaming on terminal states
-                if progress["stage"] in ("completed", "failed"):
+        with progress_manager.subscribe(job_id, drafts=stream_drafts) as subscription:
+            while True:
+                now = time.monotonic()
+                if now - started >= timeout:
                     break
-            else:
-                # Job might already be done (no progress tracked) — check DB
-                check_db = SessionLocal()
-                try:
-                    check_job = check_db.query(AnalysisJob).filter(AnalysisJob.id == job_id).first()
-                    if check_job and check_job.status in ("completed", "failed"):
-                        final = {
-                            "stage": check_job.status,
-                            "status": check_job.status,
-                            "percentage": 100 if check_job.status == "completed" else 0,
-                            "message": "Complete!" if check_job.status == "completed" else (check_job.error_message or "Failed"),
-                            "timestamp": (check_job.updated_at or "").isoformat() if check_job.updated_at else "",
-                        }
-                        yield f"data: {json.dumps(final)}\n\n"
-                        break
-                finally:
-                    check_db.close()
-
-            await asyncio.sleep(1)
-            elapsed += 1
+
+                if stream_drafts and (drafts_due or subscription.drafts_pending) and now >= next_draft_at:
+                    subscription.take_drafts()
+                    for event in draft_events():
+                        last_sent_at = now
+                        yield event
+                    next_draft_at = now + settings.sse_draft_interval
+
+                progress = progress_manager.get(job_id)
+                running_here = bool(progress) and progress.get("stage") != "pending"
+                if not running_here:
+                    progress = None  # nothing new from this process until the next poll
+                    if now >= next_poll_at:
+                        next_poll_at = now + settings.sse_remote_poll_interval
+                        # The snapshot mirrored by the queue worker running the job elsewhere —
+                        # sync queries, so off the event loop every stream shares
+                        progress = await asyncio.to_thread(job_queue.current_progress, job_id)
+                        if not progress:
+                            # Job might already be done (no progress tracked) — check DB
+                            final = await asyncio.to_thread(_final_event_from_db, job_id)
+                            if final:
+                                yield f"data: {json.dumps(final)}\n\n"
+                                break
+
+                if progress and stream_drafts and not running_here and not drafts_refused \
+                        and progress["stage"] not in TERMINAL_STAGES and progress["stage"] != "pending":
+                    # Running in another worker process — its drafts can't reach this connection
+                    drafts_refused = True
+                    notice = {"reason": "the job runs in another worker process — progress only"}
+                    yield f"event: drafts.unavailable\ndata: {json.dumps(notice)}\n\n"
+
+                if progress:
+                    payload = json.dumps(progress)
+                    if payload != last_payload:
+                        last_payload = payload
+                        terminal = progress["stage"] in TERMINAL_STAGES
+                        if terminal and stream_drafts:
+                            # Send the rest of every draft before the event that ends the stream
+                            for event in draft_events(flush=True):
+                                yield event
+                        last_sent_at = now
+                        yield f"data: {payload}\n\n"
+
+                        # Stop streaming on terminal states
+                        if terminal:
+                            break
+
+                # Sleep until something changes — or the next remote poll, held-back drafts or keepalive
+                deadlines = [last_sent_at + KEEPALIVE_INTERVAL, started + timeout]
+                if not running_here:
+                    deadlines.append(next_poll_at)
+                if stream_drafts and (drafts_due or subscription.drafts_pending):
+                    deadlines.append(next_draft_at)
+                if not await subscription.wait(max(0.0, min(deadlines) - time.monotonic())):
+                    if time.monotonic() - last_sent_at >= KEEPALIVE_INTERVAL:
+                        last_sent_at = time.monotonic()
+                        yield ": keepalive\n\n"
 
     return StreamingResponse(
         event_stream(),
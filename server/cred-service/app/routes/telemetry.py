@@ -0,0 +1,80 @@
+import logging
+from datetime import datetime, timedelta
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from ..database import get_db, AnalysisJob, LLMCall
+from ..auth import get_current_user
+from app.config import settings
+from services.llm_telemetry import serialize_call, summarize, summarize_by
+from services.report_storage import ReportStorageService
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+@router.get("/generate/{job_id}/telemetry")
+async def get_job_telemetry(
+    job_id: str,
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Every LLM call made for a job (all generation attempts), with totals and the stored context budget."""
+    job = db.query(AnalysisJob).filter(
+        AnalysisJob.id == job_id,
+        AnalysisJob.user_id == current_user["id"],
+    ).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    calls = (
+        db.query(LLMCall)
+        .filter(LLMCall.job_id == job_id)
+        .order_by(LLMCall.created_at, LLMCall.id)
+        .all()
+    )
+
+    return {
+        "job_id": job_id,
+        "calls": [serialize_call(call) for call in calls],
+        "totals": summarize(calls),
+        "context_budget": ReportStorageService().get_reports(job_id, include_internal=True).get("context_budget"),
+    }
+
+
+def _is_telemetry_admin(current_user: dict) -> bool:
+    admin_ids = {uid.strip() for uid in settings.llm_telemetry_admin_ids.split(",") if uid.strip()}
+    return current_user["id"] in admin_ids
+
+
+@router.get("/llm/telemetry")
+async def get_llm_telemetry(
+    hours: float = Query(24, gt=0, le=24 * 90),
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Aggregate LLM usage, latency and cost over the last `hours`, overall and grouped
+    by report type and by model — for finding slow or expensive report types.
+
+    Covers the caller's own jobs; users listed in LLM_TELEMETRY_ADMIN_IDS see every job.
+    """
+    since = datetime.utcnow() - timedelta(hours=hours)
+    query = db.query(LLMCall).filter(LLMCall.created_at >= since)
+    scope = "all" if _is_telemetry_admin(current_user) else "user"
+    if scope == "user":
+        query = query.join(AnalysisJob, AnalysisJob.id == LLMCall.job_id).filter(
+            AnalysisJob.user_id == current_user["id"],
+        )
+    calls = query.all()
+
+    logger.info(f"LLM telemetry for last {hours}h: {len(calls)} calls (user={current_user['id']}, scope={scope})")
+
+    return {
+        "since": since.isoformat(),
+        "window_hours": hours,
+        "scope": scope,
+        "overall": summarize(calls),
+        "by_report_type": summarize_by(calls, "report_type"),
+        "by_model": summarize_by(calls, "model"),
+    }
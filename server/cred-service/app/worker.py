@@ -0,0 +1,58 @@
+"""
+Standalone queue worker: `python -m app.worker` (from server/cred-service).
+
+Runs extraction, refresh and generation tasks from the job_queue table so LLM-heavy
+work stays out of the web process. Set JOB_QUEUE_EMBEDDED=false on the web service
+when workers run separately; add workers (or raise JOB_QUEUE_CONCURRENCY) to scale.
+"""
+
+import asyncio
+import logging
+import signal
+import sys
+import os
+
+# Ensure the cred-service root is on the path so "services" can be imported
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from .config import settings
+from .logging_config import setup_logging
+from .database import init_db
+from .routes.extract import run_extraction_task, run_refresh_task
+from .routes.generate import run_generation_task
+from services.http_clients import http_clients
+from services import resume_parser
+from services.queue_worker import QueueWorker
+
+logger = logging.getLogger(__name__)
+
+# Task kind → handler
+HANDLERS = {
+    "extraction": run_extraction_task,
+    "refresh": run_refresh_task,
+    "generation": run_generation_task,
+}
+
+
+async def _run():
+    worker = QueueWorker(HANDLERS)
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+
+    http_clients.start()
+    try:
+        await worker.run()
+    finally:
+        await http_clients.aclose()
+        resume_parser.shutdown_pool()
+
+
+def main():
+    setup_logging(debug=settings.debug, log_level=settings.log_level)
+    init_db()
+    asyncio.run(_run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""
+Unified activity timeline.
+
+Parses GitHub's contributionCalendar (weeks → contributionDays) and LeetCode's
+userCalendar.submissionCalendar (JSON string of epoch → count) into fixed-length
+daily arrays over the TIMELINE_DAYS days ending on `today` (index 0 = oldest), then
+summarizes them per platform and combined:
+
+  - activity windows   : active days / totals over 30, 90 and 365 days
+  - streaks            : current and longest run of active days (with dates)
+  - weekly cadence     : active days in each of the last 12 weeks, active weeks of 52
+  - gaps               : longest runs of combined inactivity ≥ MIN_GAP_DAYS
+
+The summary goes into the PRECOMPUTED METRICS block and the raw calendars are
+stripped from the LLM context (see strip_calendars), replacing ~365 day objects
+plus the submission-calendar blob with a few hundred bytes.
+
+`today` is the day the calendars were fetched (see data_date), not the day the report
+is generated — otherwise a job generated a week after extraction would show a week
+of false inactivity, and its summary (and so its LLM input) would change daily.
+"""
+
+import copy
+import json
+import logging
+from array import array
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+TIMELINE_DAYS = 365
+MIN_GAP_DAYS = 14
+MAX_GAPS = 5
+CADENCE_WEEKS = 12
+
+
+def data_date(raw_data: Dict[str, Any], fetched_at: Dict[str, datetime]) -> date:
+    """
+    Anchor day for the timeline: when the calendar platforms were last fetched
+    (RawDataLoader.fetched_at), else the GitHub calendar's last day, else today (UTC).
+    """
+    fetched = [fetched_at[p] for p in ("github", "leetcode") if fetched_at.get(p)]
+    if fetched:
+        return max(fetched).date()
+    days = [
+        day.get("date")
+        for week in (_github_calendar(raw_data) or {}).get("weeks") or []
+        for day in (week or {}).get("contributionDays") or []
+    ]
+    try:
+        return max(date.fromisoformat(d[:10]) for d in days if d)
+    except (TypeError, ValueError):
+        return datetime.utcnow().date()
+
+
+def build_timeline(raw_data: Dict[str, Any], today: Optional[date] = None) -> Optional[Dict[str, Any]]:
+    """Summary dict, or None when neither calendar is available. Never raises."""
+    today = today or datetime.utcnow().date()
+    start = today - timedelta(days=TIMELINE_DAYS - 1)
+    try:
+        series = {}
+        github = _github_series(raw_data, start)
+        if github is not None:
+            series["github"] = github
+        leetcode = _leetcode_series(raw_data, start)
+        if leetcode is not None:
+            series["leetcode"] = leetcode
+        if not series:
+            return None
+
+        combined = array("I", bytes(4 * TIMELINE_DAYS))
+        for values in series.values():
+            for i, count in enumerate(values):
+                combined[i] += count
+
+        summary = {
+            "window": f"{start.isoformat()}..{today.isoformat()}",
+            "combined": _summarize(combined, start, with_gaps=True),
+        }
+        for platform_id, values in series.items():
+            summary[platform_id] = _summarize(values, start, with_gaps=False)
+        return summary
+    except Exception as e:
+        logger.warning(f"Activity timeline failed: {e}", exc_info=True)
+        return None
+
+
+def strip_calendars(raw_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of raw_data without the day-level calendars the timeline summarizes. raw_data is not modified."""
+    stripped = dict(raw_data)
+
+    calendar = _github_calendar(raw_data)
+    if calendar and "weeks" in calendar:
+        stripped["github"] = copy.deepcopy(raw_data["github"])
+        del _github_calendar(stripped)["weeks"]
+
+    user_calendar = _leetcode_calendar(raw_data)
+    if user_calendar and "submissionCalendar" in user_calendar:
+        stripped["leetcode"] = copy.deepcopy(raw_data["leetcode"])
+        del _leetcode_calendar(stripped)["submissionCalendar"]
+
+    return stripped
+
+
+# ---------------------------
+# PARSING
+# ---------------------------
+
+def _github_calendar(raw_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    user = (raw_data.get("github") or {}).get("data")
+    if not isinstance(user, dict):
+        return None
+    return (user.get("contributionsCollection") or {}).get("contributionCalendar")
+
+
+def _leetcode_calendar(raw_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    data = (raw_data.get("leetcode") or {}).get("data")
+    if not isinstance(data, dict):
+        return None
+    return (data.get("matchedUser") or {}).get("userCalendar")
+
+
+def _github_series(raw_data: Dict[str, Any], start: date) -> Optional[array]:
+    calendar = _github_calendar(raw_data)
+    if not calendar or not calendar.get("weeks"):
+        return None
+    values = array("I", bytes(4 * TIMELINE_DAYS))
+    for week in calendar["weeks"]:
+        for day in (week or {}).get("contributionDays") or []:
+            try:
+                index = (date.fromisoformat(day["date"][:10]) - start).days
+            except (KeyError, TypeError, ValueError):
+                continue
+            if 0 <= index < TIMELINE_DAYS:
+                values[index] += day.get("contributionCount") or 0
+    return values
+
+
+def _leetcode_series(raw_data: Dict[str, Any], start: date) -> Optional[array]:
+    calendar = _leetcode_calendar(raw_data)
+    raw = (calendar or {}).get("submissionCalendar")
+    if not raw:
+        return None
+    try:
+        days = json.loads(raw) if isinstance(raw, str) else raw
+    except ValueError:
+        return None
+    values = array("I", bytes(4 * TIMELINE_DAYS))
+    for timestamp, count in (days or {}).items():
+        try:
+            index = (datetime.utcfromtimestamp(int(timestamp)).date() - start).days
+            if 0 <= index < TIMELINE_DAYS:
+                values[index] += int(count)
+        except (TypeError, ValueError, OverflowError):
+            continue
+    return values
+
+
+# ---------------------------
+# SUMMARIES
+# ---------------------------
+
+def _summarize(values: array, start: date, with_gaps: bool) -> Dict[str, Any]:
+    last = len(values) - 1
+    active_indexes = [i for i, count in enumerate(values) if count]
+
+    windows = {}
+    for days in (30, 90, 365):
+        window = values[-days:]
+        windows[f"last_{days}_days"] = {
+            "active_days": sum(1 for count in window if count),
+            "total": sum(window),
+        }
+
+    # Streaks — runs of consecutive active days
+    longest = (0, None)
+    run_start = None
+    for i in range(len(values) + 1):
+        active = i < len(values) and values[i] > 0
+        if active and run_start is None:
+            run_start = i
+        elif not active and run_start is not None:
+            if i - run_start > longest[0]:
+                longest = (i - run_start, run_start)
+            run_start = None
+
+    # A streak still counts as current if the last activity was yesterday (today may not be over)
+    current = 0
+    i = last if values[last] else last - 1
+    while i >= 0 and values[i]:
+        current += 1
+        i -= 1
+
+    # Weekly cadence — complete 7-day buckets ending today
+    weeks = [sum(1 for count in values[end - 7:end] if count) for end in range(len(values), 6, -7)]
+    summary = {
+        **windows,
+        "current_streak_days": current,
+        "longest_streak": {
+            "days": longest[0],
+            "start": _day(start, longest[1]),
+            "end": _day(start, longest[1] + longest[0] - 1),
+        } if longest[0] else None,
+        "days_since_last_active": (last - active_indexes[-1]) if active_indexes else None,
+        "first_active_in_window": _day(start, active_indexes[0]) if active_indexes else None,
+        "weekly_active_days_last_12_weeks": list(reversed(weeks[:CADENCE_WEEKS])),
+        "active_weeks_of_52": sum(1 for week in weeks[:52] if week),
+    }
+    if with_gaps:
+        summary["gaps"] = _gaps(values, start)
+    return summary
+
+
+def _gaps(values: array, start: date) -> List[Dict[str, Any]]:
+    """Longest runs of inactivity of at least MIN_GAP_DAYS, newest first among equals."""
+    gaps = []
+    run_start = None
+    for i in range(len(values) + 1):
+        idle = i < len(values) and values[i] == 0
+        if idle and run_start is None:
+            run_start = i
+        elif not idle and run_start is not None:
+            if i - run_start >= MIN_GAP_DAYS:
+                gaps.append({
+                    "start": _day(start, run_start),
+                    "end": _day(start, i - 1),
+                    "days": i - run_start,
+                    "ongoing": i == len(values),
+                })
+            run_start = None
+    gaps.sort(key=lambda gap: (gap["days"], gap["start"]), reverse=True)
+    return gaps[:MAX_GAPS]
+
+
+def _day(start: date, index: Optional[int]) -> Optional[str]:
+    return (start + timedelta(days=index)).isoformat() if index is not None else None
@@ -0,0 +1,248 @@
+"""
+Token budget for the LLM context.
+
+When the serialized context is larger than LLM_CONTEXT_TOKEN_BUDGET, a copy of the
+raw data is trimmed step by step — lowest-value signal first — and re-measured
+after each step until it fits:
+
+  1. contest history entries the candidate did not attend
+  2. GitHub contribution calendar → monthly totals
+  3. LeetCode submission calendar → monthly totals
+  4. LeetCode recent submissions → most recent LEETCODE_KEEP_SUBMISSIONS
+  5. dependency manifest text in production signals (byte sizes are kept; a no-op once
+     services/manifest_analyzer has replaced it with the dependency index)
+  6. GitHub repositories, lowest stars / least recently pushed first (pinned repos kept)
+  7. GitHub pull requests, oldest first
+  8. web-search profile text, longest first
+  9. resume text (last resort)
+
+Repeatable steps run again while the context is still over budget. Each applied step
+is recorded as a decision ({step, platform, detail, tokens_before, tokens_after}) so
+the pruning is visible on the job. The stored raw_signals are never modified.
+"""
+
+import copy
+import json
+import logging
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from services.context_serializer import count_tokens
+from services.manifest_analyzer import DEPENDENCY_MANIFESTS
+
+logger = logging.getLogger(__name__)
+
+MIN_REPOS = 10
+MIN_PULL_REQUESTS = 10
+LEETCODE_KEEP_SUBMISSIONS = 20
+MIN_TEXT_CHARS = 2000
+TRIM_FRACTION = 0.25  # share of the remaining droppable items removed per round
+TRUNCATION_MARKER = "\n[... truncated to fit the context budget]"
+
+
+# ---------------------------
+# PRUNING STEPS
+# Each step mutates the data copy and returns (platform, detail), or None when it has nothing left to do.
+# ---------------------------
+
+def _github_user(data: Dict) -> Optional[Dict]:
+    user = (data.get("github") or {}).get("data")
+    return user if isinstance(user, dict) else None
+
+
+def _leetcode_data(data: Dict) -> Optional[Dict]:
+    payload = (data.get("leetcode") or {}).get("data")
+    return payload if isinstance(payload, dict) else None
+
+
+def _drop_unattended_contests(data: Dict) -> Optional[Tuple[str, str]]:
+    leetcode = _leetcode_data(data)
+    history = (leetcode or {}).get("userContestRankingHistory")
+    if not history:
+        return None
+    attended = [entry for entry in history if entry and entry.get("attended")]
+    dropped = len(history) - len(attended)
+    if not dropped:
+        return None
+    leetcode["userContestRankingHistory"] = attended
+    return "leetcode", f"dropped {dropped} contest history entries the candidate did not attend"
+
+
+def _summarize_github_calendar(data: Dict) -> Optional[Tuple[str, str]]:
+    user = _github_user(data)
+    calendar = ((user or {}).get("contributionsCollection") or {}).get("contributionCalendar")
+    if not calendar or "weeks" not in calendar:
+        return None
+    monthly = defaultdict(int)
+    for week in calendar.pop("weeks") or []:
+        for day in (week or {}).get("contributionDays") or []:
+            if day.get("date"):
+                monthly[day["date"][:7]] += day.get("contributionCount") or 0
+    calendar["monthlyContributions"] = dict(sorted(monthly.items()))
+    return "github", f"contribution calendar summarized to {len(monthly)} monthly totals"
+
+
+def _summarize_leetcode_calendar(data: Dict) -> Optional[Tuple[str, str]]:
+    leetcode = _leetcode_data(data)
+    calendar = ((leetcode or {}).get("matchedUser") or {}).get("userCalendar")
+    raw = (calendar or {}).get("submissionCalendar")
+    if not raw:
+        return None
+    try:
+        days = json.loads(raw) if isinstance(raw, str) else raw
+        monthly = defaultdict(int)
+        for timestamp, count in days.items():
+            monthly[datetime.utcfromtimestamp(int(timestamp)).strftime("%Y-%m")] += int(count)
+    except (ValueError, TypeError, AttributeError):
+        return None
+    del calendar["submissionCalendar"]
+    calendar["monthlySubmissions"] = dict(sorted(monthly.items()))
+    return "leetcode", f"submission calendar summarized to {len(monthly)} monthly totals"
+
+
+def _trim_recent_submissions(data: Dict) -> Optional[Tuple[str, str]]:
+    leetcode = _leetcode_data(data)
+    submissions = (leetcode or {}).get("recentSubmissionList")
+    if not submissions or len(submissions) <= LEETCODE_KEEP_SUBMISSIONS:
+        return None
+    leetcode["recentSubmissionList"] = submissions[:LEETCODE_KEEP_SUBMISSIONS]
+    return "leetcode", f"recent submissions trimmed from {len(submissions)} to {LEETCODE_KEEP_SUBMISSIONS}"
+
+
+def _drop_manifest_text(data: Dict) -> Optional[Tuple[str, str]]:
+    user = _github_user(data)
+    repos = ((user or {}).get("repositories") or {}).get("nodes") or []
+    dropped = 0
+    for repo in repos:
+        signals = (repo or {}).get("productionSignals") or {}
+        for key in DEPENDENCY_MANIFESTS:
+            blob = signals.get(key)
+            if isinstance(blob, dict) and blob.get("text"):
+                del blob["text"]
+                dropped += 1
+    if not dropped:
+        return None
+    return "github", f"dropped dependency manifest text from {dropped} production signal blobs (sizes kept)"
+
+
+def _drop_low_value_repos(data: Dict) -> Optional[Tuple[str, str]]:
+    user = _github_user(data)
+    conn = (user or {}).get("repositories")
+    repos = (conn or {}).get("nodes") or []
+    if len(repos) <= MIN_REPOS:
+        return None
+
+    pinned = {node.get("name") for node in ((user.get("pinnedItems") or {}).get("nodes") or []) if node}
+    droppable = sorted(
+        (repo for repo in repos if repo and repo.get("name") not in pinned),
+        key=lambda r: (r.get("stargazerCount") or 0, r.get("pushedAt") or ""),
+    )
+    count = min(len(repos) - MIN_REPOS, max(1, int(len(droppable) * TRIM_FRACTION)))
+    drop = droppable[:count]
+    if not drop:
+        return None
+    drop_ids = {id(repo) for repo in drop}
+    conn["nodes"] = [repo for repo in repos if id(repo) not in drop_ids]
+    max_stars = max((repo.get("stargazerCount") or 0) for repo in drop)
+    return "github", f"dropped {len(drop)} repositories with ≤{max_stars} stars ({len(conn['nodes'])} kept)"
+
+
+def _drop_old_pull_requests(data: Dict) -> Optional[Tuple[str, str]]:
+    user = _github_user(data)
+    conn = (user or {}).get("pullRequests")
+    prs = (conn or {}).get("nodes") or []
+    if len(prs) <= MIN_PULL_REQUESTS:
+        return None
+    keep = max(MIN_PULL_REQUESTS, len(prs) - max(1, int(len(prs) * TRIM_FRACTION)))
+    conn["nodes"] = sorted(prs, key=lambda pr: (pr or {}).get("createdAt") or "", reverse=True)[:keep]
+    return "github", f"pull requests trimmed from {len(prs)} to the {keep} most recent"
+
+
+def _truncate_text(payload: Dict, label: str) -> Optional[str]:
+    text = payload.get("raw_text") or ""
+    if text.endswith(TRUNCATION_MARKER):
+        text = text[:-len(TRUNCATION_MARKER)]
+    if len(text) <= MIN_TEXT_CHARS:
+        return None
+    new_len = max(MIN_TEXT_CHARS, int(len(text) * (1 - TRIM_FRACTION)))
+    payload["raw_text"] = text[:new_len] + TRUNCATION_MARKER
+    return f"{label} text truncated from {len(text)} to {new_len} chars"
+
+
+def _truncate_profile_text(data: Dict) -> Optional[Tuple[str, str]]:
+    candidates = [
+        (platform_id, payload) for platform_id, payload in data.items()
+        if platform_id not in ("resume", "github", "leetcode") and isinstance(payload, dict)
+        and len(payload.get("raw_text") or "") > MIN_TEXT_CHARS + len(TRUNCATION_MARKER)
+    ]
+    if not candidates:
+        return None
+    platform_id, payload = max(candidates, key=lambda item: len(item[1]["raw_text"]))
+    return platform_id, _truncate_text(payload, "profile")
+
+
+def _truncate_resume(data: Dict) -> Optional[Tuple[str, str]]:
+    payload = data.get("resume")
+    if not isinstance(payload, dict):
+        return None
+    detail = _truncate_text(payload, "resume")
+    return ("resume", detail) if detail else None
+
+
+# (name, step, repeatable) — lowest-value signal first
+PRUNING_STEPS: List[Tuple[str, Callable[[Dict], Optional[Tuple[str, str]]], bool]] = [
+    ("unattended_contests", _drop_unattended_contests, False),
+    ("github_calendar", _summarize_github_calendar, False),
+    ("leetcode_calendar", _summarize_leetcode_calendar, False),
+    ("leetcode_submissions", _trim_recent_submissions, False),
+    ("manifest_text", _drop_manifest_text, False),
+    ("github_repositories", _drop_low_value_repos, True),
+    ("github_pull_requests", _drop_old_pull_requests, True),
+    ("profile_text", _truncate_profile_text, True),
+    ("resume_text", _truncate_resume, True),
+]
+
+
+# ---------------------------
+# BUDGETING
+# ---------------------------
+
+def fit_to_budget(
+    raw_data: Dict[str, Any],
+    budget: int,
+    render: Callable[[Dict[str, Any]], str],
+) -> Tuple[Dict[str, Any], List[Dict[str, Any]], int]:
+    """
+    Trim a copy of raw_data until render(copy) fits in `budget` tokens.
+    Returns (trimmed_copy, decisions, final_token_count). raw_data itself is not modified.
+    """
+    tokens = count_tokens(render(raw_data))
+    if not budget or tokens <= budget:
+        return raw_data, [], tokens
+
+    data = copy.deepcopy(raw_data)
+    decisions = []
+    for name, step, repeatable in PRUNING_STEPS:
+        while tokens > budget:
+            applied = step(data)
+            if not applied:
+                break
+            platform_id, detail = applied
+            new_tokens = count_tokens(render(data))
+            decisions.append({
+                "step": name,
+                "platform": platform_id,
+                "detail": detail,
+                "tokens_before": tokens,
+                "tokens_after": new_tokens,
+            })
+            tokens = new_tokens
+            if not repeatable:
+                break
+        if tokens <= budget:
+            break
+
+    if tokens > budget:
+        logger.warning(f"LLM context still {tokens} tokens after pruning — over the {budget}-token budget")
+    return data, decisions, tokens
@@ -0,0 +1,81 @@
+"""
+Compact serialization for the LLM context.
+
+The GraphQL payloads we pass to the LLM are mostly structure: indentation, null
+fields and empty connections. The compact form drops exactly that and nothing else,
+so every remaining value sits at the same path as in the pretty dump
+(e.g. repositories.edges[].node.languages) and citations read the same either way:
+
+  - minified JSON (no indentation, no spaces after separators)
+  - null values, empty lists, empty dicts and empty strings are omitted
+
+Token counts use tiktoken when it is installed and a chars/4 estimate otherwise.
+"""
+
+import json
+import re
+from typing import Any
+
+_encoder = None
+
+
+def _get_encoder():
+    global _encoder
+    if _encoder is None:
+        try:
+            import tiktoken
+            _encoder = tiktoken.get_encoding("o200k_base")
+        except Exception:
+            _encoder = False  # not installed (or no encoding data) — use the estimate
+    return _encoder or None
+
+
+def count_tokens(text: str) -> int:
+    """Token count for text. Exact with tiktoken, otherwise ~4 chars per token."""
+    if not text:
+        return 0
+    encoder = _get_encoder()
+    if encoder:
+        return len(encoder.encode(text, disallowed_special=()))
+    return (len(text) + 3) // 4
+
+
+# ---------------------------
+# PRUNING
+# ---------------------------
+
+def compact(value: Any) -> Any:
+    """Return a copy of value without null or empty fields. Returns None when nothing is left."""
+    if isinstance(value, dict):
+        result = {}
+        for key, item in value.items():
+            item = compact(item)
+            if item is not None:
+                result[key] = item
+        return result or None
+
+    if isinstance(value, list):
+        items = [item for item in (compact(v) for v in value) if item is not None]
+        return items or None
+
+    if value == "":
+        return None
+    return value
+
+
+# ---------------------------
+# SERIALIZATION
+# ---------------------------
+
+def dumps(value: Any) -> str:
+    """Compact JSON for the prompt. Non-ASCII is kept as-is — escapes cost extra tokens."""
+    pruned = compact(value)
+    return json.dumps(pruned if pruned is not None else {}, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def squeeze_text(text: str) -> str:
+    """Collapse the whitespace runs PDF extraction leaves behind. Line breaks are kept."""
+    text = re.sub(r"[ \t\u00a0]+", " ", text)
+    text = re.sub(r" ?\n ?", "\n", text)
+    text = re.sub(r"\n{3,}", "\n\n", text)
+    return text.strip()
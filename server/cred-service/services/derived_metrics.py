@@ -0,0 +1,229 @@
+"""
+Deterministic derived metrics.
+
+Aggregates the prompts used to ask the LLM to work out from raw JSON — acceptance
+rate, PR merge rate, language totals, repo counts, active days — computed here in
+one pass over each node list and injected at the top of the LLM context as a
+PRECOMPUTED METRICS block. The model cites these instead of recounting hundreds
+of nodes, which is both faster and exact.
+
+Metrics are computed from the full raw data, before any token-budget pruning, so
+they stay correct even when low-value repos are trimmed from the context.
+
+The 90-day and 12-month windows end on `today`, the day the data was fetched
+(activity_timeline.data_date), not the day the report is generated — the same
+anchor as the activity timeline, so the counts describe the data and don't drift
+from one day to the next.
+"""
+
+import logging
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_WINDOW_DAYS = 90
+
+
+def compute_metrics(raw_data: Dict[str, Any], today: Optional[date] = None) -> Dict[str, Any]:
+    """Returns {"github": {...}, "leetcode": {...}} for the platforms present. Never raises."""
+    today = today or datetime.utcnow().date()
+    metrics = {}
+    for platform_id, builder in (("github", _github_metrics), ("leetcode", _leetcode_metrics)):
+        payload = raw_data.get(platform_id)
+        if not isinstance(payload, dict) or payload.get("error") or not isinstance(payload.get("data"), dict):
+            continue
+        try:
+            metrics[platform_id] = builder(payload["data"], today)
+        except Exception as e:
+            # Metrics are a shortcut for the LLM, never a reason to fail a report
+            logger.warning(f"Derived metrics failed for {platform_id}: {e}", exc_info=True)
+    return metrics
+
+
+# ---------------------------
+# GITHUB
+# ---------------------------
+
+def _github_metrics(user: Dict[str, Any], today: date) -> Dict[str, Any]:
+    login = (user.get("login") or "").lower()
+    active_since = (today - timedelta(days=ACTIVE_WINDOW_DAYS)).isoformat()
+    year_ago = (today - timedelta(days=365)).isoformat()
+
+    # One pass over repository nodes and their language edges
+    repos = _nodes(user.get("repositories"))
+    counts = Counter()
+    stars = forks_received = 0
+    language_bytes = Counter()
+    primary_languages = Counter()
+    signal_counts = Counter()
+    for repo in repos:
+        counts["forks" if repo.get("isFork") else "original"] += 1
+        if repo.get("isArchived"):
+            counts["archived"] += 1
+        if repo.get("isPrivate"):
+            counts["private"] += 1
+        pushed = (repo.get("pushedAt") or "")[:10]
+        if pushed >= active_since:
+            counts["active_90d"] += 1
+        if pushed >= year_ago:
+            counts["active_12m"] += 1
+        stars += repo.get("stargazerCount") or 0
+        forks_received += repo.get("forkCount") or 0
+
+        if (repo.get("primaryLanguage") or {}).get("name"):
+            primary_languages[repo["primaryLanguage"]["name"]] += 1
+        if not repo.get("isFork"):
+            for edge in ((repo.get("languages") or {}).get("edges") or []):
+                name = ((edge or {}).get("node") or {}).get("name")
+                if name:
+                    language_bytes[name] += edge.get("size") or 0
+
+        signals = repo.get("productionSignals") or {}
+        for signal, key in (("dockerfile", "dockerfile"), ("ci", "ciWorkflows"), ("tests", "testDirectory"), ("readme", "readme")):
+            if signals.get(key):
+                signal_counts[signal] += 1
+        if signals:
+            counts["signal_checked"] += 1
+
+    total_bytes = sum(language_bytes.values())
+    languages = [
+        {"name": name, "bytes": size, "pct": round(100 * size / total_bytes, 1)}
+        for name, size in language_bytes.most_common(12)
+    ] if total_bytes else []
+
+    # One pass over pull request nodes
+    prs = _nodes(user.get("pullRequests"))
+    pr_states = Counter()
+    external = additions = deletions = reviewed = 0
+    external_repos = set()
+    for pr in prs:
+        pr_states[(pr.get("state") or "UNKNOWN").lower()] += 1
+        additions += pr.get("additions") or 0
+        deletions += pr.get("deletions") or 0
+        if ((pr.get("reviews") or {}).get("totalCount") or 0) > 0:
+            reviewed += 1
+        repo_name = (pr.get("repository") or {}).get("nameWithOwner") or ""
+        if repo_name and repo_name.split("/")[0].lower() != login:
+            external += 1
+            external_repos.add(repo_name)
+    decided = pr_states["merged"] + pr_states["closed"]
+
+    contributions = user.get("contributionsCollection") or {}
+    calendar = contributions.get("contributionCalendar") or {}
+    days = [day for week in (calendar.get("weeks") or []) for day in ((week or {}).get("contributionDays") or [])]
+
+    return {
+        "repositories": {
+            "total": (user.get("repositories") or {}).get("totalCount", len(repos)),
+            "analysed": len(repos),
+            "original": counts["original"],
+            "forks": counts["forks"],
+            "archived": counts["archived"],
+            "private": counts["private"],
+            f"pushed_last_{ACTIVE_WINDOW_DAYS}_days": counts["active_90d"],
+            "pushed_last_12_months": counts["active_12m"],
+            "stars_received": stars,
+            "forks_received": forks_received,
+        },
+        "languages_by_bytes": languages,
+        "primary_language_repo_counts": dict(primary_languages.most_common(10)),
+        "production_signals": {
+            "repos_checked": counts["signal_checked"],
+            "with_dockerfile": signal_counts["dockerfile"],
+            "with_ci": signal_counts["ci"],
+            "with_tests": signal_counts["tests"],
+            "with_readme": signal_counts["readme"],
+        },
+        "pull_requests": {
+            "total": (user.get("pullRequests") or {}).get("totalCount", len(prs)),
+            "analysed": len(prs),
+            "merged": pr_states["merged"],
+            "open": pr_states["open"],
+            "closed_unmerged": pr_states["closed"],
+            "merge_rate_pct": _pct(pr_states["merged"], decided),
+            "to_external_repos": external,
+            "external_repos": sorted(external_repos)[:10],
+            "with_reviews": reviewed,
+            "lines_added": additions,
+            "lines_deleted": deletions,
+        },
+        "contributions_last_year": {
+            "total": calendar.get("totalContributions"),
+            "commits": contributions.get("totalCommitContributions"),
+            "pull_requests": contributions.get("totalPullRequestContributions"),
+            "reviews": contributions.get("totalPullRequestReviewContributions"),
+            "issues": contributions.get("totalIssueContributions"),
+            "private": contributions.get("restrictedContributionsCount"),
+            "active_days": sum(1 for day in days if (day.get("contributionCount") or 0) > 0),
+        },
+    }
+
+
+# ---------------------------
+# LEETCODE
+# ---------------------------
+
+def _leetcode_metrics(data: Dict[str, Any], today: date) -> Dict[str, Any]:
+    user = data.get("matchedUser") or {}
+    stats = user.get("submitStats") or {}
+    accepted = {row.get("difficulty"): row for row in (stats.get("acSubmissionNum") or []) if row}
+    attempted = {row.get("difficulty"): row for row in (stats.get("totalSubmissionNum") or []) if row}
+
+    solved = {
+        difficulty.lower(): (accepted.get(difficulty) or {}).get("count", 0)
+        for difficulty in ("All", "Easy", "Medium", "Hard")
+    }
+    ac_all = (accepted.get("All") or {})
+    total_all = (attempted.get("All") or {})
+
+    submissions = data.get("recentSubmissionList") or []
+    submission_langs = Counter(s.get("lang") for s in submissions if s and s.get("lang"))
+    recent_accepted = sum(1 for s in submissions if s and s.get("statusDisplay") == "Accepted")
+
+    tags = user.get("tagProblemCounts") or {}
+    tag_totals = Counter()
+    for level in ("advanced", "intermediate", "fundamental"):
+        for tag in tags.get(level) or []:
+            if tag and tag.get("tagName"):
+                tag_totals[tag["tagName"]] += tag.get("problemsSolved") or 0
+
+    history = data.get("userContestRankingHistory") or []
+    ranking = data.get("userContestRanking") or {}
+    calendar = user.get("userCalendar") or {}
+
+    return {
+        "problems_solved": solved,
+        # Prompt formula: acSubmissionNum[All].count / totalSubmissionNum[All].count
+        "acceptance_rate_pct": _pct(ac_all.get("count", 0), total_all.get("count", 0)),
+        "submission_acceptance_rate_pct": _pct(ac_all.get("submissions", 0), total_all.get("submissions", 0)),
+        "hard_share_pct": _pct(solved["hard"], solved["all"]),
+        "top_tags": dict(tag_totals.most_common(5)),
+        "recent_submissions": {
+            "count": len(submissions),
+            "accepted": recent_accepted,
+            "languages": dict(submission_langs.most_common()),
+        },
+        "contests": {
+            "attended": ranking.get("attendedContestsCount", sum(1 for h in history if h and h.get("attended"))),
+            "rating": round(ranking["rating"]) if ranking.get("rating") else None,
+            "top_percentage": ranking.get("topPercentage"),
+        },
+        "calendar": {
+            "total_active_days": calendar.get("totalActiveDays"),
+            "max_streak": calendar.get("streak"),
+        },
+    }
+
+
+# ---------------------------
+# HELPERS
+# ---------------------------
+
+def _nodes(connection: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [node for node in ((connection or {}).get("nodes") or []) if isinstance(node, dict)]
+
+
+def _pct(numerator: float, denominator: float) -> Optional[float]:
+    return round(100 * numerator / denominator, 1) if denominator else None
@@ -0,0 +1,117 @@
+"""
+In-memory report drafts for live token streaming over SSE.
+
+While a report is generated, every output_text delta is appended to the job's draft
+of that report; reports served from a checkpoint or the cache arrive whole. The SSE
+endpoint (GET /generate/{job_id}/stream?drafts=true) keeps a cursor per report and,
+when woken by new text, sends whatever is new since the last chunk — deltas are
+coalesced into one chunk per report per SSE_DRAFT_INTERVAL, capped at
+SSE_DRAFT_MAX_CHUNK_CHARS, so the emit rate stays bounded however fast the model writes.
+
+If the final text does not extend what was streamed (the non-streaming fallback
+produced a different answer), the draft's generation is bumped and the next chunk
+carries reset=true so the client discards what it has.
+
+Drafts live in the process that runs the job, and only once a draft subscriber
+(an SSE connection with ?drafts=true) is attached to the job in that process — nobody
+else could read them, so jobs run by a separate queue worker, or watched without
+drafts, buffer nothing. A subscriber that attaches mid-report gets that report's
+text from then on, and the whole text (with reset=true) when it finishes. Drafts are
+dropped DRAFT_TTL seconds after their last update. New text wakes the job's draft
+subscribers through progress_manager.publish_draft().
+"""
+
+import threading
+import time
+from typing import Any, Dict, List
+
+from services.progress_manager import progress_manager
+
+DRAFT_TTL = 300  # seconds a job's drafts are kept after their last update
+
+
+class DraftBuffer:
+    """Thread-safe: pipelines append from their worker threads, SSE streams read on the app loop."""
+
+    def __init__(self):
+        self._jobs: Dict[str, Dict[str, Dict[str, Any]]] = {}  # job_id → report → {"text", "done", "generation"}
+        self._updated_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def start(self, job_id: str):
+        """Drop the job's drafts from an earlier generation attempt, and expired ones."""
+        with self._lock:
+            now = time.monotonic()
+            for stale in [jid for jid, at in self._updated_at.items() if now - at > DRAFT_TTL]:
+                self._jobs.pop(stale, None)
+                self._updated_at.pop(stale, None)
+            self._jobs.pop(job_id, None)
+            self._updated_at.pop(job_id, None)
+
+    def _drafts(self, job_id: str):
+        """The job's drafts (caller holds the lock), created once it has a draft subscriber here."""
+        drafts = self._jobs.get(job_id)
+        if drafts is None and progress_manager.has_draft_subscribers(job_id):
+            drafts = self._jobs[job_id] = {}
+        return drafts
+
+    def append(self, job_id: str, report: str, delta: str):
+        with self._lock:
+            drafts = self._drafts(job_id) if delta else None
+            if drafts is None:
+                return
+            draft = drafts.setdefault(report, {"text": "", "done": False, "generation": 0})
+            draft["text"] += delta
+            self._updated_at[job_id] = time.monotonic()
+        progress_manager.publish_draft(job_id)
+
+    def finish(self, job_id: str, report: str, text: str):
+        """The report's final text — from the stream, the fallback call, a checkpoint or the cache."""
+        with self._lock:
+            drafts = self._drafts(job_id)
+            if drafts is None:
+                return
+            draft = drafts.setdefault(report, {"text": "", "done": False, "generation": 0})
+            if not text.startswith(draft["text"]):
+                draft["generation"] += 1
+            draft["text"] = text
+            draft["done"] = True
+            self._updated_at[job_id] = time.monotonic()
+        progress_manager.publish_draft(job_id)
+
+    def read(self, job_id: str, cursors: Dict[str, Dict[str, Any]], max_chars: int) -> List[Dict[str, Any]]:
+        """
+        New text per report since the caller's cursors (report → {"generation", "offset",
+        "done"}), which are advanced in place. Returns at most one chunk per report.
+        """
+        with self._lock:
+            drafts = {report: dict(draft) for report, draft in self._jobs.get(job_id, {}).items()}
+
+        chunks = []
+        for report, draft in drafts.items():
+            cursor = cursors.setdefault(report, {"generation": draft["generation"], "offset": 0, "done": False})
+            reset = cursor["generation"] != draft["generation"]
+            if reset:
+                cursor.update({"generation": draft["generation"], "offset": 0, "done": False})
+            if cursor["done"]:
+                continue
+
+            offset = cursor["offset"]
+            text = draft["text"][offset:offset + max(1, max_chars)]
+            done = draft["done"] and offset + len(text) == len(draft["text"])
+            if not text and not done and not reset:
+                continue
+
+            cursor["offset"] = offset + len(text)
+            cursor["done"] = done
+            chunks.append({"report": report, "offset": offset, "text": text, "done": done, "reset": reset})
+        return chunks
+
+    def clear(self, job_id: str):
+        with self._lock:
+            self._jobs.pop(job_id, None)
+            self._updated_at.pop(job_id, None)
+
+
+# Singleton — shared across routes and generation pipelines
+draft_buffer = DraftBuffer()
@@ -486,13 +486,14 @@ class ResendEmailService:
 
 class BrevoEmailService:
     """Brevo (formerly Sendinblue) API-based email service.
-    Uses the REST API via httpx — no extra SDK dependency needed.
+    Uses the REST API via the shared pooled httpx client — no extra SDK dependency needed.
     Free tier: 300 emails/day, no custom domain required.
     """
 
     API_URL = "https://api.brevo.com/v3/smtp/email"
 
-    def __init__(self):
+    def __init__(self, client=None):
+        self._http = client
         self.api_key = settings.brevo_api_key
         self.from_email = settings.brevo_from_email
         self.from_name = settings.brevo_from_name
@@ -502,7 +503,7 @@ class BrevoEmailService:
         return bool(self.api_key)
 
     def send_reports(self, to_email: str, candidate_name: str, reports: Dict[str, str]):
-        import httpx
+        from services.http_clients import http_clients
 
         if not to_email:
             logger.info(f"No email provided for {candidate_name} — skipping")
@@ -548,7 +549,8 @@ class BrevoEmailService:
         }
 
         try:
-            response = httpx.post(self.API_URL, json=payload, headers=headers, timeout=30)
+            client = self._http or http_clients.get_sync("brevo")
+            response = client.post(self.API_URL, json=payload, headers=headers)
             response.raise_for_status()
             result = response.json()
             logger.info(
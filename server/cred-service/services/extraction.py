@@ -1,6 +1,10 @@
+import asyncio
 import logging
+import time
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from sqlalchemy import func, insert
 from sqlalchemy.orm import Session
 from app.database import SessionLocal, RawData, AnalysisJob
 from app.config import settings
@@ -10,9 +14,26 @@ from services.github_fetcher import GitHubFetcher
 from services.leetcode_fetcher import LeetCodeFetcher
 from services.web_search_fetcher import WebSearchFetcher
 from services.platform_utils import is_dedicated_platform
+from services.extraction_cache import extraction_cache
+from services.progress_manager import progress_manager
+from services.raw_data_loader import PAGE_SUFFIX
 
 logger = logging.getLogger(__name__)
 
+# Stored in place of real data when a dedicated fetcher fails, so downstream
+# consumers always see the same top-level shape.
+GITHUB_EMPTY_PAYLOAD = {"profile": {}, "repository_intelligence": {"total_repositories": 0, "top_repositories": [], "all_repositories": []}}
+LEETCODE_EMPTY_PAYLOAD = {"problem_solving_stats": {"total_solved": 0}}
+
+
+@dataclass
+class PlatformResult:
+    """Result slot for a single platform extraction."""
+    platform_id: str
+    payload: dict
+    error: Optional[str]
+    duration_ms: int
+
 
 class ExtractionService:
     """
@@ -22,9 +43,16 @@ class ExtractionService:
     All other URLs: WebSearchFetcher (OpenAI web_search_preview).
 
     Each platform extraction is independent — one failure doesn't block others.
+    With EXTRACTION_CONCURRENT (default) all platforms run at once, each bounded
+    by EXTRACTION_PLATFORM_TIMEOUT, so job latency tracks the slowest platform.
+
+    GitHub, LeetCode and web-search results are served from the cross-job
+    extraction cache when fresh. bypass_cache=True forces a refetch (the fresh
+    result still refreshes the cache).
     """
 
-    def __init__(self):
+    def __init__(self, bypass_cache: bool = False):
+        self.bypass_cache = bypass_cache
         self.resume_parser = ResumeParser()
         self.github_fetcher = GitHubFetcher(token=settings.github_token)
         self.leetcode_fetcher = LeetCodeFetcher()
@@ -41,9 +69,18 @@ class ExtractionService:
         github_url: str = None,
         leetcode_url: str = None,
         linkedin_url: str = None,
+        incremental: Optional[bool] = None,
     ):
+        """
+        Persistence: by default every platform's raw_data row and the final job status
+        are written in one transaction once all platforms finish. incremental=True
+        (or EXTRACTION_PERSIST_MODE=incremental) commits each platform as it completes,
+        for callers that need per-platform visibility while the job is running.
+        """
         db: Session = SessionLocal()
         errors = []
+        if incremental is None:
+            incremental = settings.extraction_persist_mode == "incremental"
 
         # Merge legacy params into platform_urls
         if platform_urls is None:
@@ -59,89 +96,233 @@ class ExtractionService:
             logger.info(f"Extraction started for job_id={job_id} — platforms={list(platform_urls.keys())}, resume={'yes' if resume_bytes else 'no'}")
             self._update_job_status(db, job_id, "extracting")
 
-            # ---------------------------
-            # RESUME EXTRACTION
-            # ---------------------------
-            if resume_bytes:
-                try:
-                    resume_data = self.resume_parser.parse_resume_bytes(resume_bytes, resume_filename)
-                    self._store_raw(db, job_id, "resume", resume_data)
-                except Exception as e:
-                    logger.error(f"Resume extraction failed for job_id={job_id}: {e}", exc_info=True)
-                    errors.append(f"resume: {str(e)}")
-                    self._store_raw(db, job_id, "resume", {"error": str(e)})
-
-            # ---------------------------
-            # GITHUB EXTRACTION (dedicated)
-            # ---------------------------
-            github_url_val = platform_urls.pop("github", None)
-            if github_url_val:
-                try:
-                    username = self._extract_github_username(github_url_val)
-                    if username:
-                        github_data = await self.github_fetcher.fetch_user_data(username)
-                        self._store_raw(db, job_id, "github", github_data)
-                    else:
-                        errors.append("github: could not extract username from URL")
-                        self._store_raw(db, job_id, "github", {"error": "invalid URL", "profile": {}, "repository_intelligence": {"total_repositories": 0, "top_repositories": [], "all_repositories": []}})
-                except Exception as e:
-                    logger.error(f"GitHub extraction failed for job_id={job_id}: {e}", exc_info=True)
-                    errors.append(f"github: {str(e)}")
-                    self._store_raw(db, job_id, "github", {"error": str(e), "profile": {}, "repository_intelligence": {"total_repositories": 0, "top_repositories": [], "all_repositories": []}})
+            # One coroutine per source — order here is the order results are stored in
+            tasks = self._build_platform_tasks(job_id, platform_urls, resume_bytes, resume_filename)
 
-            # ---------------------------
-            # LEETCODE EXTRACTION (dedicated)
-            # ---------------------------
-            leetcode_url_val = platform_urls.pop("leetcode", None)
-            if leetcode_url_val:
-                try:
-                    username = self._extract_leetcode_username(leetcode_url_val)
-                    if username:
-                        leetcode_data = await self.leetcode_fetcher.fetch_user_data(username)
-                        self._store_raw(db, job_id, "leetcode", leetcode_data)
-                    else:
-                        errors.append("leetcode: could not extract username from URL")
-                        self._store_raw(db, job_id, "leetcode", {"error": "invalid URL", "problem_solving_stats": {"total_solved": 0}})
-                except Exception as e:
-                    logger.error(f"LeetCode extraction failed for job_id={job_id}: {e}", exc_info=True)
-                    errors.append(f"leetcode: {str(e)}")
-                    self._store_raw(db, job_id, "leetcode", {"error": str(e), "problem_solving_stats": {"total_solved": 0}})
+            results = await self._run_tasks(job_id, tasks, store_db=db if incremental else None)
 
-            # ---------------------------
-            # ALL OTHER PLATFORMS (web search)
-            # ---------------------------
-            for platform_id, url in platform_urls.items():
-                if not url:
-                    continue
-                try:
-                    logger.info(f"Web search extraction for {platform_id}: {url} job_id={job_id}")
-                    data = await self.web_search_fetcher.fetch_profile(url, platform_id)
-                    self._store_raw(db, job_id, platform_id, data)
-                except Exception as e:
-                    logger.error(f"{platform_id} extraction failed for job_id={job_id}: {e}", exc_info=True)
-                    errors.append(f"{platform_id}: {str(e)}")
-                    self._store_raw(db, job_id, platform_id, {"error": str(e), "url": url})
+            for result in results:
+                if result.error:
+                    errors.append(f"{result.platform_id}: {result.error}")
 
             # ---------------------------
             # DONE — mark as extracted even if some platforms had errors
             # ---------------------------
-            total_sources = sum([bool(resume_bytes)]) + len(platform_urls) + (1 if github_url_val else 0) + (1 if leetcode_url_val else 0)
+            total_sources = len(results)
             successful_extractions = total_sources - len(errors)
 
             if successful_extractions == 0 and total_sources > 0:
                 logger.warning(f"All extractions failed for job_id={job_id} — errors: {errors}")
-                self._update_job_status(db, job_id, "failed", "All requested data sources failed to extract")
+                status, error_msg = "failed", "All requested data sources failed to extract"
             else:
                 error_msg = "; ".join(errors) if errors else None
                 logger.info(f"Extraction completed for job_id={job_id} — {successful_extractions}/{total_sources} sources succeeded" + (f", partial errors: {errors}" if errors else ""))
-                self._update_job_status(db, job_id, "extracted", error_msg)
+                status = "extracted"
+
+            if incremental:
+                self._update_job_status(db, job_id, status, error_msg)
+            else:
+                self._persist_results(db, job_id, results, status, error_msg)
         except Exception as e:
             logger.error(f"Extraction completely failed for job_id={job_id}: {e}", exc_info=True)
+            db.rollback()
             self._update_job_status(db, job_id, "failed", str(e))
 
         finally:
             db.close()
 
+    async def refresh_platforms(self, job_id: str, platform_urls: Dict[str, str]):
+        """
+        Re-run selected platforms for an existing job.
+
+        Only platforms that fetch successfully replace their raw_data rows (and any
+        streamed page rows); a failed refresh keeps the previous data, drops the pages
+        it streamed before failing and records the error. Replacement and the status
+        update happen in one transaction.
+        """
+        db: Session = SessionLocal()
+        refresh_started = datetime.utcnow()
+        try:
+            logger.info(f"Refresh started for job_id={job_id} — platforms={list(platform_urls.keys())}")
+            self._update_job_status(db, job_id, "extracting")
+            self._drop_orphan_pages(db, job_id, list(platform_urls.keys()))
+
+            tasks = self._build_platform_tasks(job_id, platform_urls, None, None)
+            results = await self._run_tasks(job_id, tasks)
+
+            refreshed = [r for r in results if not r.error]
+            failed = [r for r in results if r.error]
+            errors = [f"{r.platform_id}: {r.error}" for r in failed]
+
+            if refreshed:
+                data_types = [r.platform_id for r in refreshed] + [f"{r.platform_id}{PAGE_SUFFIX}" for r in refreshed]
+                # fetched_at guard keeps page rows streamed during this refresh
+                db.query(RawData).filter(
+                    RawData.job_id == job_id,
+                    RawData.data_type.in_(data_types),
+                    RawData.fetched_at < refresh_started,
+                ).delete(synchronize_session=False)
+            if failed:
+                self._drop_refresh_pages(db, job_id, [r.platform_id for r in failed], refresh_started)
+
+            error_msg = "; ".join(errors) if errors else None
+            logger.info(f"Refresh completed for job_id={job_id} — {len(refreshed)}/{len(results)} platforms replaced" + (f", errors: {errors}" if errors else ""))
+            self._persist_results(db, job_id, refreshed, "extracted", error_msg)
+        except Exception as e:
+            logger.error(f"Refresh failed for job_id={job_id}: {e}", exc_info=True)
+            db.rollback()
+            # Previous raw data is kept — the job can still be generated from it
+            self._drop_refresh_pages(db, job_id, list(platform_urls.keys()), refresh_started)
+            self._update_job_status(db, job_id, "extracted", f"refresh failed: {e}")
+        finally:
+            db.close()
+
+    async def _run_tasks(
+        self,
+        job_id: str,
+        tasks: List[Tuple[str, Awaitable[Tuple[dict, Optional[str]]], dict]],
+        store_db: Optional[Session] = None,
+    ) -> List[PlatformResult]:
+        """Run platform tasks (concurrently unless EXTRACTION_CONCURRENT=false) and log timings."""
+        started = time.monotonic()
+        if settings.extraction_concurrent:
+            results = await asyncio.gather(
+                *(self._run_platform(job_id, platform_id, coro, fallback, store_db) for platform_id, coro, fallback in tasks)
+            )
+        else:
+            results = []
+            for platform_id, coro, fallback in tasks:
+                results.append(await self._run_platform(job_id, platform_id, coro, fallback, store_db))
+        wall_ms = round((time.monotonic() - started) * 1000)
+
+        timings = {r.platform_id: r.duration_ms for r in results}
+        logger.info(
+            f"Extraction timings for job_id={job_id} — wall={wall_ms}ms, "
+            f"sum={sum(timings.values())}ms, per_platform={timings}, concurrent={settings.extraction_concurrent}",
+            extra={"job_id": job_id, "duration_ms": wall_ms},
+        )
+        return list(results)
+
+    # ---------------------------
+    # PER-PLATFORM EXTRACTORS
+    # Each returns (payload, error). A non-None error counts the source as failed
+    # but the payload is still stored so the report generator sees what happened.
+    # ---------------------------
+
+    def _build_platform_tasks(
+        self,
+        job_id: str,
+        platform_urls: Dict[str, str],
+        resume_bytes: Optional[bytes],
+        resume_filename: Optional[str],
+    ) -> List[Tuple[str, Awaitable[Tuple[dict, Optional[str]]], dict]]:
+        """Returns (platform_id, coroutine, fallback_payload) for every requested source."""
+        urls = dict(platform_urls)
+        tasks = []
+
+        if resume_bytes:
+            tasks.append(("resume", self._extract_resume(resume_bytes, resume_filename), {}))
+
+        github_url_val = urls.pop("github", None)
+        if github_url_val:
+            tasks.append(("github", self._extract_github(job_id, github_url_val), GITHUB_EMPTY_PAYLOAD))
+
+        leetcode_url_val = urls.pop("leetcode", None)
+        if leetcode_url_val:
+            tasks.append(("leetcode", self._extract_leetcode(leetcode_url_val), LEETCODE_EMPTY_PAYLOAD))
+
+        # All other platforms go through web search
+        for platform_id, url in urls.items():
+            if not url:
+                continue
+            logger.info(f"Web search extraction for {platform_id}: {url} job_id={job_id}")
+            tasks.append((platform_id, self._extract_web(url, platform_id), {"url": url}))
+
+        return tasks
+
+    async def _run_platform(
+        self,
+        job_id: str,
+        platform_id: str,
+        coro: Awaitable[Tuple[dict, Optional[str]]],
+        fallback: dict,
+        store_db: Optional[Session] = None,
+    ) -> PlatformResult:
+        """Runs one platform extractor with its own timeout. Never raises.
+
+        With store_db (incremental mode) the payload is committed as soon as this platform finishes.
+        """
+        timeout = settings.extraction_platform_timeout
+        started = time.monotonic()
+        try:
+            payload, error = await asyncio.wait_for(coro, timeout=timeout)
+        except asyncio.TimeoutError:
+            error = f"timed out after {timeout:.0f}s"
+            logger.error(f"{platform_id} extraction timed out for job_id={job_id} after {timeout:.0f}s")
+            payload = {"error": error, **fallback}
+        except Exception as e:
+            logger.error(f"{platform_id} extraction failed for job_id={job_id}: {e}", exc_info=True)
+            error = str(e)
+            payload = {"error": error, **fallback}
+
+        duration_ms = round((time.monotonic() - started) * 1000)
+        logger.info(
+            f"{platform_id} extraction finished for job_id={job_id} in {duration_ms}ms" + (f" — error: {error}" if error else ""),
+            extra={"job_id": job_id, "duration_ms": duration_ms},
+        )
+        if store_db is not None:
+            self._store_raw(store_db, job_id, platform_id, payload)
+        return PlatformResult(platform_id, payload, error, duration_ms)
+
+    async def _extract_resume(self, resume_bytes: bytes, resume_filename: Optional[str]) -> Tuple[dict, Optional[str]]:
+        # PDF parsing runs in the resume process pool — keeps CPU work off the event loop
+        resume_data = await self.resume_parser.parse_resume_bytes_async(resume_bytes, resume_filename)
+        return resume_data, resume_data.get("error")
+
+    async def _extract_github(self, job_id: str, url: str) -> Tuple[dict, Optional[str]]:
+        username = self._extract_github_username(url)
+        if not username:
+            return {"error": "invalid URL", **GITHUB_EMPTY_PAYLOAD}, "could not extract username from URL"
+
+        def on_quota_wait(seconds: float):
+            # Surfaced on GET /extract/{job_id} so a quota wait isn't mistaken for a hang
+            progress_manager.update(job_id, "waiting_github_quota", extra={"retry_in_seconds": round(seconds)})
+
+        async def page_sink(connection: str, page: int, nodes: list):
+            # Paginated mode: extra repository / PR pages go straight to raw_data as they arrive
+            await asyncio.to_thread(self._store_page, job_id, "github", connection, page, nodes)
+
+        payload = await self._cached(
+            "github", username,
+            lambda: self.github_fetcher.fetch_user_data(username, on_quota_wait=on_quota_wait, page_sink=page_sink),
+        )
+        if (progress_manager.get(job_id) or {}).get("stage") == "waiting_github_quota":
+            progress_manager.clear(job_id)
+        return payload, payload.get("error")
+
+    async def _extract_leetcode(self, url: str) -> Tuple[dict, Optional[str]]:
+        username = self._extract_leetcode_username(url)
+        if not username:
+            return {"error": "invalid URL", **LEETCODE_EMPTY_PAYLOAD}, "could not extract username from URL"
+        return await self._cached("leetcode", username, lambda: self.leetcode_fetcher.fetch_user_data(username)), None
+
+    async def _extract_web(self, url: str, platform_id: str) -> Tuple[dict, Optional[str]]:
+        return await self._cached(platform_id, url, lambda: self.web_search_fetcher.fetch_profile(url, platform_id)), None
+
+    async def _cached(self, platform_id: str, identifier: str, fetch: Callable[[], Awaitable[dict]]) -> dict:
+        """Serve from the extraction cache if fresh, otherwise fetch and store."""
+        if extraction_cache is None:
+            return await fetch()
+
+        if not self.bypass_cache:
+            cached = await extraction_cache.get_async(platform_id, identifier)
+            if cached is not None:
+                return cached
+
+        payload = await fetch()
+        await extraction_cache.set_async(platform_id, identifier, payload)
+        return payload
+
     # ---------------------------
     # HELPERS
     # ---------------------------
@@ -157,14 +338,78 @@ class ExtractionService:
         )
         db.commit()
 
-    def _update_job_status(self, db: Session, job_id: str, status: str, error: str = None):
+    def _persist_results(self, db: Session, job_id: str, results: List[PlatformResult], status: str, error: str = None):
+        """Bulk-insert every platform's raw_data row and update the job status in one transaction.
+
+        Callers may stage other changes on db first (e.g. deleting rows being replaced) —
+        they are committed together.
+        """
+        now = datetime.utcnow()
+        if results:
+            db.execute(
+                insert(RawData),
+                [
+                    {"job_id": job_id, "data_type": r.platform_id, "data": r.payload, "fetched_at": now}
+                    for r in results
+                ],
+            )
+        self._update_job_status(db, job_id, status, error, commit=False)
+        db.commit()
+
+    def _drop_refresh_pages(self, db: Session, job_id: str, platform_ids: List[str], refresh_started: datetime):
+        """Stage deletion of page rows a refresh streamed for platforms it is not replacing."""
+        db.query(RawData).filter(
+            RawData.job_id == job_id,
+            RawData.data_type.in_([f"{platform_id}{PAGE_SUFFIX}" for platform_id in platform_ids]),
+            RawData.fetched_at >= refresh_started,
+        ).delete(synchronize_session=False)
+
+    def _drop_orphan_pages(self, db: Session, job_id: str, platform_ids: List[str]):
+        """
+        Delete page rows newer than their platform's row. Pages are streamed before the
+        platform row is written, so these were left by a refresh that died mid-fetch.
+        """
+        for platform_id in platform_ids:
+            latest = db.query(func.max(RawData.fetched_at)).filter(
+                RawData.job_id == job_id,
+                RawData.data_type == platform_id,
+            ).scalar()
+            query = db.query(RawData).filter(
+                RawData.job_id == job_id,
+                RawData.data_type == f"{platform_id}{PAGE_SUFFIX}",
+            )
+            if latest is not None:
+                query = query.filter(RawData.fetched_at > latest)
+            deleted = query.delete(synchronize_session=False)
+            if deleted:
+                logger.info(f"Dropped {deleted} orphaned {platform_id} page rows for job_id={job_id}")
+        db.commit()
+
+    def _store_page(self, job_id: str, platform_id: str, connection: str, page: int, nodes: list):
+        """Write one streamed page as its own raw_data row; RawDataLoader stitches pages back together."""
+        db = SessionLocal()
+        try:
+            db.add(
+                RawData(
+                    job_id=job_id,
+                    data_type=f"{platform_id}{PAGE_SUFFIX}",
+                    data={"connection": connection, "page": page, "nodes": nodes},
+                    fetched_at=datetime.utcnow()
+                )
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def _update_job_status(self, db: Session, job_id: str, status: str, error: str = None, commit: bool = True):
         job = db.query(AnalysisJob).filter(AnalysisJob.id == job_id).first()
         if job:
             job.status = status
             job.updated_at = datetime.utcnow()
             if error:
                 job.error_message = error
-            db.commit()
+            if commit:
+                db.commit()
 
     def _extract_github_username(self, url: str) -> str:
         if "github.com/" in url:
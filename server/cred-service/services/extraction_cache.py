@@ -0,0 +1,203 @@
+"""
+Cross-job extraction cache.
+
+Sits between ExtractionService and the platform fetchers. Results are keyed by
+platform_id + canonical username (GitHub, LeetCode) or normalized URL (web search),
+so the same developer analysed by two recruiters an hour apart costs one upstream fetch.
+
+Backends:
+  - memory : in-process LRU with TTL (default) — per worker, lost on restart
+  - db     : extraction_cache table — shared across workers and restarts
+  - off    : caching disabled
+
+Only successful payloads are cached. Cached payloads are shared between jobs —
+treat them as read-only. Extraction coroutines use get_async / set_async, which move
+the db backend's blocking queries off the event loop.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+from app.config import settings
+from app.database import SessionLocal, ExtractionCacheEntry
+
+logger = logging.getLogger(__name__)
+
+
+class InMemoryLRUBackend:
+    """Thread-safe LRU of (expires_at, payload) tuples."""
+
+    blocking = False
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max(1, max_entries)
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, payload = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return payload
+
+    def set(self, key: str, platform_id: str, payload: Dict[str, Any], ttl: int):
+        with self._lock:
+            self._entries[key] = (time.time() + ttl, payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def size(self) -> int:
+        return len(self._entries)
+
+
+class DatabaseBackend:
+    """Stores entries in the extraction_cache table. Expired rows are replaced on write."""
+
+    blocking = True  # sync SessionLocal queries
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        db = SessionLocal()
+        try:
+            entry = db.query(ExtractionCacheEntry).filter(ExtractionCacheEntry.key == key).first()
+            if entry is None or entry.expires_at < datetime.utcnow():
+                return None
+            return entry.data
+        finally:
+            db.close()
+
+    def set(self, key: str, platform_id: str, payload: Dict[str, Any], ttl: int):
+        db = SessionLocal()
+        now = datetime.utcnow()
+        try:
+            db.merge(ExtractionCacheEntry(
+                key=key,
+                platform_id=platform_id,
+                data=payload,
+                created_at=now,
+                expires_at=now + timedelta(seconds=ttl),
+            ))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def size(self) -> int:
+        db = SessionLocal()
+        try:
+            return db.query(ExtractionCacheEntry).filter(ExtractionCacheEntry.expires_at >= datetime.utcnow()).count()
+        finally:
+            db.close()
+
+
+class ExtractionCache:
+    """TTL cache for platform payloads with hit/miss accounting."""
+
+    def __init__(self, backend, ttl: int):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    @staticmethod
+    def make_key(platform_id: str, identifier: str) -> str:
+        return f"{platform_id}:{canonicalize(platform_id, identifier)}"
+
+    def get(self, platform_id: str, identifier: str) -> Optional[Dict[str, Any]]:
+        key = self.make_key(platform_id, identifier)
+        try:
+            payload = self.backend.get(key)
+        except Exception as e:
+            # A broken cache must never fail an extraction — treat as a miss
+            logger.warning(f"Extraction cache read failed for key={key}: {e}")
+            payload = None
+
+        if payload is None:
+            self.misses += 1
+            logger.debug(f"Extraction cache miss key={key}")
+            return None
+
+        self.hits += 1
+        logger.info(f"Extraction cache hit key={key}")
+        return payload
+
+    def set(self, platform_id: str, identifier: str, payload: Dict[str, Any]):
+        # Payloads whose extra pages were streamed to raw_data are incomplete on their own
+        if not payload or payload.get("error") or payload.get("streamed_pages"):
+            return
+        key = self.make_key(platform_id, identifier)
+        try:
+            self.backend.set(key, platform_id, payload, self.ttl)
+            self.stores += 1
+        except Exception as e:
+            logger.warning(f"Extraction cache write failed for key={key}: {e}")
+
+    async def get_async(self, platform_id: str, identifier: str) -> Optional[Dict[str, Any]]:
+        if self.backend.blocking:
+            return await asyncio.to_thread(self.get, platform_id, identifier)
+        return self.get(platform_id, identifier)
+
+    async def set_async(self, platform_id: str, identifier: str, payload: Dict[str, Any]):
+        if self.backend.blocking:
+            await asyncio.to_thread(self.set, platform_id, identifier, payload)
+        else:
+            self.set(platform_id, identifier, payload)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        try:
+            size = self.backend.size()
+        except Exception:
+            size = None
+        return {
+            "backend": settings.extraction_cache_backend,
+            "ttl_seconds": self.ttl,
+            "entries": size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+        }
+
+
+def canonicalize(platform_id: str, identifier: str) -> str:
+    """Usernames are case-insensitive on GitHub and LeetCode; URLs are reduced to host + path."""
+    identifier = (identifier or "").strip()
+    if platform_id in ("github", "leetcode"):
+        return identifier.lower()
+
+    parsed = urlparse(identifier if "://" in identifier else f"https://{identifier}")
+    host = (parsed.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    return f"{host}{parsed.path.rstrip('/').lower()}"
+
+
+def _build_cache() -> Optional[ExtractionCache]:
+    backend_name = (settings.extraction_cache_backend or "off").lower()
+    if backend_name == "memory":
+        return ExtractionCache(InMemoryLRUBackend(settings.extraction_cache_max_entries), settings.extraction_cache_ttl)
+    if backend_name == "db":
+        return ExtractionCache(DatabaseBackend(), settings.extraction_cache_ttl)
+    if backend_name != "off":
+        logger.warning(f"Unknown EXTRACTION_CACHE_BACKEND={backend_name!r} — extraction cache disabled")
+    return None
+
+
+# Singleton — None when caching is disabled
+extraction_cache = _build_cache()
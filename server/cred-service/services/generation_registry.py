@@ -0,0 +1,120 @@
+"""
+Registry of running generation pipelines, used to cancel them.
+
+The pipeline runs in a thread of the queue worker that claimed the job's generation
+task (run_generation_task hands it to asyncio.to_thread) and drives its LLM streams
+on an event loop of its own. It registers here on start and attaches the asyncio
+task that owns the streams once report generation begins. cancel() — called from
+DELETE /generate/{job_id} on the server's loop — cancels that task thread-safely,
+which closes the in-flight HTTP streams so the provider stops generating (and
+billing) output. A cancel that arrives before the streams start is remembered and
+honoured at the next checkpoint. Once the pipeline seals the job (reports about to
+be stored) cancellation is refused. The registry only knows the pipelines of its own
+process; a job running in a separate worker is cancelled through the queue
+(job_queue.request_cancel).
+
+When a queue worker loses a generation task's lease, it abandons the pipeline: the
+same cancel, but the pipeline then leaves the job's status to the worker that
+reclaimed the task.
+"""
+
+import asyncio
+import logging
+import threading
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class GenerationCancelled(Exception):
+    """Raised inside the pipeline when its job has been cancelled."""
+
+
+class GenerationRegistry:
+    """Thread-safe job_id → {cancelled, abandoned, sealed, loop, task} map for pipelines in this process."""
+
+    def __init__(self):
+        self._jobs: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def start(self, job_id: str):
+        with self._lock:
+            self._jobs[job_id] = {"cancelled": False, "abandoned": False, "sealed": False, "loop": None, "task": None}
+
+    def attach(self, job_id: str, task: asyncio.Task):
+        """Bind the task running the LLM streams. Cancels it at once if a cancel is already pending."""
+        with self._lock:
+            entry = self._jobs.get(job_id)
+            if entry is None:
+                return
+            entry["loop"] = task.get_loop()
+            entry["task"] = task
+            cancelled = entry["cancelled"]
+        if cancelled:
+            task.cancel()
+
+    def cancel(self, job_id: str) -> Optional[bool]:
+        """
+        Request cancellation. True when accepted, False when the job is sealed (too late),
+        None when no pipeline for job_id is running in this process.
+        """
+        with self._lock:
+            entry = self._jobs.get(job_id)
+            if entry is None:
+                return None
+            if entry["sealed"]:
+                return False
+            entry["cancelled"] = True
+            loop, task = entry["loop"], entry["task"]
+        if task is not None and not task.done():
+            try:
+                loop.call_soon_threadsafe(task.cancel)
+            except RuntimeError:
+                pass  # loop already closed — the pipeline is past the LLM stage and sees the flag instead
+        logger.info(f"Cancellation requested for {job_id}", extra={"job_id": job_id})
+        return True
+
+    def abandon(self, job_id: str) -> Optional[bool]:
+        """Cancel a pipeline whose queue task now belongs to another worker. Same result as cancel()."""
+        with self._lock:
+            entry = self._jobs.get(job_id)
+            if entry is None:
+                return None
+            entry["abandoned"] = True
+        return self.cancel(job_id)
+
+    def is_abandoned(self, job_id: str) -> bool:
+        with self._lock:
+            entry = self._jobs.get(job_id)
+            return bool(entry and entry["abandoned"])
+
+    def is_running(self, job_id: str) -> bool:
+        with self._lock:
+            return job_id in self._jobs
+
+    def is_cancelled(self, job_id: str) -> bool:
+        with self._lock:
+            entry = self._jobs.get(job_id)
+            return bool(entry and entry["cancelled"])
+
+    def raise_if_cancelled(self, job_id: str):
+        if self.is_cancelled(job_id):
+            raise GenerationCancelled(f"Generation cancelled for {job_id}")
+
+    def seal(self, job_id: str):
+        """Last checkpoint: raises if cancelled, otherwise refuses any later cancel."""
+        with self._lock:
+            entry = self._jobs.get(job_id)
+            if entry is None:
+                return
+            if entry["cancelled"]:
+                raise GenerationCancelled(f"Generation cancelled for {job_id}")
+            entry["sealed"] = True
+
+    def finish(self, job_id: str):
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+
+# Singleton instance
+generation_registry = GenerationRegistry()
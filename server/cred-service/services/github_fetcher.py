@@ -6,21 +6,169 @@ Two-query architecture:
   Query 2: Production readiness signals for top 15 repos (file checks + dependency content)
 
 Returns raw API response with production signals merged into matching repos.
+Optional paginated mode (GITHUB_PAGINATE) follows repository / pull request cursors
+past the first page and streams those pages to the caller instead of holding them.
 No scoring, no intermediate processing — the LLM receives raw data and does all reasoning.
+
+Every query also requests rateLimit { cost remaining resetAt } and goes through the
+shared github_scheduler, which paces or queues requests across all in-flight jobs.
 """
 
+import asyncio
 import logging
 import httpx
-from typing import Optional, Dict, Any, List, Tuple
+from typing import Optional, Dict, Any, List, Tuple, Callable, Awaitable
+
+from app.config import settings
+from services.http_clients import http_clients
+from services.github_rate_limiter import github_scheduler, RATE_LIMIT_FIELDS
+from services.manifest_analyzer import DEPENDENCY_MANIFESTS
 
 logger = logging.getLogger(__name__)
 
+PRODUCTION_SIGNALS_FRAGMENT = """
+fragment ProductionSignals on Repository {
+    name
+    readme: object(expression: "HEAD:README.md") { ... on Blob { byteSize } }
+    dockerfile: object(expression: "HEAD:Dockerfile") { ... on Blob { byteSize } }
+    ciWorkflows: object(expression: "HEAD:.github/workflows") { ... on Tree { entries { name } } }
+    testsDir: object(expression: "HEAD:tests") { ... on Tree { entries { name } } }
+    testDir: object(expression: "HEAD:test") { ... on Tree { entries { name } } }
+    underscoreTests: object(expression: "HEAD:__tests__") { ... on Tree { entries { name } } }
+    envExample: object(expression: "HEAD:.env.example") { ... on Blob { byteSize } }
+    packageJson: object(expression: "HEAD:package.json") { ... on Blob { byteSize text } }
+    requirementsTxt: object(expression: "HEAD:requirements.txt") { ... on Blob { byteSize text } }
+    pyprojectToml: object(expression: "HEAD:pyproject.toml") { ... on Blob { byteSize text } }
+    goMod: object(expression: "HEAD:go.mod") { ... on Blob { byteSize text } }
+    cargoToml: object(expression: "HEAD:Cargo.toml") { ... on Blob { byteSize text } }
+    gemfile: object(expression: "HEAD:Gemfile") { ... on Blob { byteSize text } }
+}
+"""
+
+# Node fields shared by Query 1 and the pagination queries
+REPOSITORY_NODE_FIELDS = """
+                        name
+                        nameWithOwner
+                        description
+                        isArchived
+                        isFork
+                        isPrivate
+                        stargazerCount
+                        forkCount
+                        primaryLanguage { name }
+                        languages(first: 10) { edges { size node { name } } }
+                        repositoryTopics(first: 10) { nodes { topic { name } } }
+                        pushedAt
+                        createdAt
+                        diskUsage
+                        defaultBranchRef { name }
+                        owner { login }
+                        openIssues: issues(states: OPEN) { totalCount }
+                        licenseInfo { name }
+"""
+
+PULL_REQUEST_NODE_FIELDS = """
+                        state
+                        title
+                        createdAt
+                        mergedAt
+                        additions
+                        deletions
+                        changedFiles
+                        repository { nameWithOwner isPrivate }
+                        reviews { totalCount }
+"""
+
+PAGE_INFO_FIELDS = "pageInfo { hasNextPage endCursor }"
+
+# Paginated user connections: query arguments, node fields, and the setting that caps total nodes
+CONNECTIONS = {
+    "repositories": {
+        "args": "ownerAffiliations: [OWNER], orderBy: {field: PUSHED_AT, direction: DESC}",
+        "fields": REPOSITORY_NODE_FIELDS,
+        "limit_setting": "github_max_repos",
+    },
+    "pullRequests": {
+        "args": "states: [OPEN, CLOSED, MERGED], orderBy: {field: CREATED_AT, direction: DESC}",
+        "fields": PULL_REQUEST_NODE_FIELDS,
+        "limit_setting": "github_max_pull_requests",
+    },
+}
+
+CONNECTION_PAGE_QUERY = """
+query($username: String!, $cursor: String!, $first: Int!) {
+    %(rate_limit)s
+    user(login: $username) {
+        %(connection)s(first: $first, after: $cursor, %(args)s) {
+            %(page_info)s
+            nodes {
+                %(fields)s
+            }
+        }
+    }
+}
+"""
+
+# Lightweight per-repo fields kept for top-repo selection when pages are streamed out
+REPO_INDEX_KEYS = ("name", "owner", "stargazerCount", "pushedAt", "isFork", "isArchived", "isPrivate")
+
+# GraphQL error types / messages GitHub returns when a query is too expensive
+OVERLOAD_MARKERS = ("complexity", "max_node_limit", "resource_limits", "timeout", "timedout", "something went wrong")
+
+
+def _is_overload_error(error: Any) -> bool:
+    """True for 502/504 responses and GraphQL complexity/timeout errors — the ones a smaller batch fixes."""
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code in (502, 503, 504)
+    if isinstance(error, httpx.TimeoutException):
+        return True
+    text = str(error).lower()
+    return any(marker in text for marker in OVERLOAD_MARKERS)
+
+
+class AdaptiveBatchSizer:
+    """Shared Query 2 batch size: halves on overload, grows by one after a run of successes."""
+
+    def __init__(self, initial: int = 5, minimum: int = 1, maximum: int = 10, grow_after: int = 3):
+        self.size = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.grow_after = grow_after
+        self._streak = 0
+
+    def success(self, batch_len: int):
+        # Only full-size batches prove the current size is safe
+        if batch_len < self.size:
+            return
+        self._streak += 1
+        if self._streak >= self.grow_after and self.size < self.maximum:
+            self.size += 1
+            self._streak = 0
+            logger.info(f"Query 2 batch size grown to {self.size}")
+
+    def failure(self, batch_len: int):
+        # Concurrent failures of the same size only shrink once
+        self._streak = 0
+        new_size = max(self.minimum, min(self.size, batch_len // 2))
+        if new_size != self.size:
+            self.size = new_size
+            logger.info(f"Query 2 batch size shrunk to {self.size}")
+
+
+# Shared across jobs so one overloaded account teaches every fetcher
+signal_batch_sizer = AdaptiveBatchSizer(initial=5, maximum=settings.github_signal_batch_max)
+
 
 class GitHubFetcher:
 
-    def __init__(self, token: Optional[str] = None):
+    def __init__(self, token: Optional[str] = None, client: Optional[httpx.AsyncClient] = None):
         self.graphql_url = "https://api.github.com/graphql"
         self.token = token
+        self._http = client
+
+    def _client(self) -> httpx.AsyncClient:
+        """Injected client if given, otherwise the app-scoped pooled client."""
+        return self._http or http_clients.get_async("github")
 
     def _headers(self):
         if not self.token:
@@ -30,40 +178,181 @@ class GitHubFetcher:
             "Content-Type": "application/json",
         }
 
-    async def fetch_user_data(self, username: str) -> Dict[str, Any]:
+    async def _graphql(
+        self,
+        query: str,
+        variables: Optional[Dict[str, Any]] = None,
+        kind: str = "query",
+        default_cost: int = 1,
+        on_quota_wait: Optional[Callable[[float], None]] = None,
+    ) -> Dict[str, Any]:
+        """POST a GraphQL query through the shared rate-limit scheduler and record the budget it reports."""
+        cost = github_scheduler.estimate(kind, default_cost)
+        payload = {"query": query}
+        if variables:
+            payload["variables"] = variables
+
+        async with github_scheduler.slot(cost, on_wait=on_quota_wait):
+            resp = await self._client().post(self.graphql_url, json=payload, headers=self._headers())
+
+        github_scheduler.record_response(resp)
+        resp.raise_for_status()
+        result = resp.json()
+        github_scheduler.record((result.get("data") or {}).get("rateLimit"), kind)
+        return result
+
+    async def fetch_user_data(
+        self,
+        username: str,
+        on_quota_wait: Optional[Callable[[float], None]] = None,
+        page_sink: Optional[Callable[[str, int, List[Dict[str, Any]]], Awaitable[None]]] = None,
+    ) -> Dict[str, Any]:
+        """
+        on_quota_wait(seconds) is called whenever a query has to wait for GitHub quota.
+
+        With GITHUB_PAGINATE and a page_sink, repositories and pull requests beyond the
+        first page are followed by cursor and handed to the async page_sink(connection, page, nodes)
+        as they arrive instead of being accumulated here. The returned payload then
+        carries "streamed_pages" so callers know it is incomplete on its own.
+        """
         try:
             # Query 1: Profile + all repos (lightweight) + pinned + orgs + lang bytes
-            user_data = await self._fetch_profile_and_repos(username)
+            user_data = await self._fetch_profile_and_repos(username, on_quota_wait)
+            repo_index = user_data.get("repositories", {}).get("nodes", [])
+
+            # Remaining pages (paginated mode only) — streamed out, only a small repo index is kept
+            streamed_pages = 0
+            if settings.github_paginate and page_sink:
+                extra_index, streamed_pages = await self._fetch_remaining_pages(username, user_data, page_sink, on_quota_wait)
+                repo_index = repo_index + extra_index
 
             # Select top repos for production signal checks
-            top_repos = self._select_top_repos(user_data)
+            top_repos = self._select_top_repos(repo_index)
 
             # Query 2: Production signals for top repos (non-fatal if fails)
-            production_signals = await self._fetch_production_signals(top_repos)
+            production_signals = await self._fetch_production_signals(top_repos, on_quota_wait)
 
             # Merge production signals into matching repos
             if production_signals:
-                self._merge_production_signals(user_data, production_signals)
+                self._merge_production_signals(user_data, production_signals, keep_unmatched=streamed_pages > 0)
 
-            return {
+            result = {
                 "data": user_data,
                 "data_source": "github_graphql",
             }
+            if streamed_pages:
+                result["streamed_pages"] = streamed_pages
+            return result
         except Exception as e:
             return {"error": f"GitHub fetch failed: {str(e)}", "data_source": "error_fallback"}
 
-    def _merge_production_signals(self, user_data: Dict[str, Any], signals: Dict[str, Any]) -> None:
-        """Attach production signal data to matching repos in user_data. Mutates user_data in place."""
-        repos = user_data.get("repositories", {}).get("nodes", [])
-        for repo in repos:
+    def _merge_production_signals(self, user_data: Dict[str, Any], signals: Dict[str, Any], keep_unmatched: bool = False) -> None:
+        """Attach production signal data to matching repos in user_data. Mutates user_data in place.
+
+        keep_unmatched: signals for repos that live on streamed pages are kept under
+        repositories.productionSignalsByRepo; RawDataLoader attaches them once pages are merged.
+        """
+        repos_conn = user_data.get("repositories", {})
+        unmatched = dict(signals)
+        for repo in repos_conn.get("nodes", []):
             repo_name = repo.get("name", "")
             if repo_name in signals:
                 repo["productionSignals"] = signals[repo_name]
+                unmatched.pop(repo_name, None)
+        if keep_unmatched and unmatched:
+            repos_conn["productionSignalsByRepo"] = unmatched
+
+    async def _fetch_remaining_pages(
+        self,
+        username: str,
+        user_data: Dict[str, Any],
+        page_sink: Callable[[str, int, List[Dict[str, Any]]], Awaitable[None]],
+        on_quota_wait: Optional[Callable[[float], None]] = None,
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """Follow repository and pull request cursors concurrently. Returns (repo index, pages streamed)."""
+        repo_index: List[Dict[str, Any]] = []
+        chains = []
+        for connection, cfg in CONNECTIONS.items():
+            conn = user_data.get(connection) or {}
+            page_info = conn.pop("pageInfo", None) or {}
+            if not page_info.get("hasNextPage"):
+                continue
+            limit = getattr(settings, cfg["limit_setting"])
+            collector = repo_index if connection == "repositories" else None
+            chains.append(self._follow_connection(
+                username, connection, page_info.get("endCursor"), len(conn.get("nodes", [])), limit,
+                page_sink, collector, on_quota_wait,
+            ))
+
+        # Pages within a connection depend on the previous cursor; the two connections don't
+        page_counts = await asyncio.gather(*chains)
+        for connection in CONNECTIONS:
+            (user_data.get(connection) or {}).pop("pageInfo", None)
+        return repo_index, sum(page_counts)
+
+    async def _follow_connection(
+        self,
+        username: str,
+        connection: str,
+        cursor: Optional[str],
+        fetched: int,
+        limit: int,
+        page_sink: Callable[[str, int, List[Dict[str, Any]]], Awaitable[None]],
+        repo_index: Optional[List[Dict[str, Any]]],
+        on_quota_wait: Optional[Callable[[float], None]] = None,
+    ) -> int:
+        cfg = CONNECTIONS[connection]
+        query = CONNECTION_PAGE_QUERY % {
+            "rate_limit": RATE_LIMIT_FIELDS,
+            "connection": connection,
+            "args": cfg["args"],
+            "page_info": PAGE_INFO_FIELDS,
+            "fields": cfg["fields"],
+        }
 
-    async def _fetch_profile_and_repos(self, username: str) -> Dict[str, Any]:
+        page = 1  # page 1 came from Query 1
+        while cursor and fetched < limit:
+            try:
+                result = await self._graphql(
+                    query,
+                    variables={"username": username, "cursor": cursor, "first": min(100, limit - fetched)},
+                    kind=f"{connection}_page",
+                    default_cost=1,
+                    on_quota_wait=on_quota_wait,
+                )
+            except Exception as e:
+                # Keep what we have — a partial account is better than failing the whole fetch
+                logger.warning(f"GitHub {connection} pagination stopped at page {page + 1} for {username}: {e}")
+                break
+            if "errors" in result:
+                logger.warning(f"GitHub {connection} page {page + 1} GraphQL errors for {username}: {result['errors']}")
+            conn = ((result.get("data") or {}).get("user") or {}).get(connection) or {}
+            nodes = conn.get("nodes") or []
+            if not nodes:
+                break
+
+            page += 1
+            fetched += len(nodes)
+            await page_sink(connection, page, nodes)
+            if repo_index is not None:
+                repo_index.extend({key: node.get(key) for key in REPO_INDEX_KEYS} for node in nodes)
+
+            page_info = conn.get("pageInfo") or {}
+            cursor = page_info.get("endCursor") if page_info.get("hasNextPage") else None
+
+        if cursor:
+            logger.info(f"GitHub {connection} for {username} truncated at {fetched} nodes (limit {limit})")
+        return page - 1
+
+    async def _fetch_profile_and_repos(
+        self,
+        username: str,
+        on_quota_wait: Optional[Callable[[float], None]] = None,
+    ) -> Dict[str, Any]:
         """Query 1: Profile + all repos (lightweight) + pinned repos + orgs + language bytes."""
         query = """
         query($username: String!) {
+            %(rate_limit)s
             user(login: $username) {
                 login
                 name
@@ -96,27 +385,11 @@ class GitHubFetcher:
                         url
                     }
                 }
-                repositories(first: 100, ownerAffiliations: [OWNER], orderBy: {field: PUSHED_AT, direction: DESC}) {
+                repositories(first: 100, %(repositories_args)s) {
                     totalCount
+                    %(page_info)s
                     nodes {
-                        name
-                        nameWithOwner
-                        description
-                        isArchived
-                        isFork
-                        isPrivate
-                        stargazerCount
-                        forkCount
-                        primaryLanguage { name }
-                        languages(first: 10) { edges { size node { name } } }
-                        repositoryTopics(first: 10) { nodes { topic { name } } }
-                        pushedAt
-                        createdAt
-                        diskUsage
-                        defaultBranchRef { name }
-                        owner { login }
-                        openIssues: issues(states: OPEN) { totalCount }
-                        licenseInfo { name }
+                        %(repository_fields)s
                     }
                 }
                 contributionsCollection {
@@ -136,44 +409,43 @@ class GitHubFetcher:
                         }
                     }
                 }
-                pullRequests(first: 50, states: [OPEN, CLOSED, MERGED], orderBy: {field: CREATED_AT, direction: DESC}) {
+                pullRequests(first: 50, %(pull_requests_args)s) {
                     totalCount
+                    %(page_info)s
                     nodes {
-                        state
-                        title
-                        createdAt
-                        mergedAt
-                        additions
-                        deletions
-                        changedFiles
-                        repository { nameWithOwner isPrivate }
-                        reviews { totalCount }
+                        %(pull_request_fields)s
                     }
                 }
             }
         }
-        """
+        """ % {
+            "rate_limit": RATE_LIMIT_FIELDS,
+            "repositories_args": CONNECTIONS["repositories"]["args"],
+            "repository_fields": CONNECTIONS["repositories"]["fields"],
+            "pull_requests_args": CONNECTIONS["pullRequests"]["args"],
+            "pull_request_fields": CONNECTIONS["pullRequests"]["fields"],
+            # Cursors are only requested when we'll follow them
+            "page_info": PAGE_INFO_FIELDS if settings.github_paginate else "",
+        }
 
-        async with httpx.AsyncClient(timeout=30) as client:
-            resp = await client.post(
-                self.graphql_url,
-                json={"query": query, "variables": {"username": username}},
-                headers=self._headers(),
-            )
-            resp.raise_for_status()
-            result = resp.json()
+        result = await self._graphql(
+            query,
+            variables={"username": username},
+            kind="profile_and_repos",
+            default_cost=10,
+            on_quota_wait=on_quota_wait,
+        )
 
-            if "errors" in result:
-                raise ValueError(f"GraphQL errors: {result['errors']}")
+        if "errors" in result:
+            raise ValueError(f"GraphQL errors: {result['errors']}")
 
-            return result.get("data", {}).get("user", {})
+        return result.get("data", {}).get("user", {})
 
-    def _select_top_repos(self, user_data: Dict[str, Any], limit: int = 15) -> List[Tuple[str, str]]:
+    def _select_top_repos(self, repos: List[Dict[str, Any]], limit: int = 15) -> List[Tuple[str, str]]:
         """Select top repos by stars (then pushedAt), excluding forks, archived, and private repos.
 
         Returns list of (owner, name) tuples.
         """
-        repos = user_data.get("repositories", {}).get("nodes", [])
         if not repos:
             return []
 
@@ -193,79 +465,107 @@ class GitHubFetcher:
         top = eligible[:limit]
         return [(r.get("owner", {}).get("login", ""), r.get("name", "")) for r in top]
 
-    async def _fetch_production_signals(self, top_repos: List[Tuple[str, str]]) -> Dict[str, Any]:
+    async def _fetch_production_signals(
+        self,
+        top_repos: List[Tuple[str, str]],
+        on_quota_wait: Optional[Callable[[float], None]] = None,
+    ) -> Dict[str, Any]:
         """Query 2: Production readiness signals for top repos using GraphQL aliasing.
 
         Fetches file existence checks (README, Dockerfile, CI, tests, .env.example)
         and dependency file content (package.json, requirements.txt) for each repo.
-        Batches repos into groups of BATCH_SIZE to stay within GitHub's query complexity limit.
+        Repos are split into batches sized by signal_batch_sizer (shrinks after 502 /
+        complexity errors, grows back on success) and the batches are sent concurrently,
+        at most GITHUB_SIGNAL_BATCH_CONCURRENCY at a time.
         Returns dict keyed by repo name with production signal data.
         """
         if not top_repos:
             return {}
 
-        BATCH_SIZE = 5  # 5 repos × 9 file checks = 45 lookups per query (safe for GitHub)
-
-        PRODUCTION_SIGNALS_FRAGMENT = """
-        fragment ProductionSignals on Repository {
-            name
-            readme: object(expression: "HEAD:README.md") { ... on Blob { byteSize } }
-            dockerfile: object(expression: "HEAD:Dockerfile") { ... on Blob { byteSize } }
-            ciWorkflows: object(expression: "HEAD:.github/workflows") { ... on Tree { entries { name } } }
-            testsDir: object(expression: "HEAD:tests") { ... on Tree { entries { name } } }
-            testDir: object(expression: "HEAD:test") { ... on Tree { entries { name } } }
-            underscoreTests: object(expression: "HEAD:__tests__") { ... on Tree { entries { name } } }
-            envExample: object(expression: "HEAD:.env.example") { ... on Blob { byteSize } }
-            packageJson: object(expression: "HEAD:package.json") { ... on Blob { byteSize text } }
-            requirementsTxt: object(expression: "HEAD:requirements.txt") { ... on Blob { byteSize text } }
-        }
-        """
+        batch_size = signal_batch_sizer.size
+        batches = [top_repos[i:i + batch_size] for i in range(0, len(top_repos), batch_size)]
+        semaphore = asyncio.Semaphore(max(1, settings.github_signal_batch_concurrency))
+
+        results = await asyncio.gather(*(
+            self._fetch_signal_batch(batch, str(batch_idx), semaphore, on_quota_wait)
+            for batch_idx, batch in enumerate(batches)
+        ))
 
         signals_by_repo = {}
+        for batch_signals in results:
+            signals_by_repo.update(batch_signals)
+        return signals_by_repo
+
+    async def _fetch_signal_batch(
+        self,
+        batch: List[Tuple[str, str]],
+        label: str,
+        semaphore: asyncio.Semaphore,
+        on_quota_wait: Optional[Callable[[float], None]] = None,
+    ) -> Dict[str, Any]:
+        """Fetch one Query 2 batch. On an overload error the batch is split in half and retried."""
+        repo_queries = []
+        for i, (owner, name) in enumerate(batch):
+            repo_queries.append(
+                f'repo{i}: repository(owner: "{owner}", name: "{name}") {{ ...ProductionSignals }}'
+            )
 
-        # Split into batches to avoid GitHub's query complexity limit (502 errors)
-        batches = [top_repos[i:i + BATCH_SIZE] for i in range(0, len(top_repos), BATCH_SIZE)]
+        query = "query {\n" + RATE_LIMIT_FIELDS + "\n" + "\n".join(repo_queries) + "\n}\n" + PRODUCTION_SIGNALS_FRAGMENT
 
-        for batch_idx, batch in enumerate(batches):
-            try:
-                repo_queries = []
-                for i, (owner, name) in enumerate(batch):
-                    repo_queries.append(
-                        f'repo{i}: repository(owner: "{owner}", name: "{name}") {{ ...ProductionSignals }}'
-                    )
-
-                query = "query {\n" + "\n".join(repo_queries) + "\n}\n" + PRODUCTION_SIGNALS_FRAGMENT
-
-                async with httpx.AsyncClient(timeout=30) as client:
-                    resp = await client.post(
-                        self.graphql_url,
-                        json={"query": query},
-                        headers=self._headers(),
-                    )
-                    resp.raise_for_status()
-                    result = resp.json()
-
-                    if "errors" in result:
-                        logger.warning(f"Query 2 batch {batch_idx} GraphQL errors: {result['errors']}")
-                        if "data" not in result:
-                            continue
-
-                    data = result.get("data", {})
-
-                    for i in range(len(batch)):
-                        repo_data = data.get(f"repo{i}")
-                        if not repo_data:
-                            continue
-                        repo_name = repo_data.get("name", batch[i][1])
-                        cleaned = self._clean_production_signals(repo_data)
-                        signals_by_repo[repo_name] = cleaned
+        try:
+            async with semaphore:
+                result = await self._graphql(
+                    query,
+                    kind="production_signals",
+                    default_cost=1,
+                    on_quota_wait=on_quota_wait,
+                )
+        except Exception as e:
+            if _is_overload_error(e):
+                return await self._split_signal_batch(batch, label, semaphore, on_quota_wait, e)
+            logger.warning(f"Query 2 batch {label} failed, continuing with remaining batches: {e}")
+            return {}
 
-            except Exception as e:
-                logger.warning(f"Query 2 batch {batch_idx} failed, continuing with remaining batches: {e}")
-                continue
+        if "errors" in result:
+            if not result.get("data") and _is_overload_error(result["errors"]):
+                return await self._split_signal_batch(batch, label, semaphore, on_quota_wait, result["errors"])
+            logger.warning(f"Query 2 batch {label} GraphQL errors: {result['errors']}")
+            if "data" not in result:
+                return {}
 
+        signal_batch_sizer.success(len(batch))
+        data = result.get("data") or {}
+
+        signals_by_repo = {}
+        for i in range(len(batch)):
+            repo_data = data.get(f"repo{i}")
+            if not repo_data:
+                continue
+            repo_name = repo_data.get("name", batch[i][1])
+            signals_by_repo[repo_name] = self._clean_production_signals(repo_data)
         return signals_by_repo
 
+    async def _split_signal_batch(
+        self,
+        batch: List[Tuple[str, str]],
+        label: str,
+        semaphore: asyncio.Semaphore,
+        on_quota_wait: Optional[Callable[[float], None]],
+        error: Any,
+    ) -> Dict[str, Any]:
+        signal_batch_sizer.failure(len(batch))
+        if len(batch) == 1:
+            logger.warning(f"Query 2 batch {label} overloaded even for a single repo, skipping: {error}")
+            return {}
+
+        logger.warning(f"Query 2 batch {label} overloaded ({len(batch)} repos), retrying as two halves: {error}")
+        mid = len(batch) // 2
+        left, right = await asyncio.gather(
+            self._fetch_signal_batch(batch[:mid], f"{label}a", semaphore, on_quota_wait),
+            self._fetch_signal_batch(batch[mid:], f"{label}b", semaphore, on_quota_wait),
+        )
+        return {**left, **right}
+
     def _clean_production_signals(self, repo_data: Dict[str, Any]) -> Dict[str, Any]:
         """Clean production signal data: strip null entries, collapse test dirs, cap large files."""
         MAX_DEPENDENCY_SIZE = 50 * 1024  # 50KB cap per PRD
@@ -288,7 +588,7 @@ class GitHubFetcher:
             cleaned["testDirectory"] = test_dir
 
         # Dependency files — include text only if under size cap
-        for key in ("packageJson", "requirementsTxt"):
+        for key in DEPENDENCY_MANIFESTS:
             dep = repo_data.get(key)
             if dep:
                 byte_size = dep.get("byteSize", 0)
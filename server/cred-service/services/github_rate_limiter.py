@@ -0,0 +1,171 @@
+"""
+Shared GitHub GraphQL rate-limit scheduler.
+
+Every GitHub query asks for `rateLimit { cost remaining resetAt limit }` and
+feeds the answer back here, so all in-flight jobs share one view of the budget.
+Before each request the fetcher takes a slot, which:
+
+  - caps concurrent GitHub requests (GITHUB_MAX_CONCURRENT_REQUESTS)
+  - paces requests once the remaining budget drops below GITHUB_PACE_BELOW
+  - queues a request until resetAt when the budget can't cover its estimated cost
+  - honours secondary-limit Retry-After deferrals (403/429)
+
+Waits longer than GITHUB_MAX_QUOTA_WAIT raise GitHubQuotaExhausted instead of
+blocking the extraction past its timeout.
+"""
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+import httpx
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_FIELDS = "rateLimit { cost remaining resetAt limit }"
+
+
+class GitHubQuotaExhausted(Exception):
+    """Raised when the GitHub budget won't recover within GITHUB_MAX_QUOTA_WAIT."""
+
+
+class GitHubRateLimitScheduler:
+
+    def __init__(self):
+        self.limit: Optional[int] = None
+        self.remaining: Optional[int] = None
+        self.reset_at: Optional[float] = None  # epoch seconds
+        self.deferred_until: float = 0.0
+        self.reserved = 0  # estimated cost of requests currently in flight
+        self.waiting = 0
+        self._last_request_at = 0.0
+        self._observed_costs: Dict[str, int] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._pace_lock: Optional[asyncio.Lock] = None
+
+    # ---------------------------
+    # BUDGET FEEDBACK
+    # ---------------------------
+
+    def record(self, rate_limit: Optional[Dict[str, Any]], kind: Optional[str] = None):
+        """Update budget from a GraphQL `rateLimit` object."""
+        if not rate_limit:
+            return
+        if rate_limit.get("remaining") is not None:
+            self.remaining = rate_limit["remaining"]
+        if rate_limit.get("limit") is not None:
+            self.limit = rate_limit["limit"]
+        reset_at = rate_limit.get("resetAt")
+        if reset_at:
+            try:
+                self.reset_at = datetime.fromisoformat(reset_at.replace("Z", "+00:00")).timestamp()
+            except ValueError:
+                pass
+        if kind and rate_limit.get("cost") is not None:
+            self._observed_costs[kind] = rate_limit["cost"]
+        logger.debug(f"GitHub rate limit — remaining={self.remaining}/{self.limit}, cost={rate_limit.get('cost')}, kind={kind}")
+
+    def record_response(self, resp: httpx.Response):
+        """Update budget from response headers and defer on secondary limits."""
+        remaining = resp.headers.get("x-ratelimit-remaining")
+        reset = resp.headers.get("x-ratelimit-reset")
+        if remaining is not None and remaining.isdigit():
+            self.remaining = int(remaining)
+        if reset is not None and reset.isdigit():
+            self.reset_at = float(reset)
+
+        if resp.status_code in (403, 429):
+            retry_after = resp.headers.get("retry-after")
+            if retry_after and retry_after.isdigit():
+                delay = int(retry_after)
+            elif self.remaining == 0 and self.reset_at:
+                delay = max(1, int(self.reset_at - time.time()))
+            else:
+                delay = 60  # GitHub's guidance for secondary limits without Retry-After
+            self.defer(delay)
+
+    def defer(self, seconds: float):
+        self.deferred_until = max(self.deferred_until, time.time() + seconds)
+        logger.warning(f"GitHub requests deferred for {seconds:.0f}s (secondary rate limit)")
+
+    def estimate(self, kind: str, default: int) -> int:
+        """Last observed cost for this kind of query, or the caller's default."""
+        return self._observed_costs.get(kind, default)
+
+    # ---------------------------
+    # SCHEDULING
+    # ---------------------------
+
+    def _delay_for(self, cost: int) -> float:
+        now = time.time()
+        if self.deferred_until > now:
+            return self.deferred_until - now
+
+        if self.remaining is None or self.reset_at is None:
+            return 0.0  # No budget information yet — first request tells us
+
+        if self.reset_at <= now:
+            # Window rolled over — budget is refreshed until GitHub tells us otherwise
+            self.remaining = self.limit
+            return 0.0
+
+        available = self.remaining - self.reserved
+        if available - cost < settings.github_quota_reserve:
+            return self.reset_at - now + 1
+
+        if available < settings.github_pace_below:
+            # Spread what's left evenly over the rest of the window
+            interval = (self.reset_at - now) / max(1, available // max(1, cost))
+            return max(0.0, self._last_request_at + interval - now)
+
+        return 0.0
+
+    @asynccontextmanager
+    async def slot(self, cost: int = 1, on_wait: Optional[Callable[[float], None]] = None):
+        """Hold a GitHub request slot. Waits (and reports via on_wait) while over budget."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(max(1, settings.github_max_concurrent_requests))
+            self._pace_lock = asyncio.Lock()
+
+        async with self._semaphore:
+            async with self._pace_lock:
+                delay = self._delay_for(cost)
+                while delay > 0:
+                    if delay > settings.github_max_quota_wait:
+                        resume = datetime.utcfromtimestamp(time.time() + delay).strftime("%H:%M:%S UTC")
+                        raise GitHubQuotaExhausted(f"GitHub API quota exhausted — available again at {resume}")
+                    logger.info(f"GitHub request waiting {delay:.1f}s for quota (remaining={self.remaining}, cost={cost})")
+                    if on_wait:
+                        on_wait(delay)
+                    self.waiting += 1
+                    try:
+                        await asyncio.sleep(delay)
+                    finally:
+                        self.waiting -= 1
+                    delay = self._delay_for(cost)
+                self._last_request_at = time.time()
+                self.reserved += cost
+
+            try:
+                yield
+            finally:
+                self.reserved -= cost
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "remaining": self.remaining,
+            "limit": self.limit,
+            "reset_at": datetime.utcfromtimestamp(self.reset_at).isoformat() if self.reset_at else None,
+            "deferred": self.deferred_until > time.time(),
+            "in_flight_cost": self.reserved,
+            "waiting": self.waiting,
+        }
+
+
+# Singleton — shared across all jobs in this process
+github_scheduler = GitHubRateLimitScheduler()
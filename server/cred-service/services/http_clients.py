@@ -0,0 +1,108 @@
+"""
+Shared HTTP clients for upstream APIs.
+
+One pooled httpx client per upstream host, created at app startup and closed
+on shutdown (see app/main.py). Reusing clients keeps TCP/TLS connections alive
+between requests instead of paying a fresh handshake on every call, and the
+per-host limits cap how many sockets we hold open to each upstream.
+
+Fetchers receive a client from here instead of building their own, and post to
+absolute URLs — so a client passed to a fetcher directly (e.g. in tests) works too:
+    client = http_clients.get_async("github")
+
+Async clients are only created on the event loop, which can't interleave the
+lookup and the insert; sync clients are fetched from worker threads, so their
+creation is serialised by a lock.
+"""
+
+import logging
+import threading
+from typing import Dict
+
+import httpx
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Per-host pool configuration.
+# max_connections caps concurrent sockets; max_keepalive is how many idle ones we keep warm.
+UPSTREAMS = {
+    "github": {"max_connections": 20, "max_keepalive": 10},
+    "leetcode": {"max_connections": 10, "max_keepalive": 5},
+    "brevo": {"max_connections": 5, "max_keepalive": 2},
+}
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class HttpClientPool:
+    """Lazily-created, app-scoped httpx clients keyed by upstream name."""
+
+    def __init__(self):
+        self._async_clients: Dict[str, httpx.AsyncClient] = {}
+        self._sync_clients: Dict[str, httpx.Client] = {}
+        self._sync_lock = threading.Lock()
+        self._http2 = False
+
+    def _client_kwargs(self, name: str) -> dict:
+        if name not in UPSTREAMS:
+            raise KeyError(f"Unknown upstream '{name}'. Add it to UPSTREAMS in http_clients.py")
+        cfg = UPSTREAMS[name]
+        return {
+            "timeout": settings.http_timeout,
+            "limits": httpx.Limits(
+                max_connections=cfg["max_connections"],
+                max_keepalive_connections=cfg["max_keepalive"],
+                keepalive_expiry=settings.http_keepalive_expiry,
+            ),
+            "http2": self._http2,
+        }
+
+    def start(self):
+        """Create the async clients for every upstream. Call once on app startup."""
+        self._http2 = settings.http_http2
+        if self._http2 and not _http2_available():
+            logger.warning("HTTP_HTTP2=true but the 'h2' package is not installed — falling back to HTTP/1.1")
+            self._http2 = False
+
+        for name in UPSTREAMS:
+            self.get_async(name)
+        logger.info(f"HTTP client pool started — upstreams={list(UPSTREAMS.keys())}, http2={self._http2}")
+
+    def get_async(self, name: str) -> httpx.AsyncClient:
+        client = self._async_clients.get(name)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(**self._client_kwargs(name))
+            self._async_clients[name] = client
+        return client
+
+    def get_sync(self, name: str) -> httpx.Client:
+        """Sync client for code running in worker threads (e.g. email delivery)."""
+        with self._sync_lock:
+            client = self._sync_clients.get(name)
+            if client is None or client.is_closed:
+                client = httpx.Client(**self._client_kwargs(name))
+                self._sync_clients[name] = client
+            return client
+
+    async def aclose(self):
+        """Close every client. Call once on app shutdown."""
+        for client in self._async_clients.values():
+            await client.aclose()
+        with self._sync_lock:
+            for client in self._sync_clients.values():
+                client.close()
+            self._sync_clients.clear()
+        self._async_clients.clear()
+        logger.info("HTTP client pool closed")
+
+
+# Singleton — shared across routes and background tasks
+http_clients = HttpClientPool()
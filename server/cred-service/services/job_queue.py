@@ -0,0 +1,343 @@
+"""
+Durable DB-backed job queue.
+
+Extraction, refresh and generation are enqueued as job_queue rows and run by
+QueueWorker (services/queue_worker.py) — inside the web process or as separate
+`python -m app.worker` processes. A deploy or crash no longer loses work, and the
+number of jobs in flight is bounded per worker.
+
+Claiming:
+  - Postgres: SELECT ... FOR UPDATE SKIP LOCKED — concurrent workers never block
+    on, or double-claim, the same row
+  - SQLite:   compare-and-set UPDATE ... WHERE id = ? AND <still claimable>; the
+    database serializes writers, so exactly one claimer sees rowcount == 1
+
+Leases: a claim holds the task for JOB_QUEUE_LEASE_SECONDS; the worker heartbeats
+while it runs. A task whose lease expires (worker killed) is claimable again and
+counts an attempt; after JOB_QUEUE_MAX_ATTEMPTS it is failed along with its job.
+
+Progress and cancellation cross processes through the row: the worker mirrors
+progress_manager snapshots into `progress` (read by the SSE stream when the job runs
+elsewhere) and picks up `cancel_requested` on its next heartbeat. Snapshots are
+published from the web event loop and pipeline threads alike, so the listener only
+queues them; a writer thread does the DB writes, keeping the latest snapshot per job.
+"""
+
+import base64
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, func, or_, update
+
+from app.config import settings
+from app.database import SessionLocal, QueueTask, AnalysisJob, engine
+from services.progress_manager import progress_manager, TERMINAL_STAGES
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_MIRROR_INTERVAL = 1.0  # seconds between progress writes per job (terminal stages always written)
+
+
+def encode_bytes(data: Optional[bytes]) -> Optional[str]:
+    return base64.b64encode(data).decode("ascii") if data else None
+
+
+def decode_bytes(data: Optional[str]) -> Optional[bytes]:
+    return base64.b64decode(data) if data else None
+
+
+class JobQueue:
+    """Enqueue / claim / heartbeat / complete on the job_queue table."""
+
+    def __init__(self):
+        self._skip_locked = engine.dialect.name == "postgresql"
+        self._wake_callbacks: List[Callable[[], None]] = []
+        self._mirrored_at: Dict[str, float] = {}
+        self._mirror_pending: Dict[str, Optional[Dict[str, Any]]] = {}  # job_id → snapshot to write (None = cleared)
+        self._mirror_lock = threading.Lock()
+        self._mirror_wake = threading.Event()
+        self._mirror_thread: Optional[threading.Thread] = None
+
+    # ---------------------------
+    # PRODUCER
+    # ---------------------------
+
+    def enqueue(self, kind: str, job_id: str, payload: Dict[str, Any] = None) -> int:
+        db = SessionLocal()
+        try:
+            task = QueueTask(
+                job_id=job_id,
+                kind=kind,
+                payload=payload or {},
+                status="queued",
+                attempts=0,
+                cancel_requested=False,
+                created_at=datetime.utcnow(),
+            )
+            db.add(task)
+            db.commit()
+            task_id = task.id
+        finally:
+            db.close()
+
+        logger.info(f"Queued {kind} task {task_id} for {job_id}", extra={"job_id": job_id})
+        for wake in self._wake_callbacks:
+            wake()  # an idle worker in this process claims it now instead of at its next poll
+        return task_id
+
+    def on_enqueue(self, callback: Callable[[], None]):
+        self._wake_callbacks.append(callback)
+
+    def request_cancel(self, job_id: str, kind: str = "generation") -> Optional[str]:
+        """
+        Cancel the job's open task of `kind`. Returns "queued" when it was removed before
+        any worker claimed it, "running" when the running worker has been asked to stop,
+        None when there is no open task.
+        """
+        db = SessionLocal()
+        try:
+            task = (
+                db.query(QueueTask)
+                .filter(QueueTask.job_id == job_id, QueueTask.kind == kind, QueueTask.status.in_(("queued", "running")))
+                .order_by(QueueTask.id.desc())
+                .first()
+            )
+            if task is None:
+                return None
+            if task.status == "queued":
+                task.status = "cancelled"
+                task.finished_at = datetime.utcnow()
+                outcome = "queued"
+            else:
+                task.cancel_requested = True
+                outcome = "running"
+            db.commit()
+            return outcome
+        finally:
+            db.close()
+
+    # ---------------------------
+    # WORKER
+    # ---------------------------
+
+    def claim(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """Claim the oldest claimable task — queued, or running on an expired lease. None when idle."""
+        for _ in range(5):  # a lost compare-and-set race just means someone else got it — try the next row
+            db = SessionLocal()
+            try:
+                now = datetime.utcnow()
+                claimable = or_(
+                    QueueTask.status == "queued",
+                    and_(QueueTask.status == "running", QueueTask.lease_expires_at < now),
+                )
+                query = db.query(QueueTask).filter(claimable).order_by(QueueTask.id)
+                if self._skip_locked:
+                    query = query.with_for_update(skip_locked=True)
+                task = query.first()
+                if task is None:
+                    db.rollback()
+                    return None
+
+                if task.attempts >= settings.job_queue_max_attempts:
+                    self._exhaust(db, task, now)
+                    continue
+
+                reclaimed = task.status == "running"
+                values = {
+                    "status": "running",
+                    "worker_id": worker_id,
+                    "attempts": task.attempts + 1,
+                    "lease_expires_at": now + timedelta(seconds=settings.job_queue_lease_seconds),
+                    "heartbeat_at": now,
+                    "started_at": now,
+                }
+                if self._skip_locked:
+                    # Row is locked by this transaction — plain update
+                    for key, value in values.items():
+                        setattr(task, key, value)
+                    db.commit()
+                else:
+                    result = db.execute(
+                        update(QueueTask)
+                        .where(QueueTask.id == task.id, claimable, QueueTask.attempts == task.attempts)
+                        .values(**values)
+                    )
+                    db.commit()
+                    if result.rowcount != 1:
+                        continue
+
+                if reclaimed:
+                    logger.warning(
+                        f"Reclaimed {task.kind} task {task.id} for {task.job_id} (attempt {values['attempts']})",
+                        extra={"job_id": task.job_id},
+                    )
+                return {
+                    "id": task.id,
+                    "job_id": task.job_id,
+                    "kind": task.kind,
+                    "payload": dict(task.payload or {}),
+                    "attempt": values["attempts"],
+                }
+            except Exception:
+                db.rollback()
+                raise
+            finally:
+                db.close()
+        return None
+
+    def heartbeat(self, task_id: int, worker_id: str) -> Tuple[bool, bool]:
+        """Extend the lease. Returns (still_owned, cancel_requested)."""
+        db = SessionLocal()
+        try:
+            now = datetime.utcnow()
+            result = db.execute(
+                update(QueueTask)
+                .where(QueueTask.id == task_id, QueueTask.worker_id == worker_id, QueueTask.status == "running")
+                .values(heartbeat_at=now, lease_expires_at=now + timedelta(seconds=settings.job_queue_lease_seconds))
+            )
+            cancel_requested = db.query(QueueTask.cancel_requested).filter(QueueTask.id == task_id).scalar()
+            db.commit()
+            return result.rowcount == 1, bool(cancel_requested)
+        finally:
+            db.close()
+
+    def complete(self, task_id: int, worker_id: str, status: str = "done", error: str = None):
+        """Finish a task this worker owns. The resume bytes are dropped from the payload."""
+        db = SessionLocal()
+        try:
+            task = db.query(QueueTask).filter(QueueTask.id == task_id, QueueTask.worker_id == worker_id).first()
+            if task is None or task.status != "running":
+                return  # lease lost — the task belongs to another worker now
+            # The job's last snapshot must land while the task still counts as running
+            self._flush_mirror(task.job_id)
+            task.status = status
+            task.last_error = error
+            task.finished_at = datetime.utcnow()
+            task.lease_expires_at = None
+            if task.payload and "resume_b64" in task.payload:
+                task.payload = {k: v for k, v in task.payload.items() if k != "resume_b64"}
+            db.commit()
+        finally:
+            db.close()
+
+    def _exhaust(self, db, task: QueueTask, now: datetime):
+        """Fail a task that kept losing its worker, and its job with it."""
+        message = f"{task.kind} worker lost {task.attempts} times — giving up"
+        logger.error(f"Queue task {task.id} for {task.job_id}: {message}", extra={"job_id": task.job_id})
+        task.status = "failed"
+        task.last_error = message
+        task.finished_at = now
+        job = db.query(AnalysisJob).filter(AnalysisJob.id == task.job_id).first()
+        if job and job.status in ("pending", "extracting", "generating"):
+            # A refresh keeps the previous raw data, so the job stays usable
+            job.status = "extracted" if task.kind == "refresh" else "failed"
+            job.error_message = message
+            job.updated_at = now
+        db.commit()
+
+    # ---------------------------
+    # PROGRESS MIRROR
+    # ---------------------------
+
+    def mirror_progress(self, job_id: str, entry: Optional[Dict[str, Any]]):
+        """
+        progress_manager listener — queue the snapshot for the job's running task
+        (throttled; terminal stages and clears always go through). Never touches the DB.
+        """
+        terminal = entry is None or entry.get("stage") in TERMINAL_STAGES
+        now = time.monotonic()
+        with self._mirror_lock:
+            if not terminal and now - self._mirrored_at.get(job_id, 0) < PROGRESS_MIRROR_INTERVAL:
+                return
+            self._mirrored_at[job_id] = now
+            if terminal:
+                self._mirrored_at.pop(job_id, None)
+            self._mirror_pending[job_id] = dict(entry) if entry is not None else None
+            if self._mirror_thread is None:
+                self._mirror_thread = threading.Thread(target=self._mirror_writer, name="progress-mirror", daemon=True)
+                self._mirror_thread.start()
+        self._mirror_wake.set()
+
+    def _mirror_writer(self):
+        while True:
+            self._mirror_wake.wait()
+            self._mirror_wake.clear()
+            with self._mirror_lock:
+                pending, self._mirror_pending = self._mirror_pending, {}
+            for job_id, progress in pending.items():
+                self._write_progress(job_id, progress)
+
+    def _flush_mirror(self, job_id: str):
+        """Write the job's queued snapshot now, in the calling thread."""
+        with self._mirror_lock:
+            if job_id not in self._mirror_pending:
+                return
+            progress = self._mirror_pending.pop(job_id)
+        self._write_progress(job_id, progress)
+
+    def discard_progress(self, job_id: str):
+        """Forget the job's queued snapshot — its task now belongs to another worker."""
+        with self._mirror_lock:
+            self._mirror_pending.pop(job_id, None)
+            self._mirrored_at.pop(job_id, None)
+
+    def _write_progress(self, job_id: str, progress: Optional[Dict[str, Any]]):
+        db = SessionLocal()
+        try:
+            db.execute(
+                update(QueueTask)
+                .where(QueueTask.job_id == job_id, QueueTask.status == "running")
+                .values(progress=progress)
+            )
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.debug(f"Progress mirror failed for {job_id}: {e}")
+        finally:
+            db.close()
+
+    def current_progress(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Progress for the job wherever it runs: the in-process entry when this process is
+        running it, otherwise the snapshot mirrored by the worker that is.
+        """
+        local = progress_manager.get(job_id)
+        if local and local.get("stage") != "pending":
+            return local
+        db = SessionLocal()
+        try:
+            # Latest task only — an older task's snapshot belongs to a finished phase
+            mirrored = (
+                db.query(QueueTask.progress)
+                .filter(QueueTask.job_id == job_id)
+                .order_by(QueueTask.id.desc())
+                .limit(1)
+                .scalar()
+            )
+        finally:
+            db.close()
+        return mirrored or local
+
+    def stats(self) -> Dict[str, Any]:
+        db = SessionLocal()
+        try:
+            counts = dict(
+                db.query(QueueTask.status, func.count(QueueTask.id))
+                .filter(QueueTask.status.in_(("queued", "running")))
+                .group_by(QueueTask.status)
+                .all()
+            )
+        finally:
+            db.close()
+        return {
+            "embedded_workers": settings.job_queue_embedded,
+            "queued": counts.get("queued", 0),
+            "running": counts.get("running", 0),
+        }
+
+
+# Singleton instance
+job_queue = JobQueue()
@@ -8,15 +8,22 @@ The LLM receives the raw data and does all the reasoning.
 
 import logging
 import httpx
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+
+from services.http_clients import http_clients
 
 logger = logging.getLogger(__name__)
 
 
 class LeetCodeFetcher:
 
-    def __init__(self):
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
         self.graphql_url = "https://leetcode.com/graphql"
+        self._http = client
+
+    def _client(self) -> httpx.AsyncClient:
+        """Injected client if given, otherwise the app-scoped pooled client."""
+        return self._http or http_clients.get_async("leetcode")
 
     def _browser_headers(self) -> Dict[str, str]:
         return {
@@ -102,20 +109,19 @@ class LeetCodeFetcher:
         }
         """
 
-        async with httpx.AsyncClient(timeout=30) as client:
-            resp = await client.post(
-                self.graphql_url,
-                json={"query": query, "variables": {"username": username}},
-                headers=self._browser_headers(),
-            )
-
-            if resp.status_code != 200:
-                return {
-                    "error": f"LeetCode GraphQL request failed: HTTP {resp.status_code}",
-                    "data_source": "error_fallback",
-                }
+        resp = await self._client().post(
+            self.graphql_url,
+            json={"query": query, "variables": {"username": username}},
+            headers=self._browser_headers(),
+        )
 
+        if resp.status_code != 200:
             return {
-                "data": resp.json().get("data", {}),
-                "data_source": "leetcode_graphql",
+                "error": f"LeetCode GraphQL request failed: HTTP {resp.status_code}",
+                "data_source": "error_fallback",
             }
+
+        return {
+            "data": resp.json().get("data", {}),
+            "data_source": "leetcode_graphql",
+        }
@@ -0,0 +1,247 @@
+"""
+Shared LLM admission controller.
+
+Every report LLM call takes a slot here before it reaches the provider, so all
+generation jobs in the process share one requests-per-minute / tokens-per-minute
+budget (LLM_RPM_LIMIT, LLM_TPM_LIMIT) instead of firing at once and collapsing
+into 429s and fallback retries:
+
+  - a call is admitted when the last 60s of admitted calls plus its estimated
+    tokens (prompt + LLM_ADMISSION_OUTPUT_TOKENS) fit both budgets
+  - calls that don't fit queue in job order — a job that already started keeps
+    priority over jobs that arrived after it — and only the head of the queue is
+    admitted, so large jobs are not starved by small ones
+  - while queued, on_wait reports the job's queue position and an ETA simulated
+    from the budget window; the pipeline publishes both over SSE
+  - a provider 429 defers all admissions for its Retry-After
+  - once a call finishes, its estimate is replaced by the tokens it actually used
+
+Waits longer than LLM_ADMISSION_MAX_WAIT raise LLMCapacityExhausted instead of
+holding the job past its queue lease. Pipelines run their own event loops in worker
+threads, so state is guarded by a threading lock and waiters poll.
+"""
+
+import asyncio
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+WINDOW_SECONDS = 60.0
+POLL_INTERVAL = 1.0  # seconds between a waiter's checks — also how often its position is refreshed
+DEFAULT_RETRY_AFTER = 20.0  # seconds to defer on a 429 without a usable Retry-After
+MAX_RETRY_AFTER = 120.0
+
+
+class LLMCapacityExhausted(Exception):
+    """Raised when a call would wait longer than LLM_ADMISSION_MAX_WAIT for budget."""
+
+
+class LLMAdmissionController:
+
+    def __init__(self):
+        self._window: deque = deque()  # admitted calls: {"at", "requests", "tokens"}
+        self._tickets: Dict[int, Dict[str, Any]] = {}  # waiting calls: id → {"job_id", "order", "requests", "tokens"}
+        self._job_order: Dict[str, int] = {}  # job_id → arrival order, held for the job's whole generation
+        self._job_refs: Dict[str, int] = {}
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self.deferred_until = 0.0
+        self.admitted = 0
+        self.rate_limited = 0
+
+    # ---------------------------
+    # JOB ORDER
+    # ---------------------------
+
+    @contextmanager
+    def job(self, job_id: str):
+        """Hold the job's place in line for all of its calls (including ones made later)."""
+        with self._lock:
+            self._job_order.setdefault(job_id, next(self._seq))
+            self._job_refs[job_id] = self._job_refs.get(job_id, 0) + 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._job_refs[job_id] -= 1
+                if self._job_refs[job_id] <= 0:
+                    self._job_refs.pop(job_id, None)
+                    self._job_order.pop(job_id, None)
+
+    # ---------------------------
+    # BUDGET FEEDBACK
+    # ---------------------------
+
+    def settle(self, grant: Dict[str, Any], tokens: Optional[int]):
+        """Replace an admitted call's estimate with the tokens it actually used."""
+        if tokens is None:
+            return
+        with self._lock:
+            grant["tokens"] = tokens
+
+    def record_rate_limit(self, error: Exception) -> float:
+        """Defer all admissions after a provider 429. Returns the deferral in seconds."""
+        delay = DEFAULT_RETRY_AFTER
+        headers = getattr(getattr(error, "response", None), "headers", None) or {}
+        try:
+            if headers.get("retry-after-ms"):
+                delay = float(headers["retry-after-ms"]) / 1000
+            elif headers.get("retry-after"):
+                delay = float(headers["retry-after"])
+        except (TypeError, ValueError):
+            pass
+        delay = min(MAX_RETRY_AFTER, max(1.0, delay))
+        with self._lock:
+            self.deferred_until = max(self.deferred_until, time.time() + delay)
+            self.rate_limited += 1
+        logger.warning(f"LLM provider rate limit hit — admissions deferred for {delay:.0f}s")
+        return delay
+
+    # ---------------------------
+    # SCHEDULING
+    # ---------------------------
+
+    def _prune(self, now: float):
+        while self._window and self._window[0]["at"] <= now - WINDOW_SECONDS:
+            self._window.popleft()
+
+    @staticmethod
+    def _fits(used_requests: int, used_tokens: int, requests: int, tokens: int) -> bool:
+        rpm, tpm = settings.llm_rpm_limit, settings.llm_tpm_limit
+        return (rpm <= 0 or used_requests + requests <= rpm) and (tpm <= 0 or used_tokens + tokens <= tpm)
+
+    def _fit_time(self, entries: List[Dict[str, Any]], requests: int, tokens: int, after: float) -> float:
+        """Earliest time >= after at which a call fits the window formed by entries."""
+        t = after
+        active = [e for e in entries if e["at"] > t - WINDOW_SECONDS]
+        used_requests = sum(e["requests"] for e in active)
+        used_tokens = sum(e["tokens"] for e in active)
+        for entry in active:
+            if self._fits(used_requests, used_tokens, requests, tokens):
+                return t
+            # Wait for the oldest call to leave the window
+            used_requests -= entry["requests"]
+            used_tokens -= entry["tokens"]
+            t = max(t, entry["at"] + WINDOW_SECONDS)
+        return t  # window empty — even a call larger than the whole budget goes through alone
+
+    def _queue(self) -> List[Tuple[int, Dict[str, Any]]]:
+        return sorted(self._tickets.items(), key=lambda item: (item[1]["order"], item[0]))
+
+    def _schedule(self, now: float, until_ticket: Optional[int] = None) -> Dict[int, float]:
+        """Simulated admission time of each waiting ticket, in queue order."""
+        entries = list(self._window)
+        t = max(now, self.deferred_until)
+        times = {}
+        for ticket_id, ticket in self._queue():
+            t = self._fit_time(entries, ticket["requests"], ticket["tokens"], t)
+            times[ticket_id] = t
+            entries.append({"at": t, "requests": ticket["requests"], "tokens": ticket["tokens"]})
+            if ticket_id == until_ticket:
+                break
+        return times
+
+    def _job_status(self, job_id: str, now: float) -> Tuple[Optional[int], Optional[int]]:
+        """(queue position among waiting jobs, seconds until all its waiting calls are admitted)."""
+        queue = self._queue()
+        own = [ticket_id for ticket_id, ticket in queue if ticket["job_id"] == job_id]
+        if not own:
+            return None, None
+        order = self._tickets[own[0]]["order"]
+        ahead = {ticket["job_id"] for _, ticket in queue if ticket["order"] < order}
+        times = self._schedule(now, until_ticket=own[-1])
+        return len(ahead) + 1, int(round(times[own[-1]] - now))
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        job_id: str,
+        tokens: int,
+        requests: int = 1,
+        on_wait: Optional[Callable[[Optional[int], Optional[int]], None]] = None,
+    ):
+        """
+        Hold admission for one LLM call. Waits while over budget, reporting
+        on_wait(position, eta_seconds) as they change and on_wait(None, None) once the
+        job has no calls left waiting. Yields the grant for settle().
+        """
+        with self._lock:
+            ticket_id = next(self._seq)
+            self._tickets[ticket_id] = {
+                "job_id": job_id,
+                "order": self._job_order.get(job_id, ticket_id),
+                "requests": requests,
+                "tokens": tokens,
+            }
+
+        waited_since = time.time()
+        reported = None
+        grant = None
+        try:
+            while True:
+                with self._lock:
+                    now = time.time()
+                    self._prune(now)
+                    head = self._queue()[0][0]
+                    if head == ticket_id and now >= self.deferred_until:
+                        used_requests = sum(e["requests"] for e in self._window)
+                        used_tokens = sum(e["tokens"] for e in self._window)
+                        if not self._window or self._fits(used_requests, used_tokens, requests, tokens):
+                            grant = {"at": now, "requests": requests, "tokens": tokens}
+                            self._window.append(grant)
+                            del self._tickets[ticket_id]
+                            self.admitted += 1
+                            status = self._job_status(job_id, now)
+                            break
+                    status = self._job_status(job_id, now)
+                    delay = self._schedule(now, until_ticket=ticket_id)[ticket_id] - now
+
+                if time.time() - waited_since + delay > settings.llm_admission_max_wait:
+                    raise LLMCapacityExhausted(
+                        f"LLM capacity exhausted — about {int(delay)}s of queued work ahead of this job"
+                    )
+                if status != reported:
+                    reported = status
+                    logger.info(
+                        f"LLM call for {job_id} queued (position {status[0]}, eta {status[1]}s, {tokens} est. tokens)",
+                        extra={"job_id": job_id},
+                    )
+                    if on_wait:
+                        on_wait(*status)
+                await asyncio.sleep(min(POLL_INTERVAL, max(0.05, delay)))
+        except BaseException:
+            with self._lock:
+                self._tickets.pop(ticket_id, None)
+            raise
+
+        if reported is not None and on_wait and status[0] is None:
+            on_wait(None, None)  # nothing of this job is waiting any more
+        yield grant
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            now = time.time()
+            self._prune(now)
+            return {
+                "rpm_limit": settings.llm_rpm_limit or None,
+                "tpm_limit": settings.llm_tpm_limit or None,
+                "window_requests": sum(e["requests"] for e in self._window),
+                "window_tokens": sum(e["tokens"] for e in self._window),
+                "waiting_calls": len(self._tickets),
+                "waiting_jobs": len({ticket["job_id"] for ticket in self._tickets.values()}),
+                "deferred": self.deferred_until > now,
+                "admitted": self.admitted,
+                "rate_limited": self.rate_limited,
+            }
+
+
+# Singleton — shared across all generation jobs in this process
+llm_admission = LLMAdmissionController()
@@ -0,0 +1,143 @@
+"""
+Per-call LLM telemetry.
+
+Every report LLM call — and every report served from the report cache instead —
+is stored as an llm_calls row against its job: model, report type, status, token
+usage (input / cached / output), time to first token, total duration, web-search
+call count, whether the non-streaming fallback was needed, and a cost estimate
+from the LLM_PRICE_* settings.
+
+summarize() turns a set of rows into totals and latency percentiles; the routes
+in app/routes/telemetry.py use it per job and across all jobs in a time window
+(grouped by report type and model) to find slow or expensive report types and to
+spot regressions after prompt or model changes.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.config import settings
+from app.database import SessionLocal, LLMCall
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_cost(stats: Dict[str, Any]) -> Optional[float]:
+    """USD estimate for one call, or None when the provider reported no usage."""
+    if stats.get("cache_hit"):
+        return 0.0
+    if stats.get("input_tokens") is None and stats.get("output_tokens") is None:
+        return None
+    cached = stats.get("cached_tokens") or 0
+    uncached = max(0, (stats.get("input_tokens") or 0) - cached)
+    cost = (
+        uncached * settings.llm_price_input_per_mtok
+        + cached * settings.llm_price_cached_input_per_mtok
+        + (stats.get("output_tokens") or 0) * settings.llm_price_output_per_mtok
+    ) / 1_000_000
+    cost += (stats.get("web_search_calls") or 0) * settings.llm_price_web_search_per_call
+    return round(cost, 6)
+
+
+def record_calls(job_id: str, usage: Dict[str, Dict[str, Any]]):
+    """Store one row per report in usage ({report_type: call_stats}). Never raises."""
+    if not settings.llm_telemetry_enabled or not usage:
+        return
+    db = SessionLocal()
+    now = datetime.utcnow()
+    try:
+        for report_type, stats in usage.items():
+            db.add(LLMCall(
+                job_id=job_id,
+                report_type=report_type,
+                model=stats.get("model"),
+                status=stats.get("status", "ok"),
+                cache_hit=bool(stats.get("cache_hit")),
+                fallback_used=bool(stats.get("fallback_used")),
+                input_tokens=stats.get("input_tokens"),
+                cached_tokens=stats.get("cached_tokens"),
+                output_tokens=stats.get("output_tokens"),
+                web_search_calls=stats.get("web_search_calls") or 0,
+                ttft_ms=stats.get("ttft_ms"),
+                duration_ms=stats.get("duration_ms"),
+                cost_usd=estimate_cost(stats),
+                error=stats.get("error") or stats.get("stream_error"),
+                created_at=now,
+            ))
+        db.commit()
+    except Exception as e:
+        # Telemetry must never fail a job
+        db.rollback()
+        logger.warning(f"LLM telemetry write failed for {job_id}: {e}", extra={"job_id": job_id})
+    finally:
+        db.close()
+
+
+def serialize_call(call: LLMCall) -> Dict[str, Any]:
+    return {
+        "report_type": call.report_type,
+        "model": call.model,
+        "status": call.status,
+        "cache_hit": call.cache_hit,
+        "fallback_used": call.fallback_used,
+        "input_tokens": call.input_tokens,
+        "cached_tokens": call.cached_tokens,
+        "output_tokens": call.output_tokens,
+        "web_search_calls": call.web_search_calls,
+        "ttft_ms": call.ttft_ms,
+        "duration_ms": call.duration_ms,
+        "cost_usd": call.cost_usd,
+        "error": call.error,
+        "created_at": call.created_at.isoformat() if call.created_at else None,
+    }
+
+
+# ---------------------------
+# AGGREGATION
+# ---------------------------
+
+def summarize(calls: Iterable[LLMCall]) -> Dict[str, Any]:
+    """Totals, rates and latency percentiles over a set of llm_calls rows."""
+    calls = list(calls)
+    made = [call for call in calls if not call.cache_hit]
+    input_tokens = sum(call.input_tokens or 0 for call in made)
+    cached_tokens = sum(call.cached_tokens or 0 for call in made)
+    ttfts = sorted(call.ttft_ms for call in made if call.ttft_ms is not None)
+    durations = sorted(call.duration_ms for call in made if call.duration_ms is not None)
+    cost = sum(call.cost_usd or 0 for call in calls)
+
+    return {
+        "calls": len(calls),
+        "llm_calls": len(made),
+        "cache_hits": len(calls) - len(made),
+        "failed": sum(1 for call in calls if call.status == "failed"),
+        "cancelled": sum(1 for call in calls if call.status == "cancelled"),
+        "fallback_used": sum(1 for call in made if call.fallback_used),
+        "fallback_rate": round(sum(1 for call in made if call.fallback_used) / len(made), 3) if made else None,
+        "input_tokens": input_tokens,
+        "cached_tokens": cached_tokens,
+        "cached_input_pct": round(100 * cached_tokens / input_tokens, 1) if input_tokens else None,
+        "output_tokens": sum(call.output_tokens or 0 for call in made),
+        "web_search_calls": sum(call.web_search_calls or 0 for call in made),
+        "cost_usd": round(cost, 4),
+        "avg_cost_usd": round(cost / len(made), 4) if made else None,
+        "ttft_ms": _percentiles(ttfts),
+        "duration_ms": _percentiles(durations),
+    }
+
+
+def summarize_by(calls: List[LLMCall], field: str) -> Dict[str, Dict[str, Any]]:
+    groups = defaultdict(list)
+    for call in calls:
+        groups[getattr(call, field) or "unknown"].append(call)
+    return {name: summarize(group) for name, group in sorted(groups.items())}
+
+
+def _percentiles(values: List[int]) -> Optional[Dict[str, int]]:
+    """Nearest-rank p50 / p95 / max over sorted values."""
+    if not values:
+        return None
+    rank = lambda pct: values[min(len(values) - 1, max(0, -(-pct * len(values) // 100) - 1))]
+    return {"p50": rank(50), "p95": rank(95), "max": values[-1]}
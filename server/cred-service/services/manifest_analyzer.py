@@ -0,0 +1,327 @@
+"""
+Dependency manifest analysis.
+
+Production-signal repos carry the text of their dependency manifests
+(package.json, requirements.txt, pyproject.toml, go.mod, Cargo.toml, Gemfile).
+Rather than sending up to 50KB of manifest text per repo to the LLM, each
+manifest is parsed locally into a small per-repo index:
+
+  {
+    "manifests": ["package.json"],
+    "ecosystems": ["node"],
+    "frameworks": ["Next.js", "React"],
+    "test_tooling": ["Jest", "Playwright"],
+    "dependencies": {"prod": 24, "dev": 11},
+    "prod": ["next", "react", ...],      # package names, capped
+    "dev": ["jest", "typescript", ...],
+  }
+
+requirements.txt and go.mod have no dev section, so everything they declare is
+counted as prod (go.mod `// indirect` requirements are skipped as transitive).
+
+index_manifests() swaps the manifest text for that index in a copy of raw_data
+(byte sizes are kept) and returns a cross-repo summary for the PRECOMPUTED
+METRICS block. Unparseable manifests are skipped — they never fail a report.
+"""
+
+import copy
+import json
+import logging
+import re
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import tomllib  # Python 3.11+
+except ModuleNotFoundError:  # Python < 3.11 — same API from the tomli backport
+    import tomli as tomllib
+
+logger = logging.getLogger(__name__)
+
+# ProductionSignals alias → (file name, ecosystem). Aliases match PRODUCTION_SIGNALS_FRAGMENT.
+DEPENDENCY_MANIFESTS = {
+    "packageJson": ("package.json", "node"),
+    "requirementsTxt": ("requirements.txt", "python"),
+    "pyprojectToml": ("pyproject.toml", "python"),
+    "goMod": ("go.mod", "go"),
+    "cargoToml": ("Cargo.toml", "rust"),
+    "gemfile": ("Gemfile", "ruby"),
+}
+
+MAX_LISTED_PROD = 25
+MAX_LISTED_DEV = 15
+
+# Package name → display name. Matching is on the normalized package name.
+FRAMEWORKS = {
+    # node
+    "react": "React", "next": "Next.js", "vue": "Vue", "nuxt": "Nuxt", "@angular/core": "Angular",
+    "svelte": "Svelte", "@sveltejs/kit": "SvelteKit", "solid-js": "SolidJS", "astro": "Astro",
+    "@remix-run/react": "Remix", "gatsby": "Gatsby", "react-native": "React Native", "expo": "Expo",
+    "electron": "Electron", "express": "Express", "@nestjs/core": "NestJS", "fastify": "Fastify",
+    "koa": "Koa", "hono": "Hono", "socket.io": "Socket.IO", "graphql": "GraphQL",
+    "@apollo/server": "Apollo Server", "@apollo/client": "Apollo Client", "prisma": "Prisma",
+    "@prisma/client": "Prisma", "mongoose": "Mongoose", "typeorm": "TypeORM", "sequelize": "Sequelize",
+    "drizzle-orm": "Drizzle", "redux": "Redux", "@reduxjs/toolkit": "Redux Toolkit",
+    "tailwindcss": "Tailwind CSS", "three": "three.js", "d3": "D3", "@tensorflow/tfjs": "TensorFlow.js",
+    "typescript": "TypeScript", "vite": "Vite", "webpack": "webpack",
+    # python
+    "django": "Django", "djangorestframework": "Django REST framework", "flask": "Flask",
+    "fastapi": "FastAPI", "starlette": "Starlette", "tornado": "Tornado", "aiohttp": "aiohttp",
+    "sqlalchemy": "SQLAlchemy", "pydantic": "Pydantic", "celery": "Celery", "streamlit": "Streamlit",
+    "torch": "PyTorch", "tensorflow": "TensorFlow", "keras": "Keras", "jax": "JAX",
+    "scikit-learn": "scikit-learn", "pandas": "pandas", "numpy": "NumPy", "transformers": "Hugging Face Transformers",
+    "langchain": "LangChain", "openai": "OpenAI SDK", "opencv-python": "OpenCV", "scrapy": "Scrapy",
+    # go
+    "github.com/gin-gonic/gin": "Gin", "github.com/labstack/echo/v4": "Echo", "github.com/gofiber/fiber/v2": "Fiber",
+    "github.com/gorilla/mux": "Gorilla Mux", "github.com/go-chi/chi/v5": "chi", "google.golang.org/grpc": "gRPC",
+    "gorm.io/gorm": "GORM", "github.com/spf13/cobra": "Cobra",
+    # rust
+    "actix-web": "Actix Web", "axum": "Axum", "rocket": "Rocket", "tokio": "Tokio", "serde": "Serde",
+    "diesel": "Diesel", "sqlx": "SQLx", "tauri": "Tauri", "bevy": "Bevy", "clap": "clap",
+    # ruby
+    "rails": "Ruby on Rails", "sinatra": "Sinatra", "hanami": "Hanami", "sidekiq": "Sidekiq",
+}
+
+TEST_TOOLING = {
+    # node
+    "jest": "Jest", "vitest": "Vitest", "mocha": "Mocha", "chai": "Chai", "ava": "AVA", "jasmine": "Jasmine",
+    "karma": "Karma", "cypress": "Cypress", "@playwright/test": "Playwright", "playwright": "Playwright",
+    "puppeteer": "Puppeteer", "supertest": "SuperTest", "@testing-library/react": "Testing Library",
+    "@testing-library/jest-dom": "Testing Library", "@testing-library/vue": "Testing Library",
+    # python
+    "pytest": "pytest", "pytest-cov": "pytest-cov", "pytest-asyncio": "pytest-asyncio", "hypothesis": "Hypothesis",
+    "nose": "nose", "nose2": "nose2", "tox": "tox", "nox": "nox", "coverage": "coverage.py",
+    "factory-boy": "factory_boy", "responses": "responses", "pytest-mock": "pytest-mock", "selenium": "Selenium",
+    # go
+    "github.com/stretchr/testify": "testify", "github.com/onsi/ginkgo/v2": "Ginkgo", "github.com/onsi/gomega": "Gomega",
+    "github.com/golang/mock": "gomock", "go.uber.org/mock": "gomock",
+    # rust
+    "proptest": "proptest", "criterion": "Criterion", "mockall": "mockall", "rstest": "rstest",
+    # ruby
+    "rspec": "RSpec", "rspec-rails": "RSpec", "minitest": "Minitest", "capybara": "Capybara",
+    "factory_bot": "factory_bot", "factory_bot_rails": "factory_bot",
+}
+
+_REQUIREMENT_NAME = re.compile(r"^\s*([A-Za-z0-9][A-Za-z0-9._-]*)")
+_DEV_GROUP = re.compile(r"dev|test|lint|doc|type|check", re.IGNORECASE)
+_GEM = re.compile(r"gem\s+['\"]([^'\"]+)['\"](.*)")
+
+
+def analyze_manifests(signals: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Index for one repo's productionSignals, or None when it has no readable manifest."""
+    prod, dev = set(), set()
+    manifests, ecosystems = [], []
+    for key, (file_name, ecosystem) in DEPENDENCY_MANIFESTS.items():
+        blob = signals.get(key)
+        text = blob.get("text") if isinstance(blob, dict) else None
+        if not text:
+            continue
+        try:
+            manifest_prod, manifest_dev = _PARSERS[key](text)
+        except Exception as e:
+            logger.debug(f"Could not parse {file_name}: {e}")
+            continue
+        manifests.append(file_name)
+        if ecosystem not in ecosystems:
+            ecosystems.append(ecosystem)
+        prod.update(manifest_prod)
+        dev.update(manifest_dev)
+
+    if not manifests:
+        return None
+    dev -= prod
+    every = prod | dev
+    return {
+        "manifests": manifests,
+        "ecosystems": ecosystems,
+        "frameworks": _labels(every, FRAMEWORKS),
+        "test_tooling": _labels(every, TEST_TOOLING),
+        "dependencies": {"prod": len(prod), "dev": len(dev)},
+        "prod": _listed(prod, MAX_LISTED_PROD),
+        "dev": _listed(dev, MAX_LISTED_DEV),
+    }
+
+
+def index_manifests(raw_data: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+    """
+    Copy of raw_data with manifest text replaced by productionSignals.dependencyIndex,
+    plus a cross-repo summary (None when no repo has a readable manifest). raw_data is not modified.
+    """
+    user = (raw_data.get("github") or {}).get("data")
+    repos = ((user or {}).get("repositories") or {}).get("nodes") if isinstance(user, dict) else None
+    if not repos:
+        return raw_data, None
+
+    indexed = dict(raw_data)
+    indexed["github"] = copy.deepcopy(raw_data["github"])
+    frameworks, test_tooling, ecosystems = Counter(), Counter(), Counter()
+    repos_indexed = repos_with_tests = 0
+
+    for repo in indexed["github"]["data"]["repositories"]["nodes"]:
+        signals = (repo or {}).get("productionSignals")
+        if not isinstance(signals, dict):
+            continue
+        index = analyze_manifests(signals)
+        for key in DEPENDENCY_MANIFESTS:
+            if isinstance(signals.get(key), dict):
+                signals[key].pop("text", None)
+        if index is None:
+            continue
+        signals["dependencyIndex"] = index
+        repos_indexed += 1
+        frameworks.update(index["frameworks"])
+        test_tooling.update(index["test_tooling"])
+        ecosystems.update(index["ecosystems"])
+        if index["test_tooling"]:
+            repos_with_tests += 1
+
+    if not repos_indexed:
+        return indexed, None
+    return indexed, {
+        "repos_with_manifests": repos_indexed,
+        "repos_with_test_tooling": repos_with_tests,
+        "ecosystems": dict(ecosystems.most_common()),
+        "framework_repo_counts": dict(frameworks.most_common(15)),
+        "test_tooling_repo_counts": dict(test_tooling.most_common(10)),
+    }
+
+
+# ---------------------------
+# PARSERS
+# Each returns (prod_names, dev_names) as lowercase package names.
+# ---------------------------
+
+def _parse_package_json(text: str) -> Tuple[set, set]:
+    manifest = json.loads(text)
+    prod = _names(manifest.get("dependencies"), manifest.get("peerDependencies"), manifest.get("optionalDependencies"))
+    dev = _names(manifest.get("devDependencies"))
+    return prod, dev
+
+
+def _parse_requirements_txt(text: str) -> Tuple[set, set]:
+    prod = set()
+    for line in text.splitlines():
+        line = line.split("#", 1)[0].strip()
+        if not line or line.startswith("-"):
+            continue  # comments, -r / -e / --index-url options
+        name = _requirement_name(line)
+        if name:
+            prod.add(name)
+    return prod, set()
+
+
+def _parse_pyproject_toml(text: str) -> Tuple[set, set]:
+    manifest = tomllib.loads(text)
+    prod, dev = set(), set()
+
+    # PEP 621
+    project = manifest.get("project") or {}
+    prod.update(filter(None, map(_requirement_name, project.get("dependencies") or [])))
+    for group, requirements in (project.get("optional-dependencies") or {}).items():
+        names = filter(None, map(_requirement_name, requirements or []))
+        (dev if _DEV_GROUP.search(group) else prod).update(names)
+
+    # PEP 735 dependency groups
+    for requirements in (manifest.get("dependency-groups") or {}).values():
+        dev.update(filter(None, map(_requirement_name, (r for r in requirements or [] if isinstance(r, str)))))
+
+    # Poetry
+    poetry = (manifest.get("tool") or {}).get("poetry") or {}
+    prod.update(_names(poetry.get("dependencies"), python=True) - {"python"})
+    dev.update(_names(poetry.get("dev-dependencies"), python=True))
+    for group in (poetry.get("group") or {}).values():
+        dev.update(_names((group or {}).get("dependencies"), python=True))
+    return prod, dev
+
+
+def _parse_go_mod(text: str) -> Tuple[set, set]:
+    direct = set()
+    in_block = False
+    for line in text.splitlines():
+        line, _, comment = line.partition("//")
+        line = line.strip()
+        if line.startswith("require") and line.rstrip().endswith("("):
+            in_block = True
+            continue
+        if in_block and line == ")":
+            in_block = False
+            continue
+        if line.startswith("require "):
+            line = line[len("require "):].strip()
+        elif not in_block:
+            continue
+        # Indirect requirements are transitive — not a choice the candidate made
+        parts = line.split()
+        if parts and "indirect" not in comment:
+            direct.add(parts[0].lower())
+    return direct, set()
+
+
+def _parse_cargo_toml(text: str) -> Tuple[set, set]:
+    manifest = tomllib.loads(text)
+    prod = _names(manifest.get("dependencies"), (manifest.get("workspace") or {}).get("dependencies"))
+    dev = _names(manifest.get("dev-dependencies"), manifest.get("build-dependencies"))
+    for target in (manifest.get("target") or {}).values():
+        prod.update(_names((target or {}).get("dependencies")))
+        dev.update(_names((target or {}).get("dev-dependencies")))
+    return prod, dev
+
+
+def _parse_gemfile(text: str) -> Tuple[set, set]:
+    prod, dev = set(), set()
+    groups = []  # one entry per open `group ... do` block: True when it is a dev/test group
+    for line in text.splitlines():
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        if line.startswith("group ") and line.endswith("do"):
+            groups.append(bool(_DEV_GROUP.search(line)))
+            continue
+        if line == "end" and groups:
+            groups.pop()
+            continue
+        match = _GEM.match(line)
+        if not match:
+            continue
+        inline_dev = "group" in match.group(2) and _DEV_GROUP.search(match.group(2))
+        (dev if any(groups) or inline_dev else prod).add(match.group(1).lower())
+    return prod, dev
+
+
+_PARSERS = {
+    "packageJson": _parse_package_json,
+    "requirementsTxt": _parse_requirements_txt,
+    "pyprojectToml": _parse_pyproject_toml,
+    "goMod": _parse_go_mod,
+    "cargoToml": _parse_cargo_toml,
+    "gemfile": _parse_gemfile,
+}
+
+
+# ---------------------------
+# HELPERS
+# ---------------------------
+
+def _python_name(name: str) -> str:
+    """PEP 503 normalization — Django_REST.framework and djangorestframework-style spellings compare equal."""
+    return re.sub(r"[-_.]+", "-", name.strip()).lower()
+
+
+def _requirement_name(requirement: str) -> Optional[str]:
+    match = _REQUIREMENT_NAME.match(requirement)
+    return _python_name(match.group(1)) if match else None
+
+
+def _names(*tables: Optional[Dict[str, Any]], python: bool = False) -> set:
+    normalize = _python_name if python else str.lower
+    return {normalize(name) for table in tables if isinstance(table, dict) for name in table}
+
+
+def _listed(names: set, limit: int) -> List[str]:
+    """Recognised frameworks and test tools first, then the rest alphabetically, capped at limit."""
+    known = lambda name: name in FRAMEWORKS or name in TEST_TOOLING
+    return sorted(names, key=lambda name: (not known(name), name))[:limit]
+
+
+def _labels(names: Iterable[str], catalog: Dict[str, str]) -> List[str]:
+    return sorted({catalog[name] for name in names if name in catalog})
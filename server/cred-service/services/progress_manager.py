@@ -1,10 +1,26 @@
 """
 In-memory progress tracking for report generation jobs.
 SSE endpoint reads from this to stream updates to the frontend.
+
+When the three reports are generated concurrently, each LLM stream reports its own
+completion fraction via update_stream(); the job percentage is the weighted mean of
+those fractions mapped onto the stage's percentage range.
+
+While a job's LLM calls wait for admission (services/llm_admission.py), the entry also
+carries queue_position and eta_seconds.
+
+SSE connections subscribe() to a job instead of polling: every change wakes all of the
+job's subscribers at once, from whichever thread made it, and a connection with
+nothing to send costs nothing until the next change. Draft subscribers are also woken
+by publish_draft() — at most once until they take the drafts, however many deltas
+arrive in between.
 """
 
+import asyncio
 import logging
-from typing import Dict, Optional
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Set
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
@@ -14,18 +30,122 @@ STAGES = {
     "generating_extensive":  {"pct": 10,  "msg": "Generating comprehensive technical report..."},
     "generating_developer":  {"pct": 50,  "msg": "Creating developer growth insights..."},
     "generating_recruiter":  {"pct": 80,  "msg": "Preparing recruiter hiring signal..."},
+    "generating_reports":    {"pct": 10,  "msg": "Generating your technical, developer and recruiter reports..."},
     "storing":               {"pct": 95,  "msg": "Storing your credibility reports..."},
     "sending_email":         {"pct": 98,  "msg": "Sending reports to your email..."},
     "completed":             {"pct": 100, "msg": "Your credibility report is ready!"},
     "failed":                {"pct": 0,   "msg": "Report generation failed."},
+    "cancelled":             {"pct": 0,   "msg": "Report generation cancelled."},
+    # Extraction-phase notice — shown on GET /extract/{job_id}, not part of the generation flow
+    "waiting_github_quota":  {"pct": 0,   "msg": "Waiting for GitHub API quota..."},
 }
 
+# Stages after which nothing else is published for the job
+TERMINAL_STAGES = ("completed", "failed", "cancelled")
+
+
+class ProgressSubscription:
+    """One connection's wake-up signal for a job — signalled from any thread, awaited on the connection's loop."""
+
+    def __init__(self, drafts: bool = False):
+        self.drafts = drafts
+        self._loop = asyncio.get_running_loop()
+        self._event = asyncio.Event()
+        self._changed = False
+        self._drafts_pending = False
+
+    def _wake(self):
+        try:
+            self._loop.call_soon_threadsafe(self._event.set)
+        except RuntimeError:
+            pass  # loop closed — the connection is gone
+
+    def signal(self):
+        if not self._changed:
+            self._changed = True
+            self._wake()
+
+    def signal_draft(self):
+        if self.drafts and not self._drafts_pending:
+            self._drafts_pending = True
+            self._wake()
+
+    @property
+    def drafts_pending(self) -> bool:
+        return self._drafts_pending
+
+    def take_drafts(self):
+        """The caller is about to read drafts — the next delta wakes it again."""
+        self._drafts_pending = False
+
+    async def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait for a change. Returns False on timeout."""
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+            woke = True
+        except asyncio.TimeoutError:
+            woke = False
+        self._event.clear()
+        self._changed = False
+        return woke
+
 
 class ProgressManager:
     """Thread-safe (GIL) in-memory progress tracker."""
 
     def __init__(self):
         self._jobs: Dict[str, Dict] = {}
+        # job_id → {"pct_start", "pct_end", "weights", "fractions"} for concurrent streams
+        self._streams: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        # Called with (job_id, entry) after every change, and (job_id, None) on clear —
+        # e.g. the job queue's cross-process mirror. Called in the publishing thread: must not block.
+        self._listeners: List[Callable[[str, Optional[Dict]], None]] = []
+        self._subscribers: Dict[str, Set[ProgressSubscription]] = {}
+
+    def add_listener(self, listener: Callable[[str, Optional[Dict]], None]):
+        self._listeners.append(listener)
+
+    @contextmanager
+    def subscribe(self, job_id: str, drafts: bool = False):
+        """Subscribe the running event loop to the job's changes (and draft deltas with drafts=True)."""
+        subscription = ProgressSubscription(drafts=drafts)
+        with self._lock:
+            self._subscribers.setdefault(job_id, set()).add(subscription)
+        try:
+            yield subscription
+        finally:
+            with self._lock:
+                subscribers = self._subscribers.get(job_id)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscribers[job_id]
+
+    def publish_draft(self, job_id: str):
+        """Wake the job's draft subscribers — called for every text delta."""
+        for subscription in self._subscribers_of(job_id):
+            subscription.signal_draft()
+
+    def has_draft_subscribers(self, job_id: str) -> bool:
+        with self._lock:
+            return any(subscription.drafts for subscription in self._subscribers.get(job_id, ()))
+
+    def _subscribers_of(self, job_id: str) -> List[ProgressSubscription]:
+        with self._lock:
+            return list(self._subscribers.get(job_id, ()))
+
+    def _notify(self, job_id: str):
+        entry = self._jobs.get(job_id)
+        if not entry:
+            return
+        for subscription in self._subscribers_of(job_id):
+            subscription.signal()
+        for listener in self._listeners:
+            try:
+                listener(job_id, dict(entry))
+            except Exception as e:
+                logger.warning(f"Progress listener failed for {job_id}: {e}")
 
     def init(self, job_id: str):
         self._jobs[job_id] = {
@@ -34,6 +154,7 @@ class ProgressManager:
             "message": "Initializing...",
             "timestamp": datetime.utcnow().isoformat(),
         }
+        self._notify(job_id)
 
     def update(self, job_id: str, stage: str, extra: dict = None):
         logger.debug(f"Progress update job_id={job_id} stage={stage}" + (f" extra={extra}" if extra else ""))
@@ -45,12 +166,14 @@ class ProgressManager:
             "timestamp": datetime.utcnow().isoformat(),
         }
         # Add 'status' for terminal stages so frontend can detect completion
-        if stage in ("completed", "failed"):
+        if stage in TERMINAL_STAGES:
             entry["status"] = stage
         # Merge any extra data (e.g., email_failed flag)
         if extra:
             entry.update(extra)
         self._jobs[job_id] = entry
+        self._streams.pop(job_id, None)
+        self._notify(job_id)
 
     def update_message(self, job_id: str, message: str):
         """Update only the message field — keeps current stage and percentage."""
@@ -58,6 +181,26 @@ class ProgressManager:
         if entry:
             entry["message"] = message
             entry["timestamp"] = datetime.utcnow().isoformat()
+            self._notify(job_id)
+
+    def set_queue_position(self, job_id: str, position: Optional[int], eta_seconds: Optional[int] = None):
+        """Show the job's place in the LLM admission queue, or clear it (position None) once admitted."""
+        entry = self._jobs.get(job_id)
+        if not entry or (entry.get("queue_position"), entry.get("eta_seconds")) == (position, eta_seconds):
+            return  # unchanged — every waiting call of the job reports the same values
+        if position is None:
+            if "queue_position" not in entry:
+                return
+            entry.pop("queue_position", None)
+            entry.pop("eta_seconds", None)
+            entry["message"] = STAGES.get(entry["stage"], {}).get("msg", entry["message"])
+        else:
+            wait = f"about {max(1, round(eta_seconds / 60))} min" if eta_seconds and eta_seconds >= 90 else f"about {eta_seconds or 0}s"
+            entry["queue_position"] = position
+            entry["eta_seconds"] = eta_seconds
+            entry["message"] = f"Waiting for report generation capacity — #{position} in queue, {wait}..."
+        entry["timestamp"] = datetime.utcnow().isoformat()
+        self._notify(job_id)
 
     def increment_percentage(self, job_id: str, delta: int, max_pct: int):
         """Nudge percentage up by delta, capped at max_pct."""
@@ -65,12 +208,63 @@ class ProgressManager:
         if entry:
             entry["percentage"] = min(entry["percentage"] + delta, max_pct)
             entry["timestamp"] = datetime.utcnow().isoformat()
+            self._notify(job_id)
+
+    def start_streams(self, job_id: str, stage: str, weights: Dict[str, float], pct_start: int, pct_end: int):
+        """
+        Enter a stage made of several concurrent streams.
+        weights: stream name → relative share of the stage (e.g. expected output length).
+        """
+        self.update(job_id, stage)
+        with self._lock:
+            self._streams[job_id] = {
+                "pct_start": pct_start,
+                "pct_end": pct_end,
+                "weights": dict(weights),
+                "fractions": {name: 0.0 for name in weights},
+            }
+            entry = self._jobs.get(job_id)
+            if entry:
+                entry["percentage"] = pct_start
+                entry["streams"] = {name: 0 for name in weights}
+        self._notify(job_id)
+
+    def update_stream(self, job_id: str, stream: str, fraction: float):
+        """Record one stream's completion (0.0–1.0) and recompute the combined percentage."""
+        with self._lock:
+            state = self._streams.get(job_id)
+            entry = self._jobs.get(job_id)
+            if not state or not entry or stream not in state["fractions"]:
+                return
+            # Never move a stream backwards — callbacks from different threads can interleave
+            fraction = max(state["fractions"][stream], min(1.0, max(0.0, fraction)))
+            state["fractions"][stream] = fraction
+
+            total_weight = sum(state["weights"].values()) or 1.0
+            done = sum(state["weights"][name] * f for name, f in state["fractions"].items()) / total_weight
+            span = state["pct_end"] - state["pct_start"]
+            entry["percentage"] = max(entry["percentage"], state["pct_start"] + int(span * done))
+            entry.setdefault("streams", {})[stream] = int(fraction * 100)
+            entry["timestamp"] = datetime.utcnow().isoformat()
+        self._notify(job_id)
+
+    def finish_stream(self, job_id: str, stream: str):
+        self.update_stream(job_id, stream, 1.0)
 
     def get(self, job_id: str) -> Optional[Dict]:
         return self._jobs.get(job_id)
 
-    def clear(self, job_id: str):
-        self._jobs.pop(job_id, None)
+    def clear(self, job_id: str, notify: bool = True):
+        """Drop the job's progress. notify=False keeps listeners out of it — e.g. when another process owns the job now."""
+        had_entry = self._jobs.pop(job_id, None) is not None
+        self._streams.pop(job_id, None)
+        if not had_entry or not notify:
+            return
+        for listener in self._listeners:
+            try:
+                listener(job_id, None)
+            except Exception as e:
+                logger.warning(f"Progress listener failed for {job_id}: {e}")
 
 
 # Singleton — shared across routes and background tasks
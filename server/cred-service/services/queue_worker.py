@@ -0,0 +1,160 @@
+"""
+Queue worker — claims job_queue tasks and runs them with bounded concurrency.
+
+One QueueWorker per process: embedded in the web app (JOB_QUEUE_EMBEDDED=true) or
+standalone via `python -m app.worker`. It keeps up to JOB_QUEUE_CONCURRENCY tasks in
+flight, heartbeats their leases every third of JOB_QUEUE_LEASE_SECONDS, forwards
+cancellation requests to the generation registry, and on stop lets in-flight tasks
+finish for up to JOB_QUEUE_SHUTDOWN_GRACE seconds — anything still running after
+that is reclaimed by another worker once its lease expires.
+
+A task whose lease was lost is stopped. Async handlers are cancelled outright; a
+generation pipeline runs in a thread that cancelling the await would not stop, so it
+is abandoned through the generation registry instead and keeps its concurrency slot
+until the thread reaches its cancel point.
+
+Handlers are `async def handler(job_id, payload)`; they own their job's status
+updates. Returning marks the task done, raising marks it failed.
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from typing import Awaitable, Callable, Dict, Optional
+
+from app.config import settings
+from services.job_queue import job_queue
+from services.generation_registry import generation_registry
+from services.progress_manager import progress_manager
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[str, dict], Awaitable[None]]
+
+
+class QueueWorker:
+
+    def __init__(self, handlers: Dict[str, Handler], concurrency: Optional[int] = None):
+        self.handlers = handlers
+        self.concurrency = max(1, concurrency or settings.job_queue_concurrency)
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self._running: Dict[int, Dict] = {}  # task_id → {"job_id", "kind", "future", "abandoned"}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._stopping = False
+
+    async def run(self):
+        """Claim and run tasks until stop() is called."""
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        job_queue.on_enqueue(self.wake)
+        progress_manager.add_listener(job_queue.mirror_progress)
+        heartbeat = asyncio.create_task(self._heartbeat_loop())
+        logger.info(f"Queue worker {self.worker_id} started (concurrency={self.concurrency})")
+
+        try:
+            while not self._stopping:
+                if len(self._running) >= self.concurrency:
+                    await self._wait_for_wake(None)
+                    continue
+                try:
+                    task = await asyncio.to_thread(job_queue.claim, self.worker_id)
+                except Exception as e:
+                    logger.error(f"Queue claim failed: {e}")
+                    task = None
+                if task is None:
+                    await self._wait_for_wake(settings.job_queue_poll_interval)
+                    continue
+                self._start(task)
+        finally:
+            await self._drain()
+            heartbeat.cancel()
+            logger.info(f"Queue worker {self.worker_id} stopped")
+
+    def stop(self):
+        self._stopping = True
+        self.wake()
+
+    def wake(self):
+        """Thread-safe nudge — something was enqueued or a slot freed up."""
+        if self._loop and self._wake and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    async def _wait_for_wake(self, timeout: Optional[float]):
+        try:
+            await asyncio.wait_for(self._wake.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._wake.clear()
+
+    # ---------------------------
+    # EXECUTION
+    # ---------------------------
+
+    def _start(self, task: Dict):
+        handler = self.handlers.get(task["kind"])
+        future = asyncio.create_task(self._execute(task, handler), name=f"queue-{task['kind']}-{task['id']}")
+        self._running[task["id"]] = {"job_id": task["job_id"], "kind": task["kind"], "future": future, "abandoned": False}
+
+    async def _execute(self, task: Dict, handler: Optional[Handler]):
+        job_id = task["job_id"]
+        status, error = "done", None
+        try:
+            if handler is None:
+                raise ValueError(f"No handler for task kind {task['kind']!r}")
+            logger.info(
+                f"Worker {self.worker_id} running {task['kind']} task {task['id']} (attempt {task['attempt']})",
+                extra={"job_id": job_id},
+            )
+            await handler(job_id, task["payload"])
+        except asyncio.CancelledError:
+            # Lease lost — the task is another worker's now; leave the row alone
+            logger.warning(f"{task['kind']} task {task['id']} abandoned after losing its lease", extra={"job_id": job_id})
+            return
+        except Exception as e:
+            logger.error(f"{task['kind']} task {task['id']} failed: {e}", exc_info=True, extra={"job_id": job_id})
+            status, error = "failed", str(e)
+        finally:
+            self._running.pop(task["id"], None)
+            self.wake()
+
+        try:
+            await asyncio.to_thread(job_queue.complete, task["id"], self.worker_id, status, error)
+        except Exception as e:
+            logger.error(f"Could not complete queue task {task['id']}: {e}", extra={"job_id": job_id})
+
+    async def _heartbeat_loop(self):
+        interval = max(1.0, settings.job_queue_lease_seconds / 3)
+        while True:
+            await asyncio.sleep(interval)
+            for task_id, running in list(self._running.items()):
+                if running["abandoned"]:
+                    continue
+                try:
+                    owned, cancel_requested = await asyncio.to_thread(job_queue.heartbeat, task_id, self.worker_id)
+                except Exception as e:
+                    logger.warning(f"Heartbeat failed for queue task {task_id}: {e}")
+                    continue
+                if not owned and running["kind"] == "generation":
+                    # Cancelling the await would leave the pipeline thread writing next to the new owner
+                    running["abandoned"] = True
+                    logger.warning(
+                        f"generation task {task_id} lost its lease — stopping the pipeline",
+                        extra={"job_id": running["job_id"]},
+                    )
+                    generation_registry.abandon(running["job_id"])
+                elif not owned:
+                    running["future"].cancel()
+                elif cancel_requested and running["kind"] == "generation":
+                    generation_registry.cancel(running["job_id"])
+
+    async def _drain(self):
+        futures = [running["future"] for running in self._running.values()]
+        if not futures:
+            return
+        logger.info(f"Waiting up to {settings.job_queue_shutdown_grace}s for {len(futures)} in-flight queue tasks")
+        done, pending = await asyncio.wait(futures, timeout=settings.job_queue_shutdown_grace)
+        if pending:
+            logger.warning(f"{len(pending)} queue tasks still running at shutdown — they will be reclaimed after their lease expires")
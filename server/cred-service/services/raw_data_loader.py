@@ -1,11 +1,15 @@
 import logging
-from typing import Dict, Any
+from datetime import datetime
+from typing import Dict, Any, List
 from sqlalchemy.orm import Session
 
 from app.database import RawData
 
 logger = logging.getLogger(__name__)
 
+# data_type suffix for pages streamed during paginated extraction, e.g. "github_page"
+PAGE_SUFFIX = "_page"
+
 
 class RawDataLoader:
     """
@@ -15,10 +19,17 @@ class RawDataLoader:
     Output becomes the single source input for report generation.
     Keys are dynamic — any platform_id stored during extraction
     becomes a key in the returned dict.
+
+    Rows with a "{platform}_page" data_type (paginated GitHub extraction) are
+    appended back into their platform's connection nodes, so consumers always
+    see the same shape as a single-page fetch.
+
+    After a load, fetched_at maps each platform to when its row was fetched.
     """
 
     def __init__(self, db: Session):
         self.db = db
+        self.fetched_at: Dict[str, datetime] = {}
 
     def load_job_raw_data(self, job_id: str) -> Dict[str, Any]:
         """
@@ -46,9 +57,41 @@ class RawDataLoader:
             raise ValueError(f"No raw data found for job_id={job_id}")
 
         raw_bundle = {}
+        self.fetched_at = {}
+        pages = []
         for record in records:
             data_type = record.data_type.lower()
+            if data_type.endswith(PAGE_SUFFIX):
+                pages.append(record)
+                continue
             raw_bundle[data_type] = record.data
+            self.fetched_at[data_type] = record.fetched_at
+
+        if pages:
+            self._merge_pages(raw_bundle, pages)
 
         logger.info(f"Loaded raw data for job_id={job_id} — platforms={list(raw_bundle.keys())}")
         return raw_bundle
+
+    def _merge_pages(self, raw_bundle: Dict[str, Any], pages: List[RawData]) -> None:
+        """Append streamed page nodes into raw_bundle[platform]["data"][connection]["nodes"]."""
+        merged = set()
+        for record in sorted(pages, key=lambda r: (r.data or {}).get("page", 0)):
+            platform_id = record.data_type.lower()[:-len(PAGE_SUFFIX)]
+            page = record.data or {}
+            target = (raw_bundle.get(platform_id) or {}).get("data")
+            if not isinstance(target, dict) or not page.get("connection"):
+                continue
+            conn = target.setdefault(page["connection"], {})
+            conn.setdefault("nodes", []).extend(page.get("nodes") or [])
+            merged.add(platform_id)
+
+        # GitHub: production signals for repos that only exist on streamed pages
+        for platform_id in merged:
+            repos_conn = raw_bundle[platform_id]["data"].get("repositories") or {}
+            signals = repos_conn.pop("productionSignalsByRepo", None)
+            if not signals:
+                continue
+            for repo in repos_conn.get("nodes", []):
+                if repo.get("name") in signals and "productionSignals" not in repo:
+                    repo["productionSignals"] = signals[repo["name"]]
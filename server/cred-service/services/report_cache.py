@@ -0,0 +1,165 @@
+"""
+Content-hash cache for generated reports.
+
+A report is a pure function of what we send the model, so the cache key is a
+sha256 over (PROMPT_TEMPLATE_VERSION, model, report type, full input messages).
+The messages carry the serialized context and the day the data was fetched (not
+the day of generation), so a retry of a failed job or a re-analysis of an unchanged
+candidate is served from here with zero token spend, whenever it runs; any change
+to data, prompts or model misses.
+
+Backends:
+  - memory : in-process LRU (REPORT_CACHE_MAX_ENTRIES) with TTL — default
+  - db     : report_cache table, capped at REPORT_CACHE_MAX_ENTRIES rows (least recently used evicted)
+  - off    : caching disabled
+
+Bump PROMPT_TEMPLATE_VERSION in report_generator.py whenever prompt wording changes
+in a way the messages alone would not capture.
+"""
+
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from app.config import settings
+from app.database import SessionLocal, ReportCacheEntry
+from services.extraction_cache import InMemoryLRUBackend
+
+logger = logging.getLogger(__name__)
+
+
+class DatabaseReportBackend:
+    """Stores report text in the report_cache table. Oldest-used rows beyond max_entries are evicted on write."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max(1, max_entries)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        db = SessionLocal()
+        try:
+            entry = db.query(ReportCacheEntry).filter(ReportCacheEntry.key == key).first()
+            if entry is None or entry.expires_at < datetime.utcnow():
+                return None
+            entry.last_used_at = datetime.utcnow()
+            db.commit()
+            return {"text": entry.content, "model": entry.model}
+        finally:
+            db.close()
+
+    def set(self, key: str, report_type: str, payload: Dict[str, Any], ttl: int):
+        db = SessionLocal()
+        now = datetime.utcnow()
+        try:
+            db.merge(ReportCacheEntry(
+                key=key,
+                report_type=report_type,
+                model=payload.get("model"),
+                content=payload["text"],
+                created_at=now,
+                last_used_at=now,
+                expires_at=now + timedelta(seconds=ttl),
+            ))
+            db.flush()
+
+            # Size bound — drop expired rows, then the least recently used beyond the cap
+            db.query(ReportCacheEntry).filter(ReportCacheEntry.expires_at < now).delete()
+            stale_keys = [
+                row.key for row in
+                db.query(ReportCacheEntry.key)
+                .order_by(ReportCacheEntry.last_used_at.desc())
+                .offset(self.max_entries)
+                .all()
+            ]
+            if stale_keys:
+                db.query(ReportCacheEntry).filter(ReportCacheEntry.key.in_(stale_keys)).delete(synchronize_session=False)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def size(self) -> int:
+        db = SessionLocal()
+        try:
+            return db.query(ReportCacheEntry).filter(ReportCacheEntry.expires_at >= datetime.utcnow()).count()
+        finally:
+            db.close()
+
+
+class ReportCache:
+    """Report text keyed by content hash, with hit/miss accounting."""
+
+    def __init__(self, backend, ttl: int):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    @staticmethod
+    def make_key(template_version: str, model: str, report_type: str, messages: List[Dict[str, str]]) -> str:
+        material = json.dumps(
+            {"version": template_version, "model": model, "report_type": report_type, "messages": messages},
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            payload = self.backend.get(key)
+        except Exception as e:
+            # A broken cache must never fail a generation — treat as a miss
+            logger.warning(f"Report cache read failed for key={key[:12]}: {e}")
+            payload = None
+
+        if not payload or not payload.get("text"):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        logger.info(f"Report cache hit key={key[:12]}")
+        return payload["text"]
+
+    def set(self, key: str, report_type: str, model: str, text: str):
+        if not text:
+            return
+        try:
+            self.backend.set(key, report_type, {"text": text, "model": model}, self.ttl)
+            self.stores += 1
+        except Exception as e:
+            logger.warning(f"Report cache write failed for key={key[:12]}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        try:
+            size = self.backend.size()
+        except Exception:
+            size = None
+        return {
+            "backend": settings.report_cache_backend,
+            "ttl_seconds": self.ttl,
+            "entries": size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+        }
+
+
+def _build_cache() -> Optional[ReportCache]:
+    backend_name = (settings.report_cache_backend or "off").lower()
+    if backend_name == "memory":
+        return ReportCache(InMemoryLRUBackend(settings.report_cache_max_entries), settings.report_cache_ttl)
+    if backend_name == "db":
+        return ReportCache(DatabaseReportBackend(settings.report_cache_max_entries), settings.report_cache_ttl)
+    if backend_name != "off":
+        logger.warning(f"Unknown REPORT_CACHE_BACKEND={backend_name!r} — report cache disabled")
+    return None
+
+
+# Singleton — None when caching is disabled
+report_cache = _build_cache()
@@ -11,15 +11,23 @@ every statement is traceable back to a specific field in the raw platform data.
 """
 
 from datetime import date
-from typing import Dict, Any, Callable, Optional
-from openai import OpenAI
+from typing import AsyncContextManager, Dict, Any, Callable, List, Optional
+from openai import AsyncOpenAI, RateLimitError
+import asyncio
+import hashlib
 import json
 import time
 import logging
 from app.config import settings
+from services import context_serializer
+from services.context_budget import fit_to_budget
+from services.llm_admission import llm_admission
 
 logger = logging.getLogger(__name__)
 
+# Part of every report cache key — bump when prompts or guardrails change meaningfully
+PROMPT_TEMPLATE_VERSION = "6.4"
+
 
 # =========================================
 # SHARED GUARDRAILS
@@ -36,7 +44,7 @@ IMMUTABLE RULES — violating any of these is a critical failure:
 1. VERIFICATION RULE
    A skill is VERIFIED only if you can point to explicit evidence in the raw data from any platform.
    - For languages: must appear in GitHub repo language nodes, LeetCode submission lang fields, or other platform data
-   - For frameworks/libraries: must appear in repo descriptions, repo names, repositoryTopics, or other platform project data
+   - For frameworks/libraries: must appear in repo descriptions, repo names, repositoryTopics, productionSignals.dependencyIndex, or other platform project data
    - If you cannot find explicit evidence, mark it UNVERIFIED — do not guess or infer
    - Resume text mentioning a skill is a CLAIM, not verification
 
@@ -81,6 +89,7 @@ CITATION_EXTENSIVE = """
      - "42 public repositories" (Source: GitHub > repositories.totalCount)
      - "555 problems solved" (Source: LeetCode > matchedUser.submitStats.acSubmissionNum[All].count)
      - "Worked at InMobi" (Source: Resume text)
+     - "82% PR merge rate" (Source: Precomputed > github.pull_requests.merge_rate_pct)
    If you cannot cite a source from the raw data, do not make the statement."""
 
 CITATION_NATURAL = """
@@ -93,6 +102,22 @@ CITATION_NATURAL = """
    Verification details and data sources go ONLY in the Verification Disclaimer section at the end of the report."""
 
 
+# Prefix layout: guardrails with the job-specific values moved to the JOB FACTS block,
+# so the system message is byte-identical across every call and every job.
+SHARED_GUARDRAILS = GUARDRAILS_BASE.format(
+    today="given under JOB FACTS in the user message",
+    platforms="listed under JOB FACTS in the user message",
+)
+
+
+# Stream events that mean prefill is done and the model is producing output
+FIRST_OUTPUT_EVENTS = (
+    "response.output_item.added",
+    "response.output_text.delta",
+    "response.web_search_call.searching",
+)
+
+
 class ReportGenerator:
 
     def __init__(self, model="gpt-5-mini"):
@@ -100,72 +125,195 @@ class ReportGenerator:
         api_key = settings.openai_api_key
         if not api_key:
             raise ValueError("OPENAI_API_KEY not configured. Set it in cred-service/.env")
-        self.client = OpenAI(api_key=api_key)
+        # Async client so a cancelled task closes the HTTP stream mid-generation
+        self.async_client = AsyncOpenAI(api_key=api_key)
+        # Filled by _build_llm_context: {"format", "tokens_before", "tokens_after", "sections": {...}}
+        self.context_stats: Dict[str, Any] = {}
+        # Routes the three calls for one context to the same provider cache (prefix layout only)
+        self.prompt_cache_key: Optional[str] = None
+        # The day the data was fetched (activity_timeline.data_date), given to the model as today's
+        # date so the messages — and the report cache / checkpoint hash — don't change daily
+        self.as_of: Optional[date] = None
 
     def _build_system_message(self, report_type: str = "extensive", raw_data: Dict = None) -> str:
         """Build system message with guardrails + citation mode for the report type."""
-        # Dynamically list platforms that have data for this candidate
+        base = GUARDRAILS_BASE.format(
+            today=self._today(),
+            platforms=self._platforms_str(raw_data),
+        )
+        if report_type == "extensive":
+            return base + CITATION_EXTENSIVE
+        else:
+            return base + CITATION_NATURAL
+
+    def _today(self) -> str:
+        return (self.as_of or date.today()).isoformat()
+
+    def _platforms_str(self, raw_data: Optional[Dict]) -> str:
+        """Dynamically list platforms that have data for this candidate."""
         platforms_list = []
         if raw_data:
             from services.platform_utils import get_platform_name
             for key in raw_data:
                 if raw_data[key] and not (isinstance(raw_data[key], dict) and raw_data[key].get("error")):
                     platforms_list.append(get_platform_name(key))
-        platforms_str = ", ".join(platforms_list) if platforms_list else "GitHub, LeetCode, Resume"
+        return ", ".join(platforms_list) if platforms_list else "GitHub, LeetCode, Resume"
 
-        base = GUARDRAILS_BASE.format(
-            today=date.today().isoformat(),
-            platforms=platforms_str,
+    # =========================================
+    # PROMPT ASSEMBLY
+    # "prefix" layout (LLM_PROMPT_LAYOUT=prefix, default) orders the input so the three
+    # report calls share the longest possible identical prefix, which the provider caches:
+    #   1. system — guardrails with no job-specific values (identical for every job)
+    #   2. user   — job facts (date, data sources) + RAW PLATFORM DATA (identical per job)
+    #   3. system — the report's citation / writing-style rule
+    #   4. user   — the report's instructions and output sections
+    # "legacy" keeps the original system + single user message per report.
+    # =========================================
+
+    def _build_messages(self, report_type: str, context: str, raw_data: Dict = None) -> List[Dict[str, str]]:
+        prompt_builder = {
+            "extensive": self._extensive_prompt,
+            "developer": self._developer_prompt,
+            "recruiter": self._recruiter_prompt,
+        }[report_type]
+
+        if settings.llm_prompt_layout.lower() == "legacy":
+            return [
+                {"role": "system", "content": self._build_system_message(report_type, raw_data=raw_data)},
+                {"role": "user", "content": prompt_builder(context)},
+            ]
+
+        citation = CITATION_EXTENSIVE if report_type == "extensive" else CITATION_NATURAL
+        return [
+            {"role": "system", "content": SHARED_GUARDRAILS},
+            {"role": "user", "content": self._shared_context_message(context, raw_data)},
+            {"role": "system", "content": "ADDITIONAL RULE FOR THIS REPORT:" + citation.rstrip()},
+            {"role": "user", "content": prompt_builder(None)},
+        ]
+
+    def _shared_context_message(self, context: str, raw_data: Dict = None) -> str:
+        return (
+            "JOB FACTS:\n"
+            f"Today's date: {self._today()}\n"
+            f"Data sources for this candidate: {self._platforms_str(raw_data)}\n\n"
+            f"RAW PLATFORM DATA:\n{context}"
         )
-        if report_type == "extensive":
-            return base + CITATION_EXTENSIVE
-        else:
-            return base + CITATION_NATURAL
+
+    def _data_block(self, context: Optional[str]) -> str:
+        """Inline data block for the legacy layout; a pointer to the shared message otherwise."""
+        if context is None:
+            return "RAW PLATFORM DATA: provided above in this conversation."
+        return f"RAW PLATFORM DATA:\n{context}"
 
     # =========================================
     # CONTEXT BUILDER
     # =========================================
 
-    def _build_llm_context(self, raw_data: Dict) -> str:
+    def _build_llm_context(self, raw_data: Dict, metrics: Optional[Dict] = None) -> str:
         """
-        Passes raw platform data directly to the LLM with no transformation.
+        Passes raw platform data to the LLM without reinterpreting it.
         Dynamically includes all platforms that have data for this job.
+        `metrics` (services/derived_metrics) is prepended as a PRECOMPUTED METRICS block.
+
+        LLM_CONTEXT_FORMAT=compact (default) serializes payloads with
+        services/context_serializer — same values at the same field paths, fewer tokens.
+        LLM_CONTEXT_FORMAT=pretty keeps the original indent=2 dump.
+
+        If the result exceeds LLM_CONTEXT_TOKEN_BUDGET, a copy of raw_data is trimmed by
+        priority (services/context_budget) until it fits. Token counts and any pruning
+        decisions are recorded in self.context_stats.
         """
+        compact_mode = settings.llm_context_format.lower() != "pretty"
+        context, section_stats = self._render_context(raw_data, compact_mode, metrics=metrics)
+        tokens_before = sum(s["tokens_before"] for s in section_stats.values())
+        tokens_serialized = context_serializer.count_tokens(context)
+
+        decisions = []
+        tokens_final = tokens_serialized
+        budget = settings.llm_context_token_budget
+        if budget and tokens_serialized > budget:
+            trimmed, decisions, tokens_final = fit_to_budget(
+                raw_data, budget, lambda data: self._render_context(data, compact_mode, measure=False, metrics=metrics)[0],
+            )
+            context, section_stats = self._render_context(trimmed, compact_mode, metrics=metrics)
+
+        self.context_stats = {
+            "format": "compact" if compact_mode else "pretty",
+            "tokens_before": tokens_before,
+            "tokens_after": tokens_final,
+            "budget": budget or None,
+            "over_budget": bool(budget) and tokens_final > budget,
+            "pruning": decisions,
+            "sections": {pid: stats["tokens_after"] for pid, stats in section_stats.items()},
+        }
+        self.prompt_cache_key = "cred-" + hashlib.sha256(context.encode("utf-8")).hexdigest()[:32]
+        return context
+
+    def _render_context(self, raw_data: Dict, compact: bool, measure: bool = True, metrics: Optional[Dict] = None):
+        """Returns (context, {platform_id: {"tokens_before", "tokens_after"}}). measure=False skips the counts."""
         from services.platform_utils import get_platform_name
         sections = []
+        section_stats = {}
+
+        if metrics:
+            dump = context_serializer.dumps if compact else (lambda value: json.dumps(value, indent=2))
+            section = (
+                "=== PRECOMPUTED METRICS (exact aggregates over the full raw data below — "
+                "use these numbers as-is, do not recount) ===\n" + dump(metrics)
+            )
+            sections.append(section)
+            if measure:
+                tokens = context_serializer.count_tokens(section)
+                section_stats["precomputed_metrics"] = {"tokens_before": tokens, "tokens_after": tokens}
 
         for platform_id, data in raw_data.items():
             if not data or (isinstance(data, dict) and data.get("error")):
                 continue
 
             platform_name = get_platform_name(platform_id)
-
-            # Resume: use raw text if available
-            if platform_id == "resume":
-                raw_text = data.get("raw_text", "")
-                if raw_text:
-                    sections.append(f"=== {platform_name.upper()} TEXT ===\n{raw_text}")
+            if not measure:
+                section = self._build_section(platform_id, platform_name, data, compact=compact)
+                if section:
+                    sections.append(section)
                 continue
 
-            # GitHub/LeetCode: use nested "data" key if present (GraphQL response shape)
-            if platform_id in ("github", "leetcode") and "data" in data:
-                sections.append(
-                    f"=== {platform_name.upper()} RAW DATA (GraphQL Response) ===\n"
-                    + json.dumps(data["data"], indent=2)
-                )
-                continue
+            section = self._build_section(platform_id, platform_name, data, compact=False)
+            tokens_before = context_serializer.count_tokens(section) if section else 0
+            if compact and section:
+                section = self._build_section(platform_id, platform_name, data, compact=True)
 
-            # Web search results or other platforms: prefer raw_text, fall back to JSON dump
-            raw_text = data.get("raw_text", "")
-            if raw_text:
-                sections.append(f"=== {platform_name.upper()} PROFILE DATA ===\n{raw_text}")
-            else:
-                sections.append(
-                    f"=== {platform_name.upper()} PROFILE DATA ===\n"
-                    + json.dumps(data, indent=2)
-                )
+            if section:
+                sections.append(section)
+                section_stats[platform_id] = {
+                    "tokens_before": tokens_before,
+                    "tokens_after": context_serializer.count_tokens(section),
+                }
+
+        return "\n\n".join(sections), section_stats
 
-        return "\n\n".join(sections)
+    def _build_section(self, platform_id: str, platform_name: str, data: Dict, compact: bool) -> str:
+        """One platform's block of the LLM context. Empty string when there is nothing to send."""
+        dump = context_serializer.dumps if compact else (lambda value: json.dumps(value, indent=2))
+
+        # Resume: use raw text if available
+        if platform_id == "resume":
+            raw_text = data.get("raw_text", "")
+            if compact:
+                raw_text = context_serializer.squeeze_text(raw_text)
+            return f"=== {platform_name.upper()} TEXT ===\n{raw_text}" if raw_text else ""
+
+        # GitHub/LeetCode: use nested "data" key if present (GraphQL response shape)
+        if platform_id in ("github", "leetcode") and "data" in data:
+            label = "GraphQL Response, compact JSON" if compact else "GraphQL Response"
+            return f"=== {platform_name.upper()} RAW DATA ({label}) ===\n" + dump(data["data"])
+
+        # Web search results or other platforms: prefer raw_text, fall back to JSON dump
+        raw_text = data.get("raw_text", "")
+        if raw_text:
+            if compact:
+                raw_text = context_serializer.squeeze_text(raw_text)
+            return f"=== {platform_name.upper()} PROFILE DATA ===\n{raw_text}"
+        return f"=== {platform_name.upper()} PROFILE DATA ===\n" + dump(data)
 
     # =========================================
     # EXTENSIVE REPORT
@@ -180,8 +328,7 @@ class ReportGenerator:
 This is the data room — every signal must be surfaced, every claim cross-checked, every finding cited.
 Be analytical, direct, and precise. Do not summarise — go deep on every section.
 
-RAW PLATFORM DATA:
-{context}
+{self._data_block(context)}
 
 OUTPUT SECTIONS:
 
@@ -192,22 +339,23 @@ Every sentence must be cited.
 
 ### 2. Engineering Depth Analysis
 - Languages: list each with verification status and citation
-- Frameworks & Libraries: list each, state how verified (repo name / topic / description — cite exactly)
+- Frameworks & Libraries: list each, state how verified (repo name / topic / description / productionSignals.dependencyIndex — cite exactly); a dependency declared only under "dev" is tooling, not production use
 - Repository quality: total repos, active repos, original vs forks (cite counts)
 - Notable repositories: name, purpose, tech stack, stars, last pushed (from raw data)
 - Production signals: Docker, CI/CD, tests — per repo where found
 
 ### 3. Problem Solving Depth
 - Total solved, difficulty breakdown (cite exact fields)
-- Acceptance rate: calculate as (acSubmissionNum[All].count / totalSubmissionNum[All].count) × 100. Do NOT confuse "problems solved" (unique accepted) with "total accepted submissions" (includes retries). Cite both numerator and denominator.
+- Acceptance rate: use PRECOMPUTED METRICS leetcode.acceptance_rate_pct when present, otherwise calculate as (acSubmissionNum[All].count / totalSubmissionNum[All].count) × 100. Do NOT confuse "problems solved" (unique accepted) with "total accepted submissions" (includes retries). Cite both numerator and denominator.
 - Top topic strengths from tagProblemCounts (cite top 5 with problem counts)
 - Contest history: attended count, rating if available
 - Languages used in LeetCode submissions (cite recentSubmissionList lang fields)
 
 ### 4. Execution & Consistency Pattern
-- GitHub: total commits, active days this year, PR count and merge rate (cite fields)
+- GitHub: total commits, active days this year, PR count and merge rate (cite fields — take counts and rates from PRECOMPUTED METRICS when present)
 - LeetCode: submissions last 30 days, last 90 days (cite fields)
-- Assess consistency using BOTH platforms together — do not penalise for low LeetCode if GitHub is active
+- Streaks, weekly cadence and inactivity gaps: use PRECOMPUTED METRICS activity_timeline when present (the day-level calendars are summarized there)
+- Assess consistency using BOTH platforms together (activity_timeline.combined) — do not penalise for low LeetCode if GitHub is active
 
 ### 5. Production Readiness Signals
 Check each repository in the raw data for: Dockerfile, CI config (.github/workflows etc.), test directories.
@@ -249,8 +397,7 @@ Write in clear, natural prose — do NOT add inline citations like "(Source: ...
 Use specific numbers and repo names naturally in the text (e.g. "your 57 hard problems" not "57 hard problems (Source: LeetCode > submitStats)").
 All verification details will appear in the disclaimer at the end — not inline.
 
-RAW PLATFORM DATA:
-{context}
+{self._data_block(context)}
 
 OUTPUT SECTIONS:
 
@@ -265,9 +412,9 @@ Do not bullet everything — write it as a mentor would speak it.
 
 ### 3. Critical Gaps
 Be specific with numbers but write naturally:
-- Problem solving gaps (hard problem count, topic holes, acceptance rate). Acceptance rate formula: (acSubmissionNum[All].count / totalSubmissionNum[All].count) × 100.
+- Problem solving gaps (hard problem count, topic holes, acceptance rate). Acceptance rate: PRECOMPUTED METRICS leetcode.acceptance_rate_pct, or (acSubmissionNum[All].count / totalSubmissionNum[All].count) × 100 if absent.
 - Production readiness (CI, Docker, tests — which repos, how many)
-- Consistency (combine GitHub and LeetCode signals together — do not penalise for low LeetCode if GitHub is active)
+- Consistency (combine GitHub and LeetCode signals together, e.g. activity_timeline.combined — do not penalise for low LeetCode if GitHub is active)
 - Code collaboration (reviews given, external PRs)
 
 ### 4. 30-Day Action Plan
@@ -303,16 +450,15 @@ Do not include interview questions or improvement suggestions — those are not
 Write in clear, natural prose — do NOT add inline citations like "(Source: ...)" after every sentence.
 Use specific numbers naturally in the text. All verification details go in the disclaimer at the end.
 
-RAW PLATFORM DATA:
-{context}
+{self._data_block(context)}
 
 OUTPUT SECTIONS:
 
 ### 1. Candidate Snapshot
 Only platform-verified information here — do NOT list skills that are resume-only claims.
 - Role level (derived from experience timeline and platform evidence)
-- Verified languages and frameworks (found in GitHub repos, topics, or LeetCode submissions)
-- LeetCode acceptance rate: calculate as (acSubmissionNum[All].count / totalSubmissionNum[All].count) × 100
+- Verified languages and frameworks (found in GitHub repos, topics, dependency manifests, or LeetCode submissions)
+- LeetCode acceptance rate: PRECOMPUTED METRICS leetcode.acceptance_rate_pct, or (acSubmissionNum[All].count / totalSubmissionNum[All].count) × 100 if absent
 Write this as a clean, scannable summary a recruiter can read in 30 seconds.
 
 ### 2. Hire Recommendation
@@ -354,77 +500,115 @@ End the report with this section:
     # Uses system + user message split so guardrails are in system role.
     # =========================================
 
-    def _call_llm(self, system: str, prompt: str) -> str:
-        """
-        Calls the LLM. Raises on failure — never returns error strings.
-        The caller (pipeline) is responsible for catching and marking the job as failed.
-        """
-        response = self.client.responses.create(
+    async def _call_llm_async(self, messages: List[Dict[str, str]], call_stats: Optional[Dict[str, Any]] = None) -> str:
+        """Non-streaming call on the async client — the streaming fallback. Raises on failure."""
+        response = await self.async_client.responses.create(
             model=self.model,
             tools=[{"type": "web_search_preview"}],
             tool_choice="auto",
-            input=[
-                {"role": "system", "content": system},
-                {"role": "user", "content": prompt},
-            ],
+            input=messages,
+            **self._cache_kwargs(),
         )
+        self._record_usage(getattr(response, "usage", None), call_stats)
+        if call_stats is not None:
+            call_stats["web_search_calls"] = sum(
+                1 for item in (getattr(response, "output", None) or [])
+                if getattr(item, "type", "") == "web_search_call"
+            )
 
         if not response.output_text:
             raise ValueError("LLM returned empty response")
 
         return response.output_text
 
-    def _call_llm_streaming(
+    async def _call_llm_streaming(
         self,
-        system: str,
-        prompt: str,
+        messages: List[Dict[str, str]],
         progress_callback: Optional[Callable[[str, str], None]] = None,
+        call_stats: Optional[Dict[str, Any]] = None,
+        on_first_output: Optional[Callable[[], None]] = None,
+        on_delta: Optional[Callable[[str], None]] = None,
+        admit: Optional[Callable[[], AsyncContextManager[Dict[str, Any]]]] = None,
     ) -> str:
         """
-        Streaming LLM call with progress callbacks.
-        Falls back to _call_llm() if streaming fails.
+        Streaming LLM call with progress callbacks, on the async client.
+        Falls back to _call_llm_async() if streaming fails — after a 429, only once the
+        provider's Retry-After has passed (all admissions are deferred meanwhile).
+
+        Cancelling the awaiting task closes the stream — the provider stops generating
+        and the CancelledError propagates (no fallback call is made).
 
         progress_callback(event_type, detail):
             event_type: "web_search" | "text_progress"
             detail: descriptive string (e.g., "searching" or token count)
+
+        call_stats: optional dict filled with telemetry for the call — model, token usage
+            (input_tokens, cached_tokens, output_tokens) from the final response, ttft_ms
+            (first text delta), duration_ms, web_search_calls and fallback_used.
+        on_first_output: called once when the model starts producing output —
+            by then the prompt prefix has been processed and cached.
+        on_delta: called with every output text delta as it arrives (live drafts).
+        admit: returns an llm_admission.slot() for the fallback — it is a second provider
+            request, so it takes its own slot and settles it with its own usage. The
+            caller's grant for the stream then keeps its estimate.
         """
+        stats = call_stats if call_stats is not None else {}
+        stats.update({"model": self.model, "ttft_ms": None, "web_search_calls": 0, "fallback_used": False})
+        started = time.monotonic()
         try:
-            stream = self.client.responses.create(
+            stream = await self.async_client.responses.create(
                 model=self.model,
                 tools=[{"type": "web_search_preview"}],
                 tool_choice="auto",
-                input=[
-                    {"role": "system", "content": system},
-                    {"role": "user", "content": prompt},
-                ],
+                input=messages,
                 stream=True,
+                **self._cache_kwargs(),
             )
 
             full_text = ""
             last_callback_time = time.time()
             callback_interval = 4  # seconds between text progress callbacks
-
-            for event in stream:
-                event_type = getattr(event, "type", "")
-
-                # Web search events — fire callback immediately
-                if event_type == "response.web_search_call.searching":
-                    if progress_callback:
-                        progress_callback("web_search", "searching")
-
-                elif event_type == "response.web_search_call.completed":
-                    if progress_callback:
-                        progress_callback("web_search", "completed")
-
-                # Text delta events — accumulate and fire periodically
-                elif event_type == "response.output_text.delta":
-                    delta = getattr(event, "delta", "")
-                    full_text += delta
-
-                    now = time.time()
-                    if progress_callback and (now - last_callback_time) >= callback_interval:
-                        last_callback_time = now
-                        progress_callback("text_progress", str(len(full_text)))
+            output_started = False
+
+            try:
+                async for event in stream:
+                    event_type = getattr(event, "type", "")
+
+                    if not output_started and event_type in FIRST_OUTPUT_EVENTS:
+                        output_started = True
+                        if on_first_output:
+                            on_first_output()
+
+                    # Web search events — fire callback immediately
+                    if event_type == "response.web_search_call.searching":
+                        stats["web_search_calls"] += 1
+                        if progress_callback:
+                            progress_callback("web_search", "searching")
+
+                    elif event_type == "response.web_search_call.completed":
+                        if progress_callback:
+                            progress_callback("web_search", "completed")
+
+                    # Text delta events — accumulate and fire periodically
+                    elif event_type == "response.output_text.delta":
+                        delta = getattr(event, "delta", "")
+                        if stats["ttft_ms"] is None:
+                            stats["ttft_ms"] = int((time.monotonic() - started) * 1000)
+                        full_text += delta
+                        if on_delta:
+                            on_delta(delta)
+
+                        now = time.time()
+                        if progress_callback and (now - last_callback_time) >= callback_interval:
+                            last_callback_time = now
+                            progress_callback("text_progress", str(len(full_text)))
+
+                    elif event_type == "response.completed":
+                        self._record_usage(getattr(getattr(event, "response", None), "usage", None), stats)
+            finally:
+                # Also runs on cancellation — drops the connection so generation stops server-side
+                await stream.close()
+                stats["duration_ms"] = int((time.monotonic() - started) * 1000)
 
             if not full_text:
                 raise ValueError("LLM streaming returned empty response")
@@ -433,4 +617,40 @@ End the report with this section:
 
         except Exception as e:
             logger.warning(f"Streaming LLM call failed, falling back to non-streaming: {e}")
-            return self._call_llm(system, prompt)
+            stats["fallback_used"] = True
+            stats["stream_error"] = str(e)[:500]
+            for key in ("input_tokens", "cached_tokens", "output_tokens"):
+                stats.pop(key, None)  # usage from here on is the fallback's
+            if isinstance(e, RateLimitError):
+                # Retrying straight away would just hit the same limit — admit() waits the deferral out
+                delay = llm_admission.record_rate_limit(e)
+                if admit is None:
+                    await asyncio.sleep(delay)
+            try:
+                if admit is None:
+                    return await self._call_llm_async(messages, call_stats=stats)
+                async with admit() as grant:
+                    try:
+                        return await self._call_llm_async(messages, call_stats=stats)
+                    finally:
+                        if stats.get("input_tokens") is not None:
+                            llm_admission.settle(grant, stats["input_tokens"] + (stats.get("output_tokens") or 0))
+            finally:
+                stats["duration_ms"] = int((time.monotonic() - started) * 1000)
+
+    def _cache_kwargs(self) -> Dict[str, Any]:
+        if not self.prompt_cache_key or settings.llm_prompt_layout.lower() == "legacy":
+            return {}
+        # extra_body keeps this working on SDK versions that predate the prompt_cache_key argument
+        return {"extra_body": {"prompt_cache_key": self.prompt_cache_key}}
+
+    @staticmethod
+    def _record_usage(usage: Any, call_stats: Optional[Dict[str, Any]]):
+        if usage is None or call_stats is None:
+            return
+        details = getattr(usage, "input_tokens_details", None)
+        call_stats.update({
+            "input_tokens": getattr(usage, "input_tokens", None),
+            "cached_tokens": getattr(details, "cached_tokens", None) or 0,
+            "output_tokens": getattr(usage, "output_tokens", None),
+        })
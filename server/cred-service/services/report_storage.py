@@ -1,59 +1,92 @@
 """
-Report Storage v5
+Report Storage v6
 
 Stores pipeline outputs:
 - raw_signals: complete raw platform data bundle (source of truth)
 - extensive_report: LLM-generated deep analysis
 - developer_insight: LLM-generated growth direction
 - recruiter_insight: LLM-generated hiring decision support
+- context_budget: LLM context token counts and any pruning applied to fit the budget
+  (internal — served by GET /generate/{job_id}/telemetry, not with the reports)
+
+Each LLM report is checkpointed the moment it finishes (save_report), with the hash
+of its exact LLM input. A retry reads the checkpoints back (get_checkpoints) and
+regenerates only the reports that are missing or whose input changed. Every write
+replaces the job's existing row for that layer.
 """
 
 from datetime import datetime
 import json
 import logging
+from typing import Dict, List, Optional
 from app.database import SessionLocal, Report
 
 logger = logging.getLogger(__name__)
 
+# Layers stored as JSON rather than report text
+JSON_LAYERS = ("raw_signals", "context_budget")
+
+# LLM report layers — checkpointed individually
+REPORT_LAYERS = ("extensive_report", "developer_insight", "recruiter_insight")
+
+# Diagnostics for operators — never part of the public report payload
+INTERNAL_LAYERS = ("context_budget",)
+
 
 class ReportStorageService:
 
+    def save_report(self, job_id: str, layer: str, content: str, input_hash: Optional[str] = None):
+        """Checkpoint one finished LLM report."""
+        self._replace(job_id, [Report(
+            job_id=job_id,
+            layer=layer,
+            content=content,
+            input_hash=input_hash,
+            created_at=datetime.utcnow(),
+        )])
+
     def save_reports(self, job_id: str, pipeline_output: dict):
-        db = SessionLocal()
         now = datetime.utcnow()
+        reports = pipeline_output.get("reports", {})
+        input_hashes = pipeline_output.get("input_hashes", {})
 
-        try:
-            reports = pipeline_output.get("reports", {})
-
-            records = [
-                # Raw signals — complete platform data
-                Report(
-                    job_id=job_id,
-                    layer="raw_signals",
-                    content=json.dumps(pipeline_output.get("raw_data", {})),
-                    created_at=now,
-                ),
-                # LLM reports
-                Report(
-                    job_id=job_id,
-                    layer="extensive_report",
-                    content=reports.get("extensive_report"),
-                    created_at=now,
-                ),
-                Report(
+        records = [
+            # Raw signals — complete platform data
+            Report(
+                job_id=job_id,
+                layer="raw_signals",
+                content=json.dumps(pipeline_output.get("raw_data", {})),
+                created_at=now,
+            ),
+        ]
+        # LLM reports — normally already checkpointed; rewriting them is idempotent
+        for layer in REPORT_LAYERS:
+            if reports.get(layer) is not None:
+                records.append(Report(
                     job_id=job_id,
-                    layer="developer_insight",
-                    content=reports.get("developer_insight"),
+                    layer=layer,
+                    content=reports[layer],
+                    input_hash=input_hashes.get(layer),
                     created_at=now,
-                ),
-                Report(
-                    job_id=job_id,
-                    layer="recruiter_insight",
-                    content=reports.get("recruiter_insight"),
-                    created_at=now,
-                ),
-            ]
+                ))
+
+        if pipeline_output.get("context_stats"):
+            records.append(Report(
+                job_id=job_id,
+                layer="context_budget",
+                content=json.dumps(pipeline_output["context_stats"]),
+                created_at=now,
+            ))
 
+        self._replace(job_id, records)
+
+    def _replace(self, job_id: str, records: List[Report]):
+        db = SessionLocal()
+        try:
+            db.query(Report).filter(
+                Report.job_id == job_id,
+                Report.layer.in_([record.layer for record in records]),
+            ).delete(synchronize_session=False)
             db.add_all(records)
             db.commit()
 
@@ -65,13 +98,33 @@ class ReportStorageService:
         finally:
             db.close()
 
-    def get_reports(self, job_id: str) -> dict:
+    def get_checkpoints(self, job_id: str) -> Dict[str, Dict[str, Optional[str]]]:
+        """Stored LLM reports for the job: layer → {"input_hash", "content"}."""
+        db = SessionLocal()
+        try:
+            rows = db.query(Report).filter(
+                Report.job_id == job_id,
+                Report.layer.in_(REPORT_LAYERS),
+            ).all()
+            return {
+                row.layer: {"input_hash": row.input_hash, "content": row.content}
+                for row in rows
+                if row.content
+            }
+        finally:
+            db.close()
+
+    def get_reports(self, job_id: str, include_internal: bool = False) -> dict:
+        """Stored layers by name. INTERNAL_LAYERS are left out unless include_internal is set."""
         db = SessionLocal()
         try:
-            reports = db.query(Report).filter(Report.job_id == job_id).all()
+            query = db.query(Report).filter(Report.job_id == job_id)
+            if not include_internal:
+                query = query.filter(Report.layer.notin_(INTERNAL_LAYERS))
+            reports = query.all()
             result = {}
             for report in reports:
-                if report.layer == "raw_signals":
+                if report.layer in JSON_LAYERS:
                     try:
                         result[report.layer] = json.loads(report.content) if report.content else {}
                     except (json.JSONDecodeError, TypeError):
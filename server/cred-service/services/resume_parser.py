@@ -3,22 +3,116 @@
 Converts resume files to raw text.
 No structured parsing, no field extraction.
 The LLM receives the raw text and does all the reasoning.
+
+PDF extraction is CPU-bound, so the async path runs it in a small process pool
+(RESUME_PARSE_WORKERS) with a page cap, a byte cap and a wall-clock deadline.
+A runaway PDF is killed with its worker instead of holding the GIL on the API process.
+
+ProcessPoolExecutor cannot kill a single task, so a timed-out parse retires its pool:
+new parses go to a fresh pool at once, and the retired pool's workers are terminated
+only when its other in-flight parses have finished — one bad PDF never fails another
+job's resume.
 """
 
 import io
+import asyncio
 import logging
-from typing import Dict, Any
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Any, Optional, Set
 import PyPDF2
 
+from app.config import settings
+
 logger = logging.getLogger(__name__)
 
+_pool: Optional[ProcessPoolExecutor] = None
+_active: Dict[ProcessPoolExecutor, int] = {}  # pool → parses still awaited on it
+_retired: Set[ProcessPoolExecutor] = set()
+_lock = threading.Lock()
+
+
+def _acquire_pool() -> ProcessPoolExecutor:
+    """The current pool, counted as in use until _release_pool()."""
+    global _pool
+    with _lock:
+        if _pool is None:
+            # spawn, not fork — forking a process with live threads and an event loop can deadlock
+            _pool = ProcessPoolExecutor(
+                max_workers=max(1, settings.resume_parse_workers),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        _active[_pool] = _active.get(_pool, 0) + 1
+        return _pool
+
+
+def _release_pool(pool: ProcessPoolExecutor, retire: bool = False):
+    """
+    Stop counting one parse against pool. retire=True takes the pool out of service
+    (if it still is the current one); a retired pool is killed once nothing awaits it.
+    """
+    global _pool
+    with _lock:
+        _active[pool] -= 1
+        if retire:
+            _retired.add(pool)
+            if _pool is pool:
+                _pool = None
+        idle = _active[pool] <= 0
+        if idle:
+            del _active[pool]
+        kill = idle and pool in _retired
+        if kill:
+            _retired.discard(pool)
+    if kill:
+        _kill_pool(pool)
+
+
+def _kill_pool(pool: ProcessPoolExecutor):
+    # ProcessPoolExecutor has no public way to stop a running task — terminate its workers
+    for process in list((pool._processes or {}).values()):
+        process.terminate()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_pool(kill: bool = False):
+    """Shut down the parse pool. With kill=True, terminate workers stuck on a PDF."""
+    global _pool
+    with _lock:
+        pools = set(_retired) | ({_pool} if _pool is not None else set())
+        _pool = None
+        _retired.clear()
+        _active.clear()
+    for pool in pools:
+        if kill:
+            _kill_pool(pool)
+        else:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _extract_pdf_text(pdf_content: bytes, max_pages: int) -> str:
+    """Runs inside a pool worker. Module-level so it can be pickled."""
+    try:
+        reader = PyPDF2.PdfReader(io.BytesIO(pdf_content))
+        pages = reader.pages[:max_pages] if max_pages > 0 else reader.pages
+        return "\n".join(page.extract_text() or "" for page in pages)
+    except Exception as e:
+        return f"PDF extraction error: {str(e)}"
+
 
 class ResumeParser:
 
     def parse_resume_bytes(self, content: bytes, filename: str = "") -> Dict[str, Any]:
+        """Synchronous parse in the calling thread. Prefer parse_resume_bytes_async on the event loop."""
         logger.info(f"Resume parse started — filename={filename}, size={len(content)} bytes")
         try:
-            if filename and filename.lower().endswith(".pdf"):
+            too_large = self._check_size(content)
+            if too_large:
+                return too_large
+
+            if self._is_pdf(filename):
                 raw_text = self._extract_pdf_text(content)
             else:
                 raw_text = content.decode("utf-8", errors="ignore")
@@ -30,9 +124,56 @@ class ResumeParser:
             logger.error(f"Resume parse failed for {filename}: {e}", exc_info=True)
             return {"raw_text": "", "error": f"Resume parsing failed: {str(e)}"}
 
-    def _extract_pdf_text(self, pdf_content: bytes) -> str:
+    async def parse_resume_bytes_async(self, content: bytes, filename: str = "") -> Dict[str, Any]:
+        """Same result shape as parse_resume_bytes, with PDF work offloaded to the process pool."""
+        logger.info(f"Resume parse started — filename={filename}, size={len(content)} bytes")
+        too_large = self._check_size(content)
+        if too_large:
+            return too_large
+
+        if not self._is_pdf(filename):
+            raw_text = content.decode("utf-8", errors="ignore")
+            logger.info(f"Resume parse succeeded — {len(raw_text)} chars extracted")
+            return {"raw_text": raw_text}
+
+        timeout = settings.resume_parse_timeout
+        pool = _acquire_pool()
+        retire = False
         try:
-            reader = PyPDF2.PdfReader(io.BytesIO(pdf_content))
-            return "\n".join(page.extract_text() or "" for page in reader.pages)
+            loop = asyncio.get_running_loop()
+            raw_text = await asyncio.wait_for(
+                loop.run_in_executor(pool, _extract_pdf_text, content, settings.resume_max_pages),
+                timeout=timeout,
+            )
+            logger.info(f"Resume parse succeeded — {len(raw_text)} chars extracted")
+            return {"raw_text": raw_text}
+
+        except asyncio.TimeoutError:
+            logger.error(f"Resume parse timed out for {filename} after {timeout:.0f}s — retiring its parse pool")
+            retire = True
+            return {"raw_text": "", "error": f"Resume parsing timed out after {timeout:.0f}s"}
+
+        except BrokenProcessPool as e:
+            logger.error(f"Resume parse worker crashed for {filename}: {e}", exc_info=True)
+            retire = True
+            return {"raw_text": "", "error": "Resume parsing failed: worker crashed"}
+
         except Exception as e:
-            return f"PDF extraction error: {str(e)}"
+            logger.error(f"Resume parse failed for {filename}: {e}", exc_info=True)
+            return {"raw_text": "", "error": f"Resume parsing failed: {str(e)}"}
+
+        finally:
+            _release_pool(pool, retire=retire)
+
+    def _check_size(self, content: bytes) -> Optional[Dict[str, Any]]:
+        max_bytes = settings.resume_max_bytes
+        if max_bytes and len(content) > max_bytes:
+            logger.warning(f"Resume rejected — {len(content)} bytes exceeds limit of {max_bytes}")
+            return {"raw_text": "", "error": f"Resume is {len(content)} bytes, exceeds the {max_bytes}-byte limit"}
+        return None
+
+    def _is_pdf(self, filename: str) -> bool:
+        return bool(filename) and filename.lower().endswith(".pdf")
+
+    def _extract_pdf_text(self, pdf_content: bytes) -> str:
+        return _extract_pdf_text(pdf_content, settings.resume_max_pages)
@@ -4,12 +4,17 @@ Used for platforms without dedicated extractors (everything except GitHub, LeetC
 and Resume). The LLM uses its web_search_preview tool to visit the URL and extract
 profile data as plain text — no JSON structuring needed since the report generator
 LLM consumes raw text directly.
+
+Calls go through AsyncOpenAI so a slow lookup never blocks the event loop.
+In-flight lookups are capped by WEB_SEARCH_CONCURRENCY and each one is bounded
+by WEB_SEARCH_TIMEOUT.
 """
 
+import asyncio
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
-from openai import OpenAI
+from openai import AsyncOpenAI
 from app.config import settings
 from .platform_utils import get_platform_name
 
@@ -26,6 +31,24 @@ Rules:
 - Write in clear, factual prose — no formatting requirements
 - If the URL is inaccessible or the profile doesn't exist, say so clearly"""
 
+# Shared across all fetcher instances (one ExtractionService is created per request)
+_client: Optional[AsyncOpenAI] = None
+_semaphore: Optional[asyncio.Semaphore] = None
+
+
+def _get_client() -> AsyncOpenAI:
+    global _client
+    if _client is None:
+        _client = AsyncOpenAI(api_key=settings.openai_api_key, timeout=settings.web_search_timeout)
+    return _client
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(max(1, settings.web_search_concurrency))
+    return _semaphore
+
 
 class WebSearchFetcher:
     """Fetches profile data from any URL using OpenAI's web_search_preview tool."""
@@ -34,7 +57,7 @@ class WebSearchFetcher:
         api_key = settings.openai_api_key
         if not api_key:
             raise ValueError("OPENAI_API_KEY required for WebSearchFetcher")
-        self.client = OpenAI(api_key=api_key)
+        self.client = _get_client()
         self.model = model
 
     async def fetch_profile(self, url: str, platform_id: str) -> Dict[str, Any]:
@@ -48,14 +71,18 @@ class WebSearchFetcher:
         platform_name = get_platform_name(platform_id)
 
         try:
-            response = self.client.responses.create(
-                model=self.model,
-                tools=[{"type": "web_search_preview"}],
-                input=[
-                    {"role": "system", "content": EXTRACTION_SYSTEM_PROMPT},
-                    {"role": "user", "content": f"Extract all profile data from: {url}"},
-                ],
-            )
+            async with _get_semaphore():
+                response = await asyncio.wait_for(
+                    self.client.responses.create(
+                        model=self.model,
+                        tools=[{"type": "web_search_preview"}],
+                        input=[
+                            {"role": "system", "content": EXTRACTION_SYSTEM_PROMPT},
+                            {"role": "user", "content": f"Extract all profile data from: {url}"},
+                        ],
+                    ),
+                    timeout=settings.web_search_timeout,
+                )
 
             result_text = ""
             for item in response.output:
@@ -81,6 +108,15 @@ class WebSearchFetcher:
                 "raw_text": result_text,
             }
 
+        except asyncio.TimeoutError:
+            logger.error(f"WebSearchFetcher timed out for {platform_id} ({url}) after {settings.web_search_timeout:.0f}s")
+            return {
+                "error": f"web search timed out after {settings.web_search_timeout:.0f}s",
+                "url": url,
+                "platform": platform_name,
+                "data_source": "web_search_error",
+            }
+
         except Exception as e:
             logger.error(f"WebSearchFetcher failed for {platform_id} ({url}): {e}", exc_info=True)
             return {
@@ -0,0 +1,99 @@
+"""
+Shared pytest setup.
+
+Every test run uses a throwaway SQLite database and a dummy OpenAI key, set before
+any app module is imported (app.config reads the environment at import time).
+Provider calls are faked — see FakeAsyncOpenAI — so the suite needs no network.
+"""
+
+import os
+import sys
+import tempfile
+import types
+
+import pytest
+
+_db_fd, _db_path = tempfile.mkstemp(prefix="cred-service-tests-", suffix=".db")
+os.close(_db_fd)
+os.environ["CRED_SERVICE_DATABASE_URL"] = f"sqlite:///{_db_path}"
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import Base, SessionLocal, init_db  # noqa: E402
+
+init_db()
+
+
+@pytest.fixture(autouse=True)
+def clean_db():
+    """Empty every table after each test."""
+    yield
+    db = SessionLocal()
+    try:
+        for table in reversed(Base.metadata.sorted_tables):
+            db.execute(table.delete())
+        db.commit()
+    finally:
+        db.close()
+
+
+def pytest_sessionfinish(session, exitstatus):
+    try:
+        os.remove(_db_path)
+    except OSError:
+        pass
+
+
+# ---------------------------
+# FAKE PROVIDER
+# ---------------------------
+
+class FakeStream:
+    """Async iterator of Responses API stream events: a few text deltas, then response.completed."""
+
+    def __init__(self, text: str, input_tokens: int = 100, output_tokens: int = 20):
+        self.text = text
+        self.usage = types.SimpleNamespace(
+            input_tokens=input_tokens, output_tokens=output_tokens,
+            input_tokens_details=types.SimpleNamespace(cached_tokens=0),
+        )
+        self.closed = False
+
+    def __aiter__(self):
+        return self._events()
+
+    async def _events(self):
+        for i in range(0, len(self.text), 4):
+            yield types.SimpleNamespace(type="response.output_text.delta", delta=self.text[i:i + 4])
+        yield types.SimpleNamespace(type="response.completed", response=types.SimpleNamespace(usage=self.usage))
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeResponses:
+
+    def __init__(self, text_for=None, fail_stream=None):
+        self.calls = []
+        self.text_for = text_for or (lambda kwargs: "report text")
+        self.fail_stream = fail_stream  # exception raised instead of opening a stream
+
+    async def create(self, **kwargs):
+        self.calls.append(kwargs)
+        if kwargs.get("stream"):
+            if self.fail_stream is not None:
+                raise self.fail_stream
+            return FakeStream(self.text_for(kwargs))
+        usage = types.SimpleNamespace(input_tokens=90, output_tokens=10, input_tokens_details=None)
+        return types.SimpleNamespace(output_text="fallback " + self.text_for(kwargs), usage=usage, output=[])
+
+
+class FakeAsyncOpenAI:
+
+    def __init__(self, **kwargs):
+        self.responses = FakeResponses(**kwargs)
+
+
+@pytest.fixture
+def fake_openai():
+    return FakeAsyncOpenAI()
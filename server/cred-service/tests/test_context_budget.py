@@ -0,0 +1,63 @@
+"""services/context_budget.py: trimming the LLM context to a token budget, lowest-value signal first."""
+
+import copy
+import json
+
+from services.context_budget import MIN_REPOS, MIN_TEXT_CHARS, TRUNCATION_MARKER, fit_to_budget
+from services.context_serializer import count_tokens
+
+
+def _raw_data(repos=30, resume_chars=100):
+    nodes = [
+        {"name": f"repo-{i}", "stargazerCount": i, "pushedAt": f"2024-01-{i % 28 + 1:02d}", "description": "x" * 200}
+        for i in range(repos)
+    ]
+    return {
+        "github": {"data": {
+            "login": "octo",
+            "pinnedItems": {"nodes": [{"name": "repo-0"}]},
+            "repositories": {"totalCount": repos, "nodes": nodes},
+        }},
+        "resume": {"raw_text": "r" * resume_chars},
+    }
+
+
+def test_context_within_budget_is_returned_untouched():
+    raw_data = _raw_data(repos=2)
+
+    data, decisions, tokens = fit_to_budget(raw_data, 100_000, json.dumps)
+
+    assert data is raw_data
+    assert decisions == []
+    assert tokens == count_tokens(json.dumps(raw_data))
+
+
+def test_low_value_repos_go_first_and_pinned_ones_stay():
+    raw_data = _raw_data()
+    original = copy.deepcopy(raw_data)
+    budget = count_tokens(json.dumps(raw_data)) * 2 // 3
+
+    data, decisions, tokens = fit_to_budget(raw_data, budget, json.dumps)
+
+    assert raw_data == original  # the stored data is never modified
+    assert tokens <= budget
+    assert {decision["step"] for decision in decisions} == {"github_repositories"}
+    kept = {repo["name"] for repo in data["github"]["data"]["repositories"]["nodes"]}
+    assert "repo-0" in kept  # pinned, despite having the fewest stars
+    dropped = {f"repo-{i}" for i in range(30)} - kept
+    assert max(int(name.split("-")[1]) for name in dropped) < min(int(name.split("-")[1]) for name in kept - {"repo-0"})
+    assert all(d["tokens_after"] < d["tokens_before"] for d in decisions)
+
+
+def test_resume_is_truncated_last_and_never_below_the_floor():
+    raw_data = _raw_data(resume_chars=20_000)
+
+    data, decisions, tokens = fit_to_budget(raw_data, 1, json.dumps)
+
+    assert tokens > 1  # the floor can't be crossed, so this budget is never met
+    assert [d["step"] for d in decisions][-1] == "resume_text"
+    assert decisions.index(next(d for d in decisions if d["step"] == "resume_text")) > max(
+        i for i, d in enumerate(decisions) if d["step"] == "github_repositories"
+    )
+    assert len(data["github"]["data"]["repositories"]["nodes"]) == MIN_REPOS
+    assert data["resume"]["raw_text"] == "r" * MIN_TEXT_CHARS + TRUNCATION_MARKER
@@ -0,0 +1,27 @@
+"""services/derived_metrics.py: activity windows end on the data's date, not the generation date."""
+
+from datetime import date
+
+from services.derived_metrics import compute_metrics
+
+
+def _github(*pushed_at):
+    repos = [{"name": f"r{i}", "pushedAt": pushed, "isFork": False} for i, pushed in enumerate(pushed_at)]
+    return {"github": {"data": {"login": "dev", "repositories": {"totalCount": len(repos), "nodes": repos}}}}
+
+
+def test_windows_are_anchored_on_the_given_day():
+    raw_data = _github("2025-03-01T10:00:00Z", "2024-12-15T10:00:00Z", "2024-06-01T10:00:00Z")
+
+    repos = compute_metrics(raw_data, today=date(2025, 3, 10))["github"]["repositories"]
+
+    assert repos["pushed_last_90_days"] == 2
+    assert repos["pushed_last_12_months"] == 3
+
+
+def test_without_an_anchor_the_windows_end_today():
+    raw_data = _github("2025-03-01T10:00:00Z", "2024-12-15T10:00:00Z")
+
+    # These pushes fall inside the window ending on their fetch day, but have aged out of today's
+    assert compute_metrics(raw_data, today=date(2025, 3, 10))["github"]["repositories"]["pushed_last_90_days"] == 2
+    assert compute_metrics(raw_data)["github"]["repositories"]["pushed_last_90_days"] == 0
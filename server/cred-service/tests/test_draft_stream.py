@@ -0,0 +1,57 @@
+"""services/draft_stream.py: drafts are buffered only for draft subscribers in this process."""
+
+import asyncio
+
+from services.draft_stream import DraftBuffer
+from services.progress_manager import progress_manager
+
+
+def test_nothing_is_buffered_without_a_draft_subscriber():
+    buffer = DraftBuffer()
+    buffer.start("d-none")
+
+    async def generate():
+        with progress_manager.subscribe("d-none", drafts=False):
+            buffer.append("d-none", "extensive", "Hello")
+            buffer.finish("d-none", "extensive", "Hello world")
+
+    asyncio.run(generate())
+
+    assert buffer.read("d-none", {}, 100) == []
+
+
+def test_subscriber_gets_deltas_and_the_final_text():
+    buffer = DraftBuffer()
+    buffer.start("d-sub")
+    cursors = {}
+
+    async def watch():
+        with progress_manager.subscribe("d-sub", drafts=True):
+            buffer.append("d-sub", "extensive", "Hello")
+            first = buffer.read("d-sub", cursors, 100)
+            buffer.finish("d-sub", "extensive", "Hello world")
+            return first, buffer.read("d-sub", cursors, 100)
+
+    first, last = asyncio.run(watch())
+
+    assert first == [{"report": "extensive", "offset": 0, "text": "Hello", "done": False, "reset": False}]
+    assert last == [{"report": "extensive", "offset": 5, "text": " world", "done": True, "reset": False}]
+
+
+def test_late_subscriber_gets_the_whole_text_with_a_reset():
+    buffer = DraftBuffer()
+    buffer.start("d-late")
+    buffer.append("d-late", "extensive", "Hello ")  # nobody watching — dropped
+    cursors = {}
+
+    async def watch():
+        with progress_manager.subscribe("d-late", drafts=True):
+            buffer.append("d-late", "extensive", "wor")
+            first = buffer.read("d-late", cursors, 100)
+            buffer.finish("d-late", "extensive", "Hello world")
+            return first, buffer.read("d-late", cursors, 100)
+
+    first, last = asyncio.run(watch())
+
+    assert [chunk["text"] for chunk in first] == ["wor"]
+    assert last == [{"report": "extensive", "offset": 0, "text": "Hello world", "done": True, "reset": True}]
@@ -0,0 +1,103 @@
+"""services/extraction_cache.py: cross-job platform payload cache, memory and db backends."""
+
+import asyncio
+import threading
+
+import pytest
+
+from services import extraction_cache as module
+from services.extraction_cache import DatabaseBackend, ExtractionCache, InMemoryLRUBackend, canonicalize
+
+PAYLOAD = {"data": {"login": "octo"}}
+
+
+@pytest.fixture(params=["memory", "db"])
+def cache(request):
+    backend = InMemoryLRUBackend(max_entries=10) if request.param == "memory" else DatabaseBackend()
+    return ExtractionCache(backend, ttl=60)
+
+
+def test_key_is_canonical():
+    assert canonicalize("github", "  Octo ") == "octo"
+    assert canonicalize("portfolio", "https://www.Example.com/Me/") == "example.com/me"
+    assert canonicalize("portfolio", "example.com/me") == "example.com/me"
+    assert ExtractionCache.make_key("github", "OCTO") == ExtractionCache.make_key("github", "octo")
+
+
+def test_hit_after_set_and_accounting(cache):
+    assert cache.get("github", "octo") is None
+    cache.set("github", "Octo", PAYLOAD)
+
+    assert cache.get("github", "OCTO") == PAYLOAD
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["stores"], stats["entries"]) == (1, 1, 1, 1)
+
+
+@pytest.mark.parametrize("payload", [
+    {},
+    {"error": "Rate limited"},
+    {"data": {"login": "octo"}, "streamed_pages": 3},  # extra pages live in raw_data only
+])
+def test_incomplete_or_failed_payloads_are_not_stored(cache, payload):
+    cache.set("github", "octo", payload)
+
+    assert cache.get("github", "octo") is None
+    assert cache.stores == 0
+
+
+def test_expired_entries_miss(cache):
+    cache.ttl = -1
+    cache.set("github", "octo", PAYLOAD)
+
+    assert cache.get("github", "octo") is None
+
+
+def test_memory_backend_evicts_least_recently_used():
+    cache = ExtractionCache(InMemoryLRUBackend(max_entries=2), ttl=60)
+    cache.set("github", "a", PAYLOAD)
+    cache.set("github", "b", PAYLOAD)
+    cache.get("github", "a")  # a is now the most recently used
+    cache.set("github", "c", PAYLOAD)
+
+    assert cache.get("github", "b") is None
+    assert cache.get("github", "a") == PAYLOAD
+    assert cache.get("github", "c") == PAYLOAD
+
+
+def test_backend_errors_are_misses(monkeypatch):
+    cache = ExtractionCache(DatabaseBackend(), ttl=60)
+
+    def broken(*args, **kwargs):
+        raise RuntimeError("database is down")
+
+    monkeypatch.setattr(cache.backend, "get", broken)
+    monkeypatch.setattr(cache.backend, "set", broken)
+    cache.set("github", "octo", PAYLOAD)
+
+    assert cache.get("github", "octo") is None
+    assert (cache.misses, cache.stores) == (1, 0)
+
+
+def test_db_backend_runs_off_the_event_loop(monkeypatch):
+    cache = ExtractionCache(DatabaseBackend(), ttl=60)
+    threads = []
+    real_get = cache.get
+    monkeypatch.setattr(cache, "get", lambda *args: threads.append(threading.current_thread()) or real_get(*args))
+
+    async def lookup():
+        await cache.set_async("github", "octo", PAYLOAD)
+        return await cache.get_async("github", "octo")
+
+    assert asyncio.run(lookup()) == PAYLOAD
+    assert threads and threads[0] is not threading.main_thread()
+
+
+def test_memory_backend_stays_on_the_event_loop(monkeypatch):
+    cache = ExtractionCache(InMemoryLRUBackend(max_entries=10), ttl=60)
+    monkeypatch.setattr(module.asyncio, "to_thread", None)  # would raise if called
+
+    async def lookup():
+        await cache.set_async("github", "octo", PAYLOAD)
+        return await cache.get_async("github", "octo")
+
+    assert asyncio.run(lookup()) == PAYLOAD
@@ -0,0 +1,59 @@
+"""Concurrent report fan-out (app/routes/generate.py) under both prompt layouts."""
+
+import asyncio
+
+import pytest
+
+from app.config import settings
+from app.routes import generate
+from services.report_generator import ReportGenerator
+
+
+@pytest.fixture
+def report_gen(fake_openai, monkeypatch):
+    monkeypatch.setattr(generate, "report_cache", None)
+    monkeypatch.setattr(settings, "generation_concurrent", True)
+    gen = ReportGenerator()
+    gen.async_client = fake_openai
+    return gen
+
+
+@pytest.mark.parametrize("layout", ["prefix", "legacy"])
+@pytest.mark.parametrize("warmup_timeout", [0.0, 5.0])
+def test_concurrent_reports_for_every_layout(report_gen, fake_openai, monkeypatch, layout, warmup_timeout):
+    monkeypatch.setattr(settings, "llm_prompt_layout", layout)
+    monkeypatch.setattr(settings, "llm_prefix_warmup_timeout", warmup_timeout)
+    usage = {}
+
+    reports = asyncio.run(generate._generate_reports(
+        "job-fanout", report_gen, "CONTEXT", {"github": {"data": {"login": "octo"}}}, usage=usage,
+    ))
+
+    assert set(reports) == {spec["key"] for spec in generate.REPORT_SPECS}
+    assert all(text == "report text" for text in reports.values())
+    assert len(fake_openai.responses.calls) == 3
+    assert {call["status"] for call in usage.values()} == {"ok"}
+
+
+def test_other_reports_wait_for_the_prefix(report_gen, fake_openai, monkeypatch):
+    monkeypatch.setattr(settings, "llm_prompt_layout", "prefix")
+    monkeypatch.setattr(settings, "llm_prefix_warmup_timeout", 5.0)
+
+    asyncio.run(generate._generate_reports("job-prefix", report_gen, "CONTEXT", {}))
+
+    # The extensive report warms the prefix, so its request goes out before the others
+    extensive = report_gen._build_messages("extensive", "CONTEXT", raw_data={})
+    assert fake_openai.responses.calls[0]["input"][-1] == extensive[-1]
+    assert len(fake_openai.responses.calls) == 3
+
+
+def test_cached_first_report_does_not_need_a_prefix_event(report_gen, monkeypatch):
+    monkeypatch.setattr(settings, "llm_prompt_layout", "legacy")
+    checkpoints = {}
+    asyncio.run(generate._generate_reports("job-cp", report_gen, "CONTEXT", {}, checkpoints=checkpoints))
+    report_gen.async_client.responses.calls.clear()
+
+    # Second run is served entirely from checkpoints — no provider calls, no prefix event
+    reports = asyncio.run(generate._generate_reports("job-cp", report_gen, "CONTEXT", {}, checkpoints=checkpoints))
+    assert report_gen.async_client.responses.calls == []
+    assert set(reports) == set(checkpoints)
@@ -0,0 +1,33 @@
+"""services/http_clients.py: one shared sync client per upstream, even under concurrent first use."""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from services import http_clients as module
+from services.http_clients import HttpClientPool
+
+
+def test_concurrent_get_sync_creates_one_client(monkeypatch):
+    pool = HttpClientPool()
+    created = []
+    real_client = module.httpx.Client
+    barrier = threading.Barrier(8)
+
+    def slow_client(**kwargs):
+        created.append(kwargs)
+        time.sleep(0.05)  # widen the window between the lookup and the insert
+        return real_client(**kwargs)
+
+    monkeypatch.setattr(module.httpx, "Client", slow_client)
+
+    def fetch():
+        barrier.wait()
+        return pool.get_sync("brevo")
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        clients = list(executor.map(lambda _: fetch(), range(8)))
+
+    assert len(created) == 1
+    assert all(client is clients[0] for client in clients)
+    clients[0].close()
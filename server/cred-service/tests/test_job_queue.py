@@ -0,0 +1,137 @@
+"""job_queue claims, leases and the cross-process progress mirror."""
+
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.config import settings
+from app.database import AnalysisJob, QueueTask, SessionLocal
+from services.job_queue import JobQueue
+from services.progress_manager import ProgressManager
+
+
+@pytest.fixture
+def queue():
+    return JobQueue()
+
+
+def _add_job(job_id: str, status: str = "pending"):
+    db = SessionLocal()
+    db.add(AnalysisJob(id=job_id, status=status, candidate_name="Test", platform_urls={}))
+    db.commit()
+    db.close()
+
+
+def _task(task_id: int) -> QueueTask:
+    db = SessionLocal()
+    try:
+        return db.query(QueueTask).filter(QueueTask.id == task_id).first()
+    finally:
+        db.close()
+
+
+def _wait_for(predicate, timeout: float = 2.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return predicate()
+
+
+# ---------------------------
+# CLAIMS AND LEASES
+# ---------------------------
+
+def test_a_task_is_claimed_once(queue):
+    _add_job("q-once")
+    queue.enqueue("extraction", "q-once", {"platform_urls": {}})
+
+    first = queue.claim("worker-a")
+    assert first["job_id"] == "q-once" and first["attempt"] == 1
+    assert queue.claim("worker-b") is None
+
+
+def test_expired_lease_is_reclaimed_with_a_new_attempt(queue):
+    _add_job("q-lease", "extracting")
+    task_id = queue.enqueue("extraction", "q-lease", {})
+    queue.claim("worker-a")
+
+    db = SessionLocal()
+    db.query(QueueTask).filter(QueueTask.id == task_id).update(
+        {"lease_expires_at": datetime.utcnow() - timedelta(seconds=1)}
+    )
+    db.commit()
+    db.close()
+
+    reclaimed = queue.claim("worker-b")
+    assert reclaimed["id"] == task_id and reclaimed["attempt"] == 2
+    # The first worker lost the task: its heartbeat says so and its completion is ignored
+    assert queue.heartbeat(task_id, "worker-a")[0] is False
+    queue.complete(task_id, "worker-a", "done")
+    assert _task(task_id).status == "running"
+
+
+def test_exhausted_task_fails_its_job(queue, monkeypatch):
+    monkeypatch.setattr(settings, "job_queue_max_attempts", 1)
+    _add_job("q-exhaust", "generating")
+    task_id = queue.enqueue("generation", "q-exhaust", {})
+    queue.claim("worker-a")
+    db = SessionLocal()
+    db.query(QueueTask).filter(QueueTask.id == task_id).update(
+        {"lease_expires_at": datetime.utcnow() - timedelta(seconds=1)}
+    )
+    db.commit()
+    db.close()
+
+    assert queue.claim("worker-b") is None
+    db = SessionLocal()
+    try:
+        assert db.query(AnalysisJob).filter(AnalysisJob.id == "q-exhaust").first().status == "failed"
+    finally:
+        db.close()
+
+
+# ---------------------------
+# PROGRESS MIRROR
+# ---------------------------
+
+def test_mirror_never_writes_in_the_publishing_thread(queue, monkeypatch):
+    writers = []
+    monkeypatch.setattr(queue, "_write_progress", lambda job_id, progress: writers.append(threading.current_thread()))
+
+    queue.mirror_progress("q-thread", {"stage": "loading_data"})
+
+    assert _wait_for(lambda: writers)
+    assert threading.current_thread() not in writers
+
+
+def test_mirror_writes_latest_snapshot_and_clear(queue):
+    _add_job("q-mirror", "generating")
+    task_id = queue.enqueue("generation", "q-mirror", {})
+    queue.claim("worker-a")
+    manager = ProgressManager()
+    manager.add_listener(queue.mirror_progress)
+
+    manager.init("q-mirror")
+    manager.update("q-mirror", "loading_data")
+    assert _wait_for(lambda: (_task(task_id).progress or {}).get("stage") in ("pending", "loading_data"))
+
+    manager.clear("q-mirror")
+    assert _wait_for(lambda: _task(task_id).progress is None)
+
+
+def test_complete_flushes_the_terminal_snapshot(queue, monkeypatch):
+    _add_job("q-final", "generating")
+    task_id = queue.enqueue("generation", "q-final", {})
+    queue.claim("worker-a")
+    monkeypatch.setattr(queue, "_mirror_writer", lambda: None)  # nothing drains in the background
+
+    queue.mirror_progress("q-final", {"stage": "completed", "percentage": 100})
+    queue.complete(task_id, "worker-a", "done")
+
+    task = _task(task_id)
+    assert task.status == "done"
+    assert task.progress["stage"] == "completed"
@@ -0,0 +1,127 @@
+"""Queue handlers must be safe to re-run when a task is reclaimed from a dead worker."""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.database import AnalysisJob, RawData, SessionLocal
+from app.routes import extract, generate
+from services.extraction import ExtractionService
+
+
+def _add_job(job_id: str, status: str, **fields):
+    db = SessionLocal()
+    db.add(AnalysisJob(id=job_id, status=status, candidate_name="Test", platform_urls={}, **fields))
+    db.commit()
+    db.close()
+
+
+def _add_raw(job_id: str, data_type: str, fetched_at: datetime, data=None):
+    db = SessionLocal()
+    db.add(RawData(job_id=job_id, data_type=data_type, data=data or {}, fetched_at=fetched_at))
+    db.commit()
+    db.close()
+
+
+def _raw_types(job_id: str):
+    db = SessionLocal()
+    try:
+        return sorted(row.data_type for row in db.query(RawData).filter(RawData.job_id == job_id))
+    finally:
+        db.close()
+
+
+def _status(job_id: str) -> str:
+    db = SessionLocal()
+    try:
+        return db.query(AnalysisJob).filter(AnalysisJob.id == job_id).first().status
+    finally:
+        db.close()
+
+
+# ---------------------------
+# GENERATION
+# ---------------------------
+
+@pytest.mark.parametrize("status", ["completed", "failed", "cancelled", "extracted"])
+def test_generation_task_skips_finished_jobs(monkeypatch, status):
+    ran = []
+    monkeypatch.setattr(generate, "_run_generation_pipeline", lambda job_id, bypass: ran.append(job_id))
+    _add_job("gen-done", status)
+
+    asyncio.run(generate.run_generation_task("gen-done", {}))
+
+    assert ran == []
+    assert _status("gen-done") == status
+
+
+def test_generation_task_runs_generating_jobs(monkeypatch):
+    ran = []
+    monkeypatch.setattr(generate, "_run_generation_pipeline", lambda job_id, bypass: ran.append((job_id, bypass)))
+    _add_job("gen-live", "generating")
+
+    asyncio.run(generate.run_generation_task("gen-live", {"bypass_cache": True}))
+
+    assert ran == [("gen-live", True)]
+
+
+# ---------------------------
+# EXTRACTION
+# ---------------------------
+
+def test_extraction_task_skips_extracted_jobs(monkeypatch):
+    async def fail(*args, **kwargs):
+        raise AssertionError("extraction must not run again")
+    monkeypatch.setattr(ExtractionService, "run_extraction", fail)
+    _add_job("ext-done", "extracted")
+    _add_raw("ext-done", "github", datetime.utcnow())
+
+    asyncio.run(extract.run_extraction_task("ext-done", {"platform_urls": {}}))
+
+    assert _raw_types("ext-done") == ["github"]
+    assert _status("ext-done") == "extracted"
+
+
+def test_extraction_retry_clears_partial_rows(monkeypatch):
+    seen = []
+
+    async def run_extraction(self, job_id, **kwargs):
+        seen.append(_raw_types(job_id))
+    monkeypatch.setattr(ExtractionService, "run_extraction", run_extraction)
+    _add_job("ext-retry", "extracting")
+    _add_raw("ext-retry", "github_page", datetime.utcnow())
+    _add_raw("ext-retry", "leetcode", datetime.utcnow())
+
+    asyncio.run(extract.run_extraction_task("ext-retry", {"platform_urls": {}}))
+
+    assert seen == [[]]
+
+
+# ---------------------------
+# REFRESH
+# ---------------------------
+
+def test_refresh_task_skips_finished_refresh(monkeypatch):
+    async def fail(*args, **kwargs):
+        raise AssertionError("refresh must not run again")
+    monkeypatch.setattr(ExtractionService, "refresh_platforms", fail)
+    _add_job("ref-done", "extracted")
+
+    asyncio.run(extract.run_refresh_task("ref-done", {"platform_urls": {"github": "https://github.com/octo"}}))
+
+
+def test_orphan_pages_from_a_dead_refresh_are_dropped():
+    now = datetime.utcnow()
+    _add_job("ref-orphan", "extracting")
+    _add_raw("ref-orphan", "github_page", now - timedelta(minutes=10), {"page": 2})
+    _add_raw("ref-orphan", "github", now - timedelta(minutes=9))
+    _add_raw("ref-orphan", "github_page", now - timedelta(minutes=1), {"page": 2})  # streamed by the dead attempt
+
+    db = SessionLocal()
+    try:
+        ExtractionService()._drop_orphan_pages(db, "ref-orphan", ["github"])
+        pages = db.query(RawData).filter(RawData.job_id == "ref-orphan", RawData.data_type == "github_page").all()
+        assert [page.fetched_at for page in pages] == [now - timedelta(minutes=10)]
+    finally:
+        db.close()
@@ -0,0 +1,74 @@
+"""services/raw_data_loader.py: streamed GitHub pages are stitched back into one payload."""
+
+from datetime import datetime
+
+import pytest
+
+from app.database import AnalysisJob, RawData, SessionLocal
+from services.raw_data_loader import RawDataLoader
+
+
+def _store(job_id, rows):
+    db = SessionLocal()
+    db.add(AnalysisJob(id=job_id, status="extracted", candidate_name="Test"))
+    for data_type, data, fetched_at in rows:
+        db.add(RawData(job_id=job_id, data_type=data_type, data=data, fetched_at=fetched_at))
+    db.commit()
+    db.close()
+
+
+def _load(job_id):
+    db = SessionLocal()
+    try:
+        loader = RawDataLoader(db)
+        return loader.load_job_raw_data(job_id), loader.fetched_at
+    finally:
+        db.close()
+
+
+def test_pages_are_merged_in_page_order():
+    fetched = datetime(2025, 3, 10, 12, 0)
+    github = {"data": {
+        "login": "octo",
+        "repositories": {
+            "totalCount": 4,
+            "nodes": [{"name": "r1", "productionSignals": {"readme": True}}],
+            "productionSignalsByRepo": {"r3": {"dockerfile": True}, "r1": {"readme": False}},
+        },
+        "pullRequests": {"totalCount": 2, "nodes": [{"number": 1}]},
+    }}
+    _store("rd-pages", [
+        ("github", github, fetched),
+        ("github_page", {"connection": "repositories", "page": 3, "nodes": [{"name": "r4"}]}, fetched),
+        ("github_page", {"connection": "repositories", "page": 2, "nodes": [{"name": "r2"}, {"name": "r3"}]}, fetched),
+        ("github_page", {"connection": "pullRequests", "page": 2, "nodes": [{"number": 2}]}, fetched),
+        ("leetcode", {"data": {"matchedUser": {}}}, fetched),
+    ])
+
+    raw_data, fetched_at = _load("rd-pages")
+
+    repos = raw_data["github"]["data"]["repositories"]
+    assert [repo["name"] for repo in repos["nodes"]] == ["r1", "r2", "r3", "r4"]
+    assert [pr["number"] for pr in raw_data["github"]["data"]["pullRequests"]["nodes"]] == [1, 2]
+    # Signals fetched for streamed repos land on them; ones already on a repo are kept
+    assert repos["nodes"][0]["productionSignals"] == {"readme": True}
+    assert repos["nodes"][2]["productionSignals"] == {"dockerfile": True}
+    assert "productionSignalsByRepo" not in repos
+    assert set(raw_data) == {"github", "leetcode"}
+    assert set(fetched_at) == {"github", "leetcode"}
+
+
+def test_pages_without_their_platform_row_are_ignored():
+    _store("rd-orphan", [
+        ("resume", {"text": "cv"}, datetime(2025, 3, 10)),
+        ("github_page", {"connection": "repositories", "page": 2, "nodes": [{"name": "r2"}]}, datetime(2025, 3, 10)),
+    ])
+
+    raw_data, _ = _load("rd-orphan")
+
+    assert raw_data == {"resume": {"text": "cv"}}
+
+
+def test_a_job_without_rows_raises():
+    with pytest.raises(ValueError):
+        _load("rd-missing")
@@ -0,0 +1,99 @@
+"""POST /extract/{job_id}/refresh — ownership, queueing and status bookkeeping."""
+
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.auth import get_optional_user
+from app.database import AnalysisJob, RawData, SessionLocal
+from app.routes import extract
+
+OWNER = {"id": "owner-1", "email": "owner@example.com", "role": "authenticated"}
+STRANGER = {"id": "someone-else", "email": "x@example.com", "role": "authenticated"}
+
+
+@pytest.fixture
+def as_user():
+    """Returns a TestClient factory authenticated as the given user (None = anonymous)."""
+    app = FastAPI()
+    app.include_router(extract.router, prefix="/api/v1")
+
+    def client(user):
+        app.dependency_overrides[get_optional_user] = lambda: user
+        return TestClient(app)
+    return client
+
+
+@pytest.fixture
+def enqueued(monkeypatch):
+    calls = []
+    monkeypatch.setattr(extract.job_queue, "enqueue", lambda kind, job_id, payload: calls.append((kind, job_id, payload)))
+    monkeypatch.setattr(extract, "_extraction_tracker", {})
+    return calls
+
+
+def _add_job(job_id: str, user_id=None, status="completed", error_message=None):
+    db = SessionLocal()
+    db.add(AnalysisJob(
+        id=job_id, user_id=user_id, status=status, error_message=error_message, candidate_name="Test",
+        platform_urls={"github": "https://github.com/octo"}, updated_at=datetime.utcnow(),
+    ))
+    db.add(RawData(job_id=job_id, data_type="github", data={}, fetched_at=datetime.utcnow() - timedelta(days=2)))
+    db.commit()
+    db.close()
+
+
+def _job(job_id: str) -> AnalysisJob:
+    db = SessionLocal()
+    try:
+        return db.query(AnalysisJob).filter(AnalysisJob.id == job_id).first()
+    finally:
+        db.close()
+
+
+def test_owner_can_refresh(as_user, enqueued):
+    _add_job("r-own", user_id=OWNER["id"], error_message="github: timeout")
+
+    resp = as_user(OWNER).post("/api/v1/extract/r-own/refresh", data={"platforms": '["github"]'})
+
+    assert resp.status_code == 200
+    assert enqueued == [("refresh", "r-own", {"platform_urls": {"github": "https://github.com/octo"}})]
+    job = _job("r-own")
+    assert job.status == "extracting"
+    assert job.error_message is None
+
+
+@pytest.mark.parametrize("user,status", [(None, 401), (STRANGER, 404)])
+def test_others_cannot_refresh_an_owned_job(as_user, enqueued, user, status):
+    _add_job("r-other", user_id=OWNER["id"])
+
+    resp = as_user(user).post("/api/v1/extract/r-other/refresh", data={"platforms": '["github"]'})
+
+    assert resp.status_code == status
+    assert enqueued == []
+    assert _job("r-other").status == "completed"
+
+
+def test_anonymous_job_stays_refreshable(as_user, enqueued):
+    _add_job("r-anon", status="extracted")
+
+    resp = as_user(None).post("/api/v1/extract/r-anon/refresh", data={"stale_after_hours": "1"})
+
+    assert resp.status_code == 200
+    assert resp.json()["platforms"] == ["github"]
+
+
+def test_enqueue_failure_restores_the_job(as_user, monkeypatch):
+    def fail(*args, **kwargs):
+        raise RuntimeError("queue down")
+    monkeypatch.setattr(extract.job_queue, "enqueue", fail)
+    _add_job("r-fail", user_id=OWNER["id"], error_message="email_failed: smtp")
+
+    resp = as_user(OWNER).post("/api/v1/extract/r-fail/refresh", data={"platforms": '["github"]'})
+
+    assert resp.status_code == 500
+    job = _job("r-fail")
+    assert job.status == "completed"
+    assert job.error_message == "email_failed: smtp"
@@ -0,0 +1,84 @@
+"""services/report_cache.py: generated reports keyed by a hash of the exact LLM input."""
+
+import asyncio
+
+import pytest
+
+from app.config import settings
+from app.database import ReportCacheEntry, SessionLocal
+from app.routes import generate
+from services.extraction_cache import InMemoryLRUBackend
+from services.report_cache import DatabaseReportBackend, ReportCache
+from services.report_generator import ReportGenerator
+
+MESSAGES = [{"role": "system", "content": "rules"}, {"role": "user", "content": "data"}]
+
+
+@pytest.fixture(params=["memory", "db"])
+def cache(request):
+    backend = InMemoryLRUBackend(max_entries=10) if request.param == "memory" else DatabaseReportBackend(max_entries=10)
+    return ReportCache(backend, ttl=60)
+
+
+def test_key_covers_every_input():
+    key = ReportCache.make_key("v1", "gpt-5-mini", "extensive", MESSAGES)
+
+    assert key == ReportCache.make_key("v1", "gpt-5-mini", "extensive", [dict(m) for m in MESSAGES])
+    assert key != ReportCache.make_key("v2", "gpt-5-mini", "extensive", MESSAGES)
+    assert key != ReportCache.make_key("v1", "gpt-5", "extensive", MESSAGES)
+    assert key != ReportCache.make_key("v1", "gpt-5-mini", "recruiter", MESSAGES)
+    assert key != ReportCache.make_key("v1", "gpt-5-mini", "extensive", MESSAGES[:1])
+
+
+def test_hit_after_set_and_accounting(cache):
+    assert cache.get("k") is None
+    cache.set("k", "extensive", "gpt-5-mini", "# Report")
+
+    assert cache.get("k") == "# Report"
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["stores"], stats["entries"]) == (1, 1, 1, 1)
+
+
+def test_empty_reports_and_expired_entries_miss(cache):
+    cache.set("empty", "extensive", "gpt-5-mini", "")
+    cache.ttl = -1
+    cache.set("old", "extensive", "gpt-5-mini", "# Report")
+
+    assert cache.get("empty") is None
+    assert cache.get("old") is None
+    assert cache.stores == 1
+
+
+def test_db_backend_keeps_the_most_recently_used_rows():
+    cache = ReportCache(DatabaseReportBackend(max_entries=2), ttl=60)
+    cache.set("a", "extensive", "m", "A")
+    cache.set("b", "extensive", "m", "B")
+    cache.get("a")  # a is now the most recently used
+    cache.set("c", "extensive", "m", "C")
+
+    db = SessionLocal()
+    try:
+        assert {row.key for row in db.query(ReportCacheEntry).all()} == {"a", "c"}
+    finally:
+        db.close()
+
+
+def test_identical_input_is_served_without_an_llm_call(fake_openai, monkeypatch):
+    monkeypatch.setattr(generate, "report_cache", ReportCache(InMemoryLRUBackend(max_entries=10), ttl=60))
+    monkeypatch.setattr(settings, "generation_concurrent", True)
+    report_gen = ReportGenerator()
+    report_gen.async_client = fake_openai
+
+    first = asyncio.run(generate._generate_reports("job-rc-1", report_gen, "CONTEXT", {}))
+    assert len(fake_openai.responses.calls) == 3
+
+    # Another job with the same input: every report comes from the cache
+    usage = {}
+    second = asyncio.run(generate._generate_reports("job-rc-2", report_gen, "CONTEXT", {}, usage=usage))
+    assert len(fake_openai.responses.calls) == 3
+    assert second == first
+    assert all(call["cache_hit"] and not call["checkpoint"] for call in usage.values())
+
+    # Changed data misses
+    asyncio.run(generate._generate_reports("job-rc-3", report_gen, "OTHER CONTEXT", {}))
+    assert len(fake_openai.responses.calls) == 6
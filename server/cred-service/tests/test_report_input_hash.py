@@ -0,0 +1,43 @@
+"""The report cache / checkpoint key depends on the data, not on the day the report is generated."""
+
+from datetime import date
+
+import pytest
+
+from app.config import settings
+from services import report_generator as module
+from services.report_cache import ReportCache
+from services.report_generator import PROMPT_TEMPLATE_VERSION, ReportGenerator
+
+
+class _NextWeek(date):
+    @classmethod
+    def today(cls):
+        return date(2025, 3, 17)
+
+
+def _input_hash(gen: ReportGenerator, report_type: str) -> str:
+    messages = gen._build_messages(report_type, "CONTEXT", raw_data={"github": {"data": {}}})
+    return ReportCache.make_key(PROMPT_TEMPLATE_VERSION, gen.model, report_type, messages)
+
+
+@pytest.mark.parametrize("layout", ["prefix", "legacy"])
+def test_hash_is_stable_across_days_for_the_same_data(monkeypatch, layout):
+    monkeypatch.setattr(settings, "llm_prompt_layout", layout)
+    gen = ReportGenerator()
+    gen.as_of = date(2025, 3, 10)
+    today = _input_hash(gen, "extensive")
+
+    monkeypatch.setattr(module, "date", _NextWeek)
+
+    assert _input_hash(gen, "extensive") == today
+    assert "2025-03-10" in "".join(m["content"] for m in gen._build_messages("extensive", "CONTEXT"))
+
+
+def test_a_new_fetch_date_changes_the_hash():
+    gen = ReportGenerator()
+    gen.as_of = date(2025, 3, 10)
+    before = _input_hash(gen, "recruiter")
+    gen.as_of = date(2025, 3, 11)
+
+    assert _input_hash(gen, "recruiter") != before
@@ -0,0 +1,81 @@
+"""GET /generate/{job_id}/stream for jobs that are not running in this process."""
+
+import json
+import threading
+from datetime import datetime
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.database import AnalysisJob, SessionLocal
+from app.routes import stream
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(stream.router, prefix="/api/v1")
+    return TestClient(app)
+
+
+def _events(body: str):
+    return [json.loads(line[len("data: "):]) for line in body.splitlines() if line.startswith("data: ")]
+
+
+def test_finished_remote_job_ends_the_stream_off_the_event_loop(client, monkeypatch):
+    db = SessionLocal()
+    db.add(AnalysisJob(id="s-done", status="completed", candidate_name="Test", updated_at=datetime.utcnow()))
+    db.commit()
+    db.close()
+
+    threads = []
+    real_progress = stream.job_queue.current_progress
+    monkeypatch.setattr(
+        stream.job_queue, "current_progress",
+        lambda job_id: threads.append(threading.current_thread()) or real_progress(job_id),
+    )
+
+    resp = client.get("/api/v1/generate/s-done/stream")
+
+    assert resp.status_code == 200
+    assert _events(resp.text)[-1]["stage"] == "completed"
+    # asyncio.to_thread runs on the loop's default executor, whose threads are named asyncio_N
+    assert threads and all(thread.name.startswith("asyncio_") for thread in threads)
+
+
+def test_mirrored_progress_is_streamed(client, monkeypatch):
+    db = SessionLocal()
+    db.add(AnalysisJob(id="s-remote", status="generating", candidate_name="Test"))
+    db.commit()
+    db.close()
+    snapshots = iter([
+        {"stage": "loading_data", "percentage": 5, "message": "Loading", "timestamp": ""},
+        {"stage": "completed", "percentage": 100, "message": "Complete!", "timestamp": ""},
+    ])
+    monkeypatch.setattr(stream.job_queue, "current_progress", lambda job_id: next(snapshots))
+    monkeypatch.setattr(stream.settings, "sse_remote_poll_interval", 0.01)
+
+    resp = client.get("/api/v1/generate/s-remote/stream")
+
+    assert [event["stage"] for event in _events(resp.text)] == ["loading_data", "completed"]
+
+
+def test_drafts_for_a_remote_job_are_reported_unavailable_once(client, monkeypatch):
+    db = SessionLocal()
+    db.add(AnalysisJob(id="s-drafts", status="generating", candidate_name="Test"))
+    db.commit()
+    db.close()
+    snapshots = iter([
+        {"stage": "generating_reports", "percentage": 40, "message": "Writing", "timestamp": ""},
+        {"stage": "generating_reports", "percentage": 70, "message": "Writing", "timestamp": ""},
+        {"stage": "completed", "percentage": 100, "message": "Complete!", "timestamp": ""},
+    ])
+    monkeypatch.setattr(stream.job_queue, "current_progress", lambda job_id: next(snapshots))
+    monkeypatch.setattr(stream.settings, "sse_remote_poll_interval", 0.01)
+    monkeypatch.setattr(stream.settings, "sse_drafts_enabled", True)
+
+    resp = client.get("/api/v1/generate/s-drafts/stream?drafts=true")
+
+    assert resp.text.count("event: drafts.unavailable") == 1
+    assert [event.get("stage") for event in _events(resp.text)][-1] == "completed"